@@ -0,0 +1,46 @@
+import argparse
+import time
+
+from config.constants import BACKTEST_CACHE_DIR, BACKTEST_START_DATE, CONFIG_FILE, DATA_FILE
+from utils.backtest import run_backtest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the district models.")
+    parser.add_argument('districts', nargs='*', help="Districts to backtest (all configured districts if omitted).")
+    parser.add_argument('--horizons', type=int, nargs='+', default=None,
+                        help="Forecast durations in weeks (the durations offered by the app if omitted).")
+    parser.add_argument('--start', default=None,
+                        help="First forecast week (YYYY-MM-DD). By default the week after each model's training data, "
+                             f"or {BACKTEST_START_DATE} with --retrain.")
+    parser.add_argument('--stride', type=int, default=1, help="Weeks between consecutive forecast origins.")
+    parser.add_argument('--retrain', action='store_true', help="Refit the models at every origin.")
+    parser.add_argument('--config', default=CONFIG_FILE, help="Path to the districts YAML config.")
+    parser.add_argument('--data', default=DATA_FILE, help="Path to the historical data CSV.")
+    parser.add_argument('--cache-dir', default=BACKTEST_CACHE_DIR, help="Backtest cache directory.")
+    parser.add_argument('--no-cache', action='store_true', help="Recompute every district.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes.")
+    parser.add_argument('--output', default=None, help="CSV file to write the accuracy metrics to.")
+    parser.add_argument('--forecasts-output', default=None, help="CSV file to write the historical forecasts to.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    metrics, forecasts = run_backtest(
+        args.districts, args.horizons, args.start, args.stride, args.retrain, args.config, args.data,
+        None if args.no_cache else args.cache_dir, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(metrics.to_string(index=False))
+    failed = metrics.dropna(subset=['error'])['District'].nunique()
+    print(f"Backtested {metrics['District'].nunique()} districts in {elapsed:.2f}s ({failed} failed)")
+
+    if args.output:
+        metrics.to_csv(args.output, index=False)
+        print(f"Metrics written to {args.output}")
+    if args.forecasts_output:
+        forecasts.to_csv(args.forecasts_output, index=False)
+        print(f"Forecasts written to {args.forecasts_output}")
+
+
+if __name__ == '__main__':
+    main()
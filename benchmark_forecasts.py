@@ -0,0 +1,46 @@
+import argparse
+import json
+import sys
+
+import pandas as pd
+
+from config.constants import CONFIG_FILE, DATA_FILE, WEATHER_DATA_DIR
+from utils.benchmark import compare_reports, flatten_results, run_benchmark, write_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model loading, forecasting and SHAP explanations.")
+    parser.add_argument('--districts', nargs='*', default=None, help="Only benchmark these districts.")
+    parser.add_argument('--repeats', type=int, default=5, help="Timed runs per stage.")
+    parser.add_argument('--no-shap', action='store_true', help="Skip SHAP explanations.")
+    parser.add_argument('--background-samples', type=int, default=800,
+                        help="Background samples of the SHAP explainers (the app uses 800).")
+    parser.add_argument('--config', default=CONFIG_FILE, help="Path to the districts YAML config.")
+    parser.add_argument('--weather-dir', default=WEATHER_DATA_DIR, help="Directory with '<District>_weather_data.csv' files.")
+    parser.add_argument('--data-file', default=DATA_FILE, help="Path to the historical data CSV.")
+    parser.add_argument('--workers', type=int, default=1, help="Districts benchmarked concurrently.")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON file to write the results to.")
+    parser.add_argument('--compare', default=None, help="Baseline JSON report to check for regressions.")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Relative slowdown reported as a regression.")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.districts, args.repeats, not args.no_shap, args.background_samples,
+                           args.config, args.weather_dir, args.data_file, args.workers)
+    write_report(report, args.output)
+
+    with pd.option_context('display.float_format', '{:.4f}'.format):
+        print(pd.DataFrame(flatten_results(report)).to_string(index=False))
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            regressions = compare_reports(json.load(file), report, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['district']} horizon={regression['horizon']} {regression['metric']}: "
+                  f"{regression['baseline']:.4f} -> {regression['current']:.4f} ({regression['change']:+.0%})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,18 @@
+import argparse
+
+from config.constants import DATA_FILE, DATA_STORE_DIR
+from utils.data_loader import convert_to_parquet
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the historical CSV data into a Parquet store partitioned by District.")
+    parser.add_argument('--data-file', default=DATA_FILE, help="CSV data file to convert.")
+    parser.add_argument('--store-dir', default=DATA_STORE_DIR, help="Root directory of the columnar stores.")
+    args = parser.parse_args()
+
+    store_path = convert_to_parquet(args.data_file, args.store_dir)
+    print(f"Columnar store written to {store_path}")
+
+
+if __name__ == '__main__':
+    main()
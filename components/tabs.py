@@ -1,18 +1,160 @@
 import os
+import uuid
+import threading
 import streamlit as st
 import pandas as pd
 
-from typing import Any, Dict
-from utils.model_handler import forecast_cases
-from darts import TimeSeries
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Sequence, Tuple
+from utils.forecast_cache import cached_forecast_cases
+from utils.model_handler import get_max_forecast_weeks, weather_to_timeseries
 
 from utils.logger import logger
-from utils.shap_utils import get_explainer, get_shap_explainability, plot_feature_importance, plot_feature_values, st_shap
-from utils.utils import aggregate_weekly_cases, aggregate_yearly_cases_all_districts
-from utils.visualization import plot_comparison, plot_forecast, plot_historical_data, plot_weekly_cases, plot_yearly_cases_all_districts
+from utils.shap_jobs import ShapJob, get_shap_jobs
+from utils.shap_service import get_shap_service
+from utils.shap_utils import build_foreground_series, plot_feature_importance, plot_feature_values, st_shap
+from utils.weather_scenarios import forecast_scenarios
+from utils.visualization import plot_comparison, plot_forecast, plot_forecast_scenarios, plot_historical_data, plot_weekly_cases, plot_yearly_cases_all_districts
+
+# How often a pending SHAP job is checked, in seconds
+SHAP_POLL_SECONDS = 1
+# Memoized panel outputs kept by the render pipeline
+RENDER_PIPELINE_MAX_ENTRIES = 256
+# Number of weather scenarios offered on the forecast tab
+SCENARIO_COUNT_OPTIONS = [50, 100, 200, 500]
+
+
+class Panel:
+    """The expensive part of a tab: outputs computed from the inputs it declares."""
+
+    def __init__(self, name: str, inputs: Sequence[str], compute: Callable[[Dict[str, Any]], Any]):
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.compute = compute
+
+    def key(self, data: Dict[str, Any]) -> Tuple[Hashable, ...]:
+        """Memoization key of the panel: its name and the values of its declared inputs."""
+        return (self.name,) + tuple(data.get(name) for name in self.inputs)
+
+
+class RenderPipeline:
+    """
+    Dependency-tracked rendering of the tabs.
+
+    Streamlit reruns the whole script on every widget interaction, so every tab
+    body runs even when only one of its widgets changed. Each panel therefore
+    declares the inputs its outputs depend on (e.g. 'selected_district',
+    'selected_variable', 'n_weeks', 'weather_hash') and is recomputed only
+    when one of them changes; otherwise its memoized outputs (forecasts,
+    figures) are re-emitted as they are. Outputs depend on nothing but the
+    declared inputs, so they are shared by all sessions, least recently used
+    first out. Failed computations are not memoized.
+    """
+
+    def __init__(self, max_entries: int = RENDER_PIPELINE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._panels: Dict[str, Panel] = {}
+        self._outputs: 'OrderedDict[Tuple[Hashable, ...], Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0}
+
+    def panel(self, name: str, inputs: Sequence[str]) -> Callable:
+        """
+        Register the decorated function as the compute function of a panel.
+
+        Args:
+            name (str): Name of the panel.
+            inputs (Sequence[str]): Keys of the tab data the outputs depend on.
+
+        Returns:
+            Callable: Decorator returning the function unchanged.
+        """
+        def register(compute: Callable[[Dict[str, Any]], Any]) -> Callable[[Dict[str, Any]], Any]:
+            self._panels[name] = Panel(name, inputs, compute)
+            return compute
+        return register
+
+    def outputs(self, name: str, data: Dict[str, Any]) -> Any:
+        """
+        Outputs of a panel for the given tab data, computed only if its inputs changed.
+
+        Args:
+            name (str): Name of the panel.
+            data (Dict[str, Any]): Tab data holding the panel's inputs and whatever its compute function uses.
+
+        Returns:
+            Any: Outputs of the panel's compute function.
+        """
+        panel = self._panels[name]
+        key = panel.key(data)
+        with self._lock:
+            if key in self._outputs:
+                self._outputs.move_to_end(key)
+                self.counters['hits'] += 1
+                return self._outputs[key]
+            self.counters['misses'] += 1
+
+        outputs = panel.compute(data)
+        logger.info(f"Computed panel {name} for {dict(zip(panel.inputs, key[1:]))}")
+        with self._lock:
+            self._outputs[key] = outputs
+            while len(self._outputs) > self.max_entries:
+                self._outputs.popitem(last=False)
+        return outputs
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Memoization counters.
+
+        Returns:
+            Dict[str, int]: Hits, misses and the number of memoized outputs.
+        """
+        with self._lock:
+            return dict(self.counters, entries=len(self._outputs))
+
+
+render_pipeline = RenderPipeline()
 
 
 # Define functions for each tab's content
+@render_pipeline.panel('forecast', inputs=('selected_district', 'n_weeks', 'weather_hash', 'model_hash', 'training_end'))
+def _compute_forecast(data: Dict[str, Any]) -> Dict[str, Any]:
+    selected_district = data.get('selected_district')
+    weather_data = data.get('weather_data')
+    n_weeks = data.get('n_weeks')
+    model = data.get('model')
+    model_file = data.get('model_file')
+    forecast_dates = data.get('forecast_dates')
+
+    if data.get('requires_weather'):
+        # Predict once over all uploaded weeks (up to the longest duration)
+        # so switching durations is served from the same forecast
+        forecast_weather_data = data.get('forecast_weather_data')
+        if forecast_weather_data is None:
+            forecast_weather_data = weather_data
+        # Covariate series prepared once by the covariate store
+        weather_timeseries = data.get('weather_timeseries')
+        if weather_timeseries is None:
+            weather_timeseries = weather_to_timeseries(forecast_weather_data)
+        forecast_df = cached_forecast_cases(
+            model, model_file, n_weeks, forecast_dates, weather_data=weather_timeseries,
+            horizon_weeks=len(forecast_weather_data), model_hash=data.get('model_hash'))
+    else:
+        forecast_df = cached_forecast_cases(
+            model, model_file, n_weeks, forecast_dates,
+            horizon_weeks=get_max_forecast_weeks(selected_district), model_hash=data.get('model_hash'))
+    logger.info(f"Generated forecast for {n_weeks} weeks.")
+
+    if forecast_df.empty:
+        return {'forecast_df': forecast_df}
+    return {
+        'forecast_df': forecast_df,
+        'fig_forecast': plot_forecast(forecast_df, selected_district),
+        'fig_comparison': plot_comparison(data.get('filtered_data'), forecast_df, selected_district),
+        'csv': forecast_df.to_csv(index=False).encode('utf-8')
+    }
+
+
 def display_forecasted_data(data: Dict):
     st.header("🔮 Forecasted Data")
     st.write(
@@ -21,123 +163,88 @@ def display_forecasted_data(data: Dict):
     selected_district = data.get('selected_district')
     requires_weather = data.get('requires_weather')
     weather_data = data.get('weather_data')
-    n_weeks = data.get('n_weeks')
-    model = data.get('model')
-    forecast_dates = data.get('forecast_dates')
-    filtered_data = data.get('filtered_data')
-    forecast_df = None
-    if requires_weather:
+
+    if requires_weather and (weather_data is None or weather_data.empty):
+        # Prompt user to upload weather data
+        st.warning(
+            "Please upload a valid weather data CSV file to generate forecasts for this district. (Note: Checkout the Help tab to understand what and how to upload an input weather data.)")
+        return None
+
+    # Recomputed only when the district, duration or uploaded weather changed
+    with st.spinner("Generating forecast..."):
+        try:
+            outputs = render_pipeline.outputs('forecast', data)
+        except Exception as e:
+            logger.error(f"Error during forecasting: {e}")
+            st.error(f"Error during forecasting: {e}")
+            return pd.DataFrame()
+
+    forecast_df = outputs['forecast_df']
+    if not forecast_df.empty:
+        # Plot forecast
+        st.plotly_chart(outputs['fig_forecast'], use_container_width=True)
+
+        with st.expander("📄 View Forecast Data"):
+            st.dataframe(forecast_df)
+
+        # Download Forecast Data
+        with st.expander("📄 Download Forecast Data"):
+            st.download_button(
+                label="Download Forecast as CSV",
+                data=outputs['csv'],
+                file_name=f'forecast_{selected_district}.csv',
+                mime='text/csv'
+            )
+
+        # Comparison plot
+        st.subheader(f"🔄 Historical vs Forecasted")
+        st.plotly_chart(outputs['fig_comparison'], use_container_width=True)
+
+        # Optionally, display weather data used for forecasting (if any)
         if weather_data is not None and not weather_data.empty:
-            # Proceed with forecasting
-            with st.spinner("Generating forecast..."):
-                try:
-                    # Convert weather_data to Darts TimeSeries
-                    weather_timeseries = TimeSeries.from_dataframe(
-                        weather_data,
-                        time_col='Week_End_Date',
-                        value_cols=[
-                            "Avg Max Temp (°C)",
-                            "Avg Min Temp (°C)",
-                            "Avg Apparent Max Temp (°C)",
-                            "Avg Apparent Min Temp (°C)",
-                            "Total Precipitation (mm)",
-                            "Avg Wind Speed (km/h)"
-                        ],
-                    )
-                    forecast_df = forecast_cases(
-                        model, n_weeks, forecast_dates, weather_data=weather_timeseries)
-                    logger.info(f"Generated forecast for {n_weeks} weeks.")
-                except TypeError:
-                    # If forecast_cases doesn't accept weather_data, fallback
-                    forecast_df = forecast_cases(
-                        model, selected_district, n_weeks, forecast_dates)
-                    logger.warning(
-                        "forecast_cases does not accept weather_data. Proceeding without it.")
-                except Exception as e:
-                    logger.error(f"Error during forecasting: {e}")
-                    st.error(f"Error during forecasting: {e}")
-                    forecast_df = pd.DataFrame()
-
-            if not forecast_df.empty:
-                # Plot forecast
-                fig_forecast = plot_forecast(forecast_df, selected_district)
-                st.plotly_chart(fig_forecast, use_container_width=True)
-
-                with st.expander("📄 View Forecast Data"):
-                    st.dataframe(forecast_df)
-
-                # Download Forecast Data
-                with st.expander("📄 Download Forecast Data"):
-                    csv = forecast_df.to_csv(index=False).encode('utf-8')
-                    st.download_button(
-                        label="Download Forecast as CSV",
-                        data=csv,
-                        file_name=f'forecast_{selected_district}.csv',
-                        mime='text/csv'
-                    )
-
-                # Comparison plot
-                st.subheader(f"🔄 Historical vs Forecasted")
-                fig_comparison = plot_comparison(
-                    filtered_data, forecast_df, selected_district)
-                st.plotly_chart(fig_comparison, use_container_width=True)
-
-                # Optionally, display weather data used for forecasting
-                with st.expander("🌡️ Weather Data Used for Forecasting"):
-                    st.dataframe(weather_data)
-        else:
-            # Prompt user to upload weather data
-            st.warning(
-                "Please upload a valid weather data CSV file to generate forecasts for this district. (Note: Checkout the Help tab to understand what and how to upload an input weather data.)")
-    else:
-        # District does not require weather data; proceed with forecasting
-        with st.spinner("Generating forecast..."):
-            try:
-                forecast_df = forecast_cases(
-                    model, n_weeks, forecast_dates)
-                logger.info(f"Generated forecast for {n_weeks} weeks.")
-            except Exception as e:
-                logger.error(f"Error during forecasting: {e}")
-                st.error(f"Error during forecasting: {e}")
-                forecast_df = pd.DataFrame()
-
-        if not forecast_df.empty:
-            # Plot forecast
-            fig_forecast = plot_forecast(forecast_df, selected_district)
-            st.plotly_chart(fig_forecast, use_container_width=True)
-
-            with st.expander("📄 View Forecast Data"):
-                st.dataframe(forecast_df)
-
-            # Download Forecast Data
-            with st.expander("📄 Download Forecast Data"):
-                csv = forecast_df.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    label="Download Forecast as CSV",
-                    data=csv,
-                    file_name=f'forecast_{selected_district}.csv',
-                    mime='text/csv'
-                )
-
-            fig_comparison = plot_comparison(
-                filtered_data, forecast_df, selected_district)
-            st.plotly_chart(fig_comparison, use_container_width=True)
-
-            # Optionally, display weather data used for forecasting (if any)
-            if weather_data is not None and not weather_data.empty:
-                with st.expander("🌡️ Weather Data Used for Forecasting"):
-                    st.dataframe(weather_data)
+            with st.expander("🌡️ Weather Data Used for Forecasting"):
+                st.dataframe(weather_data)
+
+        if requires_weather:
+            display_weather_scenarios(data)
 
     return forecast_df
 
 
-def display_shap_explanation(data: Dict[str, Any], model: object):
-    # Extract data from the input dictionary
-    filtered_data = data.get('filtered_data')
-    forecast_df = data.get('forecast_df')
-    weather_data = data.get('weather_data')
+@render_pipeline.panel('weather_scenarios', inputs=('selected_district', 'n_weeks', 'weather_hash', 'n_scenarios',
+                                                   'model_hash', 'training_end'))
+def _compute_weather_scenarios(data: Dict[str, Any]) -> Dict[str, Any]:
+    bands = forecast_scenarios(data.get('model'), data.get('n_weeks'), data.get('weather_data'),
+                               data.get('n_scenarios'), seed=0)
+    return {'bands': bands, 'fig_scenarios': plot_forecast_scenarios(bands, data.get('selected_district'))}
+
+
+def display_weather_scenarios(data: Dict[str, Any]):
+    st.subheader("🎲 Weather Scenarios")
+    st.write("Forecasts under randomly perturbed temperatures and rainfall of the weather data.")
+    if not st.toggle("Run weather scenarios", key='weather_scenarios'):
+        return
+
+    n_scenarios = st.select_slider("Number of scenarios", options=SCENARIO_COUNT_OPTIONS, value=100)
+    with st.spinner(f"Forecasting {n_scenarios} weather scenarios..."):
+        try:
+            outputs = render_pipeline.outputs('weather_scenarios', dict(data, n_scenarios=n_scenarios))
+        except Exception as e:
+            logger.error(f"Error during scenario forecasting: {e}")
+            st.error(f"Error during scenario forecasting: {e}")
+            return
+
+    st.plotly_chart(outputs['fig_scenarios'], use_container_width=True)
+    with st.expander("📄 View Scenario Quantiles"):
+        st.dataframe(outputs['bands'])
+
+
+@render_pipeline.panel('shap_series', inputs=('selected_district', 'n_weeks', 'weather_hash', 'model_hash',
+                                             'training_end', 'data_version'))
+def _compute_shap_series(data: Dict[str, Any]) -> Dict[str, Any]:
+    district_index = data.get('district_index')
+    selected_district = data.get('selected_district')
     requires_weather = data.get('requires_weather')
-    n_weeks = data.get('n_weeks')
 
     # Define common variables
     target_col = 'Number_of_Cases'
@@ -149,19 +256,10 @@ def display_shap_explanation(data: Dict[str, Any], model: object):
         "Total Precipitation (mm)",
         "Avg Wind Speed (km/h)"
     ]
-
-    st.header("🔍 SHAP Explanation")
-    st.write(
-        "This tab provides SHAP explanations for the selected district's forecast.")
-
     value_cols = [target_col] + (covariate_cols if requires_weather else [])
 
-    # Create the TimeSeries object
-    series = TimeSeries.from_dataframe(
-        filtered_data,
-        time_col='Week_End_Date',
-        value_cols=value_cols
-    )
+    # TimeSeries of the district, built once per process by the district index
+    series = district_index.timeseries(selected_district, value_cols)
     background_data = series[target_col]
 
     if requires_weather:
@@ -169,117 +267,131 @@ def display_shap_explanation(data: Dict[str, Any], model: object):
     else:
         future_covariates = None  # No covariates required
 
-    # Initialize the explainer
-    explainer = get_explainer(model, background_data, future_covariates)
+    # Foreground: the last weeks of history followed by the forecast
+    forecasted_series, covariates_series = build_foreground_series(
+        district_index.full_precision(selected_district), data.get('forecast_df'),
+        data.get('weather_data') if requires_weather else None)
 
-    # Show loading spinner while processing SHAP explanation results
-    with st.spinner("Calculating SHAP values..."):
-        # Prepare forecasted DataFrame
-        forecasted_df = forecast_df.rename(
-            columns={'predicted_cases': target_col})
-        filtered_df = filtered_data[['Week_End_Date', target_col]][:-12]
-        filtered_last_12 = filtered_df.tail(12)
-        final_df = pd.concat([filtered_last_12, forecasted_df]).sort_values(
-            by='Week_End_Date').reset_index(drop=True)
+    return {
+        'args': (background_data, future_covariates, forecasted_series, covariates_series),
+        'key': get_shap_service().result_key(data.get('model_file'), background_data, future_covariates,
+                                             forecasted_series, covariates_series, horizon=data.get('n_weeks'))
+    }
 
-        if requires_weather:
-            # Prepare covariates DataFrame
-            future_covariates_last_12 = filtered_data[[
-                'Week_End_Date'] + covariate_cols][:-12].tail(12)
-            future_covariates_given = weather_data[[
-                'Week_End_Date'] + covariate_cols]
-            final_covariates_df = pd.concat([future_covariates_last_12, future_covariates_given]).sort_values(
-                by='Week_End_Date').reset_index(drop=True)
-
-            # Create TimeSeries objects with covariates
-            forecasted_series = TimeSeries.from_dataframe(
-                final_df, time_col='Week_End_Date', value_cols=[target_col]
-            )
-            covariates_series = TimeSeries.from_dataframe(
-                final_covariates_df, time_col='Week_End_Date', value_cols=covariate_cols
-            )
 
-            # Get SHAP explainability results
-            results = get_shap_explainability(
-                explainer, forecasted_series, covariates_series, horizons=n_weeks
-            )
-            shap_values = results.get_explanation(horizon=n_weeks)
+@render_pipeline.panel('shap_charts', inputs=('shap_key',))
+def _compute_shap_charts(data: Dict[str, Any]) -> Dict[str, Any]:
+    # Only computed once the explanation is available, see display_shap_explanation
+    n_weeks = data.get('n_weeks')
+    results, force_plot = data.get('shap_result')
+    return {
+        'fig_shap': plot_feature_importance(results.get_explanation(horizon=n_weeks)),
+        'fig_feat_values': plot_feature_values(results.get_feature_values(horizon=n_weeks)),
+        'force_plot': force_plot
+    }
 
-            # Generate and display plots
-            fig_shap = plot_feature_importance(shap_values)
-            st.plotly_chart(fig_shap, use_container_width=True)
 
-            feature_values = results.get_feature_values(horizon=n_weeks)
-            fig_feat_values = plot_feature_values(feature_values)
-            st.plotly_chart(fig_feat_values, use_container_width=True)
+def display_shap_explanation(data: Dict[str, Any], model: object):
+    # Extract data from the input dictionary
+    model_file = data.get('model_file')
+    n_weeks = data.get('n_weeks')
 
-            # Generate and display force plot with covariates
-            force_plot = explainer.force_plot_from_ts(
-                foreground_series=forecasted_series,
-                foreground_future_covariates=covariates_series,
-                horizon=n_weeks
-            )
-        else:
-            # Create TimeSeries object without covariates
-            forecasted_series = TimeSeries.from_dataframe(
-                final_df, time_col='Week_End_Date', value_cols=[target_col]
-            )
+    st.header("🔍 SHAP Explanation")
+    st.write(
+        "This tab provides SHAP explanations for the selected district's forecast.")
 
-            # Get SHAP explainability results without covariates
-            results = get_shap_explainability(
-                explainer, forecasted_series, horizons=n_weeks
-            )
-            shap_values = results.get_explanation(horizon=n_weeks)
+    # Background and foreground series, rebuilt only when the forecast changed
+    shap_series = render_pipeline.outputs('shap_series', data)
+    key = shap_series['key']
+
+    # Explanations are computed by a background job and handed over through
+    # the SHAP service's result cache, so the other tabs render meanwhile
+    service = get_shap_service()
+    session_id = _get_session_id()
+    cached = service.cached_result(key)
+    if cached is None:
+        job = get_shap_jobs().submit(
+            session_id, key, service.explain, model, model_file, *shap_series['args'], horizon=n_weeks
+        )
+        if not job.done():
+            _await_shap_job(job)
+            return
+        try:
+            cached = job.result()
+        except Exception as e:
+            logger.error(f"Error during SHAP explanation: {e}")
+            st.error(f"Error during SHAP explanation: {e}")
+            get_shap_jobs().release(session_id)
+            return
+    get_shap_jobs().release(session_id)
+
+    # Generate and display plots
+    charts = render_pipeline.outputs('shap_charts', dict(data, shap_result=cached, shap_key=key))
+    st.plotly_chart(charts['fig_shap'], use_container_width=True)
+    st.plotly_chart(charts['fig_feat_values'], use_container_width=True)
 
-            # Generate and display plots
-            fig_shap = plot_feature_importance(shap_values)
-            st.plotly_chart(fig_shap, use_container_width=True)
+    # Display the force plot after processing
+    st.write("**Force Plot (Influence of Each Feature on the Forecast)**")
+    st_shap(charts['force_plot'], 768)
 
-            feature_values = results.get_feature_values(horizon=n_weeks)
-            fig_feat_values = plot_feature_values(feature_values)
-            st.plotly_chart(fig_feat_values, use_container_width=True)
 
-            # Generate and display force plot without covariates
-            force_plot = explainer.force_plot_from_ts(
-                foreground_series=forecasted_series,
-                horizon=n_weeks
-            )
+def _get_session_id() -> str:
+    # Identifies the browser session across reruns, for its background SHAP job
+    if 'session_id' not in st.session_state:
+        st.session_state['session_id'] = uuid.uuid4().hex
+    return st.session_state['session_id']
 
-    # Display the force plot after processing
-    st.write("**Force Plot (Influence of Each Feature on the Forecast)**")
-    st_shap(force_plot, 768)
+
+@st.fragment(run_every=SHAP_POLL_SECONDS)
+def _await_shap_job(job: ShapJob):
+    # Only this fragment reruns while the job is pending; the whole script
+    # reruns once to render the result
+    if job.done():
+        st.rerun()
+    st.info(f"⏳ Calculating SHAP values in the background ({job.elapsed():.0f}s)... "
+            "The other tabs can be used in the meantime.")
+
+
+@render_pipeline.panel('historical_chart', inputs=('selected_district', 'selected_variable', 'data_version'))
+def _compute_historical_chart(data: Dict[str, Any]) -> Any:
+    return plot_historical_data(data.get('filtered_data'), data.get('selected_district'), data.get('selected_variable'))
+
+
+@render_pipeline.panel('case_charts', inputs=('selected_district', 'data_version'))
+def _compute_case_charts(data: Dict[str, Any]) -> Dict[str, Any]:
+    aggregates = data.get('aggregates')
+
+    # Yearly cases for all districts and weekly cases for the selected district,
+    # precomputed once per data version
+    yearly_cases_all = aggregates.yearly_cases_all_districts()
+    weekly_cases = aggregates.weekly_cases(data.get('selected_district'))
+
+    if yearly_cases_all.empty and weekly_cases.empty:
+        return {}
+    return {
+        'fig_yearly_all': plot_yearly_cases_all_districts(yearly_cases_all),
+        'fig_weekly': plot_weekly_cases(weekly_cases)
+    }
 
 
 def display_data_visualization(data: Dict):
     st.header("📊 Data Visualization")
     st.write("This tab contains visualizations of the original data from the year 2007 to 2024.")
     filtered_data = data.get('filtered_data')
-    selected_district = data.get('selected_district')
-    selected_variable = data.get('selected_variable')
-    original_data = data.get('original_data')
 
-    # Plot historical data
-    fig_historical = plot_historical_data(
-        filtered_data, selected_district, selected_variable)
+    # Plot historical data; changing the variable only recomputes this chart
+    fig_historical = render_pipeline.outputs('historical_chart', data)
     st.plotly_chart(fig_historical, use_container_width=True)
 
     with st.expander("📄 View Raw Data"):
         st.dataframe(filtered_data)
 
-    # Aggregate yearly cases for all districts
-    yearly_cases_all = aggregate_yearly_cases_all_districts(
-        original_data, selected_district)
-
-    # Aggregate weekly cases for the selected district
-    weekly_cases = aggregate_weekly_cases(original_data, selected_district)
+    case_charts = render_pipeline.outputs('case_charts', data)
 
     # Plot yearly cases for all districts
-    if not yearly_cases_all.empty or not weekly_cases.empty:
-        fig_yearly_all = plot_yearly_cases_all_districts(yearly_cases_all)
-        st.plotly_chart(fig_yearly_all, use_container_width=True)
-
-        fig = plot_weekly_cases(weekly_cases)
-        st.plotly_chart(fig, use_container_width=True)
+    if case_charts:
+        st.plotly_chart(case_charts['fig_yearly_all'], use_container_width=True)
+        st.plotly_chart(case_charts['fig_weekly'], use_container_width=True)
 
     else:
         st.write("No data available for any district.")
@@ -294,6 +406,8 @@ def display_help():
         3. Open the app's **Upload Section**.
         4. Drag and drop the file or use the **Browse** button to select the downloaded file.
         5. Click **Submit** to upload, and the dengue case forecasting will begin.
+
+        Without an upload, the bundled weather data of the district is used.
         """
     )
     # Add some space before the image using HTML <br> tag
@@ -1,28 +1,73 @@
-from darts.models import ARIMA, AutoARIMA, RandomForest, LightGBMModel, CatBoostModel, XGBModel, LinearRegressionModel, RegressionModel
-OTHER_MODEL_LOADERS = {
-    'models/Ampara_RandomForest.pt': RandomForest,
-    'models/Anuradhapura_RandomForest.pt': RandomForest,
-    'models/Batticaloa_RandomForest.pt': RandomForest,
-    'models/Colombo_RegressionModel.pt': RegressionModel,
-    'models/Galle_RegressionModel.pt': RegressionModel,
-    'models/Gampaha_ARIMA.pt': ARIMA,
-    'models/Hambantota_ARIMA.pt': ARIMA,
-    'models/Jaffna_CatBoostModel.pt': CatBoostModel,
-    'models/Kalutara_RandomForest.pt': RandomForest,
-    'models/Kegalle_LightGBMModel.pt': LightGBMModel,
-    'models/Kilinochchi_RegressionModel.pt': RegressionModel,
-    'models/Kurunegala_AutoARIMA.pt': AutoARIMA,
-    'models/Mannar_LinearRegressionModel.pt': LinearRegressionModel,
-    'models/Matale_LinearRegressionModel.pt': LinearRegressionModel,
-    'models/Matara_CatBoostModel.pt': CatBoostModel,
-    'models/Monaragala_AutoARIMA.pt': AutoARIMA,
-    'models/Mullaitivu_XGBModel.pt': XGBModel,
-    'models/NuwaraEliya_CatBoostModel.pt': CatBoostModel,
-    'models/Puttalam_RandomForest.pt': RandomForest,
-    'models/Trincomalee_RandomForest.pt': RandomForest,
-    'models/Vavuniya_RandomForest.pt': RandomForest
-}
-
+import os
 
 DISTRICT_WITH_WEATHER_FIELD = ['Ampara', 'Batticaloa', 'Colombo', 'Trincomalee']
 DISTRICT_WITHOUT_SHAP_EXPLANATION = ['Badulla', 'Gampaha', 'Hambantota', 'Kandy', 'Kurunegela', 'Monaragala', 'Polonnaruwa', 'Ratnapura']
+
+# Future covariates expected by the weather-driven district models
+WEATHER_COVARIATE_COLUMNS = [
+    'Avg Max Temp (°C)',
+    'Avg Min Temp (°C)',
+    'Avg Apparent Max Temp (°C)',
+    'Avg Apparent Min Temp (°C)',
+    'Total Precipitation (mm)',
+    'Avg Wind Speed (km/h)'
+]
+
+# Models were trained on data up to this date; forecasts start right after it
+LAST_TRAINING_DATE = '2024-04-30'
+WEATHER_START_DATE = '2024-04-29'
+
+DATA_FILE = 'data/Copy of Sri_lanka_dengue_cases_weather_weekly_2007_2024_.csv'
+CONFIG_FILE = 'config/districts.yaml'
+# Model classes, hashes, sizes and covariates, written by generate_config.py
+MODEL_MANIFEST_FILE = 'config/model_manifest.yaml'
+WEATHER_DATA_DIR = 'weather data'
+
+# Columnar (Parquet) copy of DATA_FILE, rebuilt automatically when the CSV changes
+DATA_STORE_DIR = os.environ.get('DATA_STORE_DIR', '.cache/data_store')
+AGGREGATES_DIR = os.environ.get('AGGREGATES_DIR', '.cache/aggregates')
+
+# Persistent forecast cache; point FORECAST_CACHE_DIR at a shared volume to share it across replicas
+FORECAST_CACHE_DIR = os.environ.get('FORECAST_CACHE_DIR', '.cache/forecasts')
+FORECAST_CACHE_MAX_MB = int(os.environ.get('FORECAST_CACHE_MAX_MB', '64'))
+
+# Cache of parsed PDF bulletins, keyed by file content
+PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR', '.cache/pdf_bulletins')
+PDF_CACHE_MAX_MB = int(os.environ.get('PDF_CACHE_MAX_MB', '32'))
+
+# Model registry: memory budget for loaded models and districts loaded at startup (comma separated)
+MODEL_MEMORY_BUDGET_MB = int(os.environ.get('MODEL_MEMORY_BUDGET_MB', '1024'))
+MODEL_WARMUP_DISTRICTS = [name.strip() for name in os.environ.get('MODEL_WARMUP_DISTRICTS', '').split(',') if name.strip()]
+
+# Monte Carlo weather scenarios: standard deviation of the temperature shift (°C),
+# of the log-scale rainfall factor, and the quantiles reported
+SCENARIO_TEMPERATURE_SD = 1.0
+SCENARIO_PRECIPITATION_SD = 0.3
+SCENARIO_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+# Backtests: first forecast week of backtests that refit the models (others start after each
+# model's training data) and cache of historical forecasts, keyed by model, data and parameters
+BACKTEST_START_DATE = '2023-05-01'
+BACKTEST_CACHE_DIR = os.environ.get('BACKTEST_CACHE_DIR', '.cache/backtests')
+BACKTEST_CACHE_MAX_MB = int(os.environ.get('BACKTEST_CACHE_MAX_MB', '64'))
+
+# Incremental model updates: extra epochs torch models are trained for on new weeks
+# (other models are refit from scratch, which is cheap for them)
+MODEL_UPDATE_EPOCHS = int(os.environ.get('MODEL_UPDATE_EPOCHS', '5'))
+
+# Stage tracing: memory deltas (tracemalloc and RSS) per span, JSON log of the spans,
+# port of the app's local metrics endpoint (0 disables it) and latency histogram buckets (s)
+TRACE_MEMORY = os.environ.get('TRACE_MEMORY', '').lower() in ('1', 'true', 'yes')
+TRACE_LOG_FILE = os.environ.get('TRACE_LOG_FILE', '')
+METRICS_PORT = int(os.environ.get('METRICS_PORT', '0'))
+TRACE_LATENCY_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+# Shared inference of torch models: replicas per model, predictions running at once
+# across all models, and torch intra-op threads (0: CPU cores / TORCH_INFERENCE_WORKERS)
+MODEL_REPLICAS = int(os.environ.get('MODEL_REPLICAS', '1'))
+TORCH_INFERENCE_WORKERS = int(os.environ.get('TORCH_INFERENCE_WORKERS', '2'))
+TORCH_INTRA_OP_THREADS = int(os.environ.get('TORCH_INTRA_OP_THREADS', '0'))
+
+# Load the historical data with compact dtypes (float32 weather, small integer calendar fields);
+# set COMPACT_SCHEMA=0 to keep the dtypes pandas infers from the CSV
+COMPACT_SCHEMA = os.environ.get('COMPACT_SCHEMA', '1').lower() not in ('0', 'false', 'no')
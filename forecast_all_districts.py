@@ -0,0 +1,32 @@
+import argparse
+import time
+
+from config.constants import CONFIG_FILE, WEATHER_DATA_DIR
+from utils.batch_forecast import forecast_all_districts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast dengue cases for every district in the config.")
+    parser.add_argument('--weeks', type=int, default=12, help="Number of weeks to forecast.")
+    parser.add_argument('--config', default=CONFIG_FILE, help="Path to the districts YAML config.")
+    parser.add_argument('--weather-dir', default=WEATHER_DATA_DIR, help="Directory with '<District>_weather_data.csv' files.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes.")
+    parser.add_argument('--output', default=None, help="CSV file to write the forecasts to.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    forecast_df = forecast_all_districts(args.weeks, args.config, args.weather_dir, args.workers)
+    elapsed = time.perf_counter() - start
+
+    timings = forecast_df.groupby('District')[['Model_Family', 'load_seconds', 'forecast_seconds', 'error']].first()
+    print(timings.to_string())
+    print(f"Forecast {forecast_df['District'].nunique()} districts in {elapsed:.2f}s "
+          f"({timings['error'].notna().sum()} failed)")
+
+    if args.output:
+        forecast_df.to_csv(args.output, index=False)
+        print(f"Forecasts written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
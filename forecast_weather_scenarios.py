@@ -0,0 +1,41 @@
+import argparse
+import os
+import time
+
+from config.constants import CONFIG_FILE, DISTRICT_WITH_WEATHER_FIELD, WEATHER_DATA_DIR
+from utils.batch_forecast import load_districts
+from utils.data_loader import load_weather_data
+from utils.model_handler import load_model
+from utils.weather_scenarios import forecast_scenarios
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast a weather-driven district under Monte Carlo weather scenarios.")
+    parser.add_argument('district', choices=DISTRICT_WITH_WEATHER_FIELD, help="District to forecast.")
+    parser.add_argument('--weeks', type=int, default=13, help="Number of weeks to forecast.")
+    parser.add_argument('--scenarios', type=int, default=200, help="Number of perturbed weather scenarios.")
+    parser.add_argument('--weather', default=None, help="Weather CSV to perturb (defaults to the bundled file of the district).")
+    parser.add_argument('--config', default=CONFIG_FILE, help="Path to the districts YAML config.")
+    parser.add_argument('--seed', type=int, default=None, help="Seed of the random generator.")
+    parser.add_argument('--output', default=None, help="CSV file to write the quantile bands to.")
+    args = parser.parse_args()
+
+    model_file = next(entry['model_file'] for entry in load_districts(args.config) if entry['name'] == args.district)
+    weather_file = args.weather or os.path.join(WEATHER_DATA_DIR, f'{args.district}_weather_data.csv')
+    weather_data = load_weather_data(weather_file, args.weeks)
+    model = load_model(model_file)
+
+    start = time.perf_counter()
+    bands = forecast_scenarios(model, args.weeks, weather_data, args.scenarios, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(bands.to_string(index=False))
+    print(f"Forecast {args.scenarios} scenarios for {args.district} in {elapsed:.2f}s")
+
+    if args.output:
+        bands.to_csv(args.output, index=False)
+        print(f"Scenario bands written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
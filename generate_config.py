@@ -1,6 +1,11 @@
 import os
 import yaml
 
+from utils.model_handler import load_model
+from utils.model_manifest import ModelManifest, describe_model, model_class_from_filename
+from utils.hashing import file_sha256
+from config.constants import MODEL_MANIFEST_FILE
+
 # Define directories
 models_dir = 'models'
 config_dir = 'config'
@@ -10,6 +15,7 @@ config_file_path = os.path.join(config_dir, 'districts.yaml')
 os.makedirs(config_dir, exist_ok=True)
 
 districts = []
+manifest = ModelManifest(path=MODEL_MANIFEST_FILE)
 
 for model_file in os.listdir(models_dir):
     if model_file.endswith('.pkl') or model_file.endswith('.pt'):
@@ -22,10 +28,27 @@ for model_file in os.listdir(models_dir):
             print(f"Error parsing filename '{model_file}': {e}")
             continue
 
-        districts.append({
-            'name': district_name,
-            'model_file': os.path.join(models_dir, model_file)
-        })
+        model_path = os.path.join(models_dir, model_file)
+
+        # Describe the model once here so the app can dispatch, validate and
+        # size it without deserializing it
+        try:
+            entry = describe_model(load_model(model_path), model_path)
+        except Exception as e:
+            print(f"Error loading model '{model_path}': {e}")
+            entry = {
+                'model_class': model_class_from_filename(model_path),
+                'sha256': file_sha256(model_path),
+                'size_bytes': os.path.getsize(model_path),
+                'artifacts': [model_path],
+                'error': f"{type(e).__name__}: {e}",
+            }
+        manifest.models[model_path] = entry
+
+        district = {'name': district_name, 'model_file': model_path}
+        if entry.get('training_end'):
+            district['training_end'] = entry['training_end']
+        districts.append(district)
 
 # Sort the districts list by the 'name' key
 districts = sorted(districts, key=lambda x: x['name'])
@@ -35,4 +58,14 @@ config = {'districts': districts}
 with open(config_file_path, 'w') as file:
     yaml.dump(config, file, sort_keys=False)
 
+manifest.save()
+
 print(f"Configuration file generated at {config_file_path}")
+print(f"Model manifest generated at {MODEL_MANIFEST_FILE}")
+
+# Report models that cannot be served up front
+for model_path, problem in manifest.problems(manifest.models).items():
+    print(f"Warning: {problem}")
+for model_path, entry in manifest.models.items():
+    if entry.get('error'):
+        print(f"Warning: {model_path} could not be loaded: {entry['error']}")
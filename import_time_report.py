@@ -0,0 +1,30 @@
+import argparse
+import json
+
+from utils.import_report import DEFAULT_TARGETS, import_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the import time of the app's modules and heavy dependencies.")
+    parser.add_argument('modules', nargs='*', default=DEFAULT_TARGETS, help="Modules to import, each in a fresh interpreter.")
+    parser.add_argument('--top', type=int, default=5, help="Slowest top-level packages listed per module.")
+    parser.add_argument('--output', default=None, help="JSON file to write the report to.")
+    args = parser.parse_args()
+
+    report = import_report(args.modules, args.top)
+    for result in report:
+        if result['error']:
+            print(f"{result['module']:<40} failed: {result['error']}")
+            continue
+        heavy = ', '.join(result['heavy']) or '-'
+        slowest = ', '.join(f"{name} {seconds:.2f}s" for name, seconds in result['slowest'])
+        print(f"{result['module']:<40} {result['seconds']:6.2f}s  heavy: {heavy}\n{'':<40} slowest: {slowest}")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+import argparse
+
+from config.constants import DATA_FILE
+from utils.data_loader import load_data, memory_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the memory used by the historical data, as read and in the compact schema.")
+    parser.add_argument('--data', default=DATA_FILE, help="Path to the historical data CSV.")
+    parser.add_argument('--output', default=None, help="CSV file to write the report to.")
+    args = parser.parse_args()
+
+    report = memory_report(load_data(args.data, compact=False))
+    print(report.to_string(index=False))
+    total = report.iloc[-1]
+    print(f"{total['bytes'] / 1e6:.2f} MB as read, {total['compact_bytes'] / 1e6:.2f} MB in the compact schema "
+          f"({1 - total['compact_bytes'] / total['bytes']:.0%} less)")
+
+    if args.output:
+        report.to_csv(args.output, index=False)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
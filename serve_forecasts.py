@@ -0,0 +1,28 @@
+import argparse
+
+from aiohttp import web
+
+from config.constants import CONFIG_FILE, DATA_FILE, MODEL_WARMUP_DISTRICTS, WEATHER_DATA_DIR
+from utils.forecast_api import ForecastService, create_app
+from utils.model_registry import ModelRegistry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve dengue forecasts and SHAP explanations over HTTP.")
+    parser.add_argument('--host', default='0.0.0.0', help="Interface to listen on.")
+    parser.add_argument('--port', type=int, default=8080, help="Port to listen on.")
+    parser.add_argument('--config', default=CONFIG_FILE, help="Path to the districts YAML config.")
+    parser.add_argument('--weather-dir', default=WEATHER_DATA_DIR, help="Directory with '<District>_weather_data.csv' files.")
+    parser.add_argument('--data-file', default=DATA_FILE, help="Path to the historical data CSV.")
+    parser.add_argument('--batch-window-ms', type=float, default=10, help="How long forecast requests are collected into a batch.")
+    parser.add_argument('--max-batch-size', type=int, default=32, help="Largest forecast batch.")
+    args = parser.parse_args()
+
+    service = ForecastService(ModelRegistry(), args.config, args.weather_dir, args.data_file,
+                              args.batch_window_ms / 1000, args.max_batch_size)
+    service.registry.warm_up(service.districts[name] for name in MODEL_WARMUP_DISTRICTS if name in service.districts)
+    web.run_app(create_app(service), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
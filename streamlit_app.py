@@ -1,16 +1,27 @@
 # app.py
-import datetime
+import io
 import streamlit as st
 import pandas as pd
 import yaml
 import os
 
-from utils.utils import extract_pdf
+from typing import Optional
+
+from utils.aggregates import MaterializedAggregates
+from utils.covariate_store import CovariateStore
 from utils.data_loader import load_data
-from utils.model_handler import load_model
+from utils.district_index import DistrictIndex
+from utils.inference import get_inference_guard
+from utils.pdf_ingest import ingest_pdfs
+from utils.model_handler import (get_forecast_dates, get_max_forecast_weeks, get_model_family, get_month_options,
+                                 get_training_end)
+from utils.model_manifest import get_model_manifest
+from utils.model_registry import ModelRegistry
 from utils.logger import logger
-from config.constants import DISTRICT_WITH_WEATHER_FIELD, DISTRICT_WITHOUT_SHAP_EXPLANATION
-from components.tabs import display_data_visualization, display_forecasted_data, display_help, display_shap_explanation
+from utils.single_flight import single_flight_stats
+from utils.tracing import get_tracer, start_metrics_server
+from config.constants import DATA_FILE, DISTRICT_WITH_WEATHER_FIELD, DISTRICT_WITHOUT_SHAP_EXPLANATION, METRICS_PORT, MODEL_WARMUP_DISTRICTS, WEATHER_DATA_DIR
+from components.tabs import display_data_visualization, display_forecasted_data, display_help, display_shap_explanation, render_pipeline
 
 # ------------------------
 # Configuration and Setup
@@ -57,6 +68,29 @@ if not config:
 
 districts = [district['name'] for district in config.get('districts', [])]
 
+
+@st.cache_resource(show_spinner=False)
+def get_model_problems() -> dict:
+    """
+    Check the artifacts of the configured models against the model manifest, once per process.
+
+    Returns:
+        dict: District -> problem, for the districts whose model cannot be served.
+    """
+    manifest = get_model_manifest()
+    model_files = [d['model_file'] for d in config.get('districts', [])]
+    problems = manifest.problems(model_files)
+    for model_file in manifest.outdated(model_files):
+        logger.warning(f"{model_file} is not described by the model manifest; run generate_config.py")
+    for model_file, problem in problems.items():
+        logger.warning(f"{model_file}: {problem}")
+    logger.info(f"Configured models: {len(model_files) - len(problems)} available, "
+                f"~{manifest.total_bytes(model_files) / 1e6:.1f} MB")
+    return {d['name']: problems[d['model_file']] for d in config.get('districts', []) if d['model_file'] in problems}
+
+
+model_problems = get_model_problems()
+
 st.sidebar.image('assets/logo.png', use_column_width=True)
 
 # ------------------------
@@ -67,7 +101,12 @@ st.sidebar.header("📍 Select District and Variable")
 
 # Select District
 selected_district = st.sidebar.selectbox(
-    "Choose a district", options=sorted(districts))
+    "Choose a district", options=sorted(districts),
+    format_func=lambda name: f"{name} (model unavailable)" if name in model_problems else name)
+
+if model_problems:
+    st.sidebar.warning(f"Forecasts are unavailable for {len(model_problems)} districts: "
+                       f"{', '.join(sorted(model_problems))}")
 
 # Select Variable to Plot
 plotable_columns = [
@@ -96,12 +135,7 @@ selected_variable = st.sidebar.selectbox(
 st.sidebar.subheader("🔮 Forecast Parameters")
 
 # Create a dropdown menu for selecting months
-month_options = {
-    "3 Months": 13 if selected_district in DISTRICT_WITH_WEATHER_FIELD else 12,
-    "4 Months": 16,
-    "5 Months": 20,
-    "6 Months": 24
-}
+month_options = get_month_options(selected_district)
 
 # Use selectbox to select the forecast duration
 selected_month = st.sidebar.selectbox(
@@ -114,119 +148,6 @@ n_weeks = month_options[selected_month]
 
 st.sidebar.write(f"Number of Months to Forecast: {selected_month}")
 
-# Our training data was up to this point
-last_date = datetime.datetime(2024, 4, 30, 0, 0)
-forecast_dates = pd.date_range(last_date, periods=n_weeks, freq='W-MON')
-
-# ------------------------
-# Conditional Weather Data Input Fields
-# ------------------------
-weather_data = None
-
-# Initialize a placeholder for uploaded weather data
-uploaded_weather_data = None
-
-if selected_district in DISTRICT_WITH_WEATHER_FIELD:
-    st.sidebar.subheader("🌦️ Upload Weather Data")
-    uploaded_file = st.sidebar.file_uploader(
-        "Upload a CSV file containing weather data (Note: Checkout the Help tab to understand what and how to upload an input weather data.)",
-        type=["csv"],
-        accept_multiple_files=False
-    )
-
-    if uploaded_file is not None:
-        try:
-            # Read the uploaded CSV file
-            uploaded_weather_data = pd.read_csv(uploaded_file)
-
-            # Define required columns
-            required_columns = [
-                'Week_Start_Date',
-                'Week_End_Date',
-                'Avg Max Temp (°C)',
-                'Avg Min Temp (°C)',
-                'Avg Apparent Max Temp (°C)',
-                'Avg Apparent Min Temp (°C)',
-                'Total Precipitation (mm)',
-                'Avg Wind Speed (km/h)',
-                'Avg Daylight Duration (hours)',
-                'Avg Sunrise Time',
-                'Avg Sunset Time'
-            ]
-
-            # Check if all required columns are present
-            missing_columns = [
-                col for col in required_columns if col not in uploaded_weather_data.columns]
-
-            if missing_columns:
-                st.error(
-                    f"The uploaded CSV is missing the following required columns: {', '.join(missing_columns)}")
-                uploaded_weather_data = None
-            else:
-                # Convert 'Week_End_Date' and 'Week_Start_Date' to datetime
-                uploaded_weather_data['Week_End_Date'] = pd.to_datetime(
-                    uploaded_weather_data['Week_End_Date'], errors='coerce')
-                uploaded_weather_data['Week_Start_Date'] = pd.to_datetime(
-                    uploaded_weather_data['Week_Start_Date'], errors='coerce')
-
-                # Check for any NaT (Not a Time) values resulting from failed conversions
-                if uploaded_weather_data['Week_End_Date'].isnull().any() or uploaded_weather_data['Week_Start_Date'].isnull().any():
-                    st.error(
-                        "Some dates in 'Week_End_Date' or 'Week_Start_Date' could not be parsed. Please ensure they are in the correct format (YYYY-MM-DD).")
-                    uploaded_weather_data = None
-                else:
-                    # Define the cutoff date
-                    cutoff_date = pd.to_datetime('2024-04-29')
-
-                    # Get the actual minimum Week_Start_Date
-                    actual_min_date = uploaded_weather_data['Week_Start_Date'].min(
-                    )
-
-                    # Check if the minimum Week_Start_Date is exactly the cutoff date
-                    if actual_min_date != cutoff_date:
-                        st.warning(
-                            f"The minimum Week_Start_Date in the uploaded data is {actual_min_date.strftime('%Y-%m-%d')}, which is not equal to 2024-04-29.")
-                        uploaded_weather_data = None
-                    else:
-                        # Sort the data by 'Week_Start_Date' ascending
-                        uploaded_weather_data = uploaded_weather_data.sort_values(
-                            'Week_Start_Date')
-
-                        # Calculate the number of available weeks
-                        available_weeks = len(uploaded_weather_data)
-
-                        # Validate if available weeks meet the forecast requirement
-                        if available_weeks >= n_weeks:
-                            # Fetch the required number of weeks
-                            weather_data_temp = uploaded_weather_data.head(
-                                n_weeks).copy()
-                            # Select and reorder necessary columns
-                            weather_data = weather_data_temp[[
-                                "Week_End_Date",
-                                "Avg Max Temp (°C)",
-                                "Avg Min Temp (°C)",
-                                "Avg Apparent Max Temp (°C)",
-                                "Avg Apparent Min Temp (°C)",
-                                "Total Precipitation (mm)",
-                                "Avg Wind Speed (km/h)"
-                            ]]
-                            st.success(
-                                f"Weather data uploaded and validated successfully! Using {n_weeks} weeks of data.")
-                        else:
-                            st.warning(
-                                f"The uploaded weather data contains only {available_weeks} weeks, but {n_weeks} weeks are required for forecasting.")
-                            uploaded_weather_data = None
-                            weather_data = None
-
-        except Exception as e:
-            logger.error(f"Error processing the uploaded file: {e}")
-            st.error(
-                f"An error occurred while processing the uploaded file: {e}")
-
-    else:
-        # If no file is uploaded, do not attempt to fetch automatically
-        pass
-
 # ------------------------
 # Fetch Selected District Configuration
 # ------------------------
@@ -242,7 +163,10 @@ if not district_config:
     st.stop()
 
 model_file = district_config['model_file']
-data_file = 'data/Copy of Sri_lanka_dengue_cases_weather_weekly_2007_2024_.csv'
+data_file = DATA_FILE
+
+# Spans of this rerun (and of the jobs it submits) are attributed to the selected district and model
+get_tracer().set_labels(district=selected_district, family=get_model_family(model_file))
 
 logger.info(f"Selected District: {selected_district}")
 logger.info(f"Model File: {model_file}")
@@ -253,31 +177,62 @@ logger.info(f"Data File: {data_file}")
 # ------------------------
 
 
-@st.cache_data(show_spinner=True)
-def get_historical_data(data_file: str) -> pd.DataFrame:
+@st.cache_resource(show_spinner=True)
+def get_district_index(data_file: str) -> Optional[DistrictIndex]:
     """
-    Load historical data with caching.
+    Load historical data and index it by district, once per process.
 
     Args:
         data_file (str): Path to the data file.
 
     Returns:
-        pd.DataFrame: Historical data.
+        DistrictIndex: Historical data indexed by district, or None on failure.
     """
     try:
-        df = load_data(data_file)
+        district_index = DistrictIndex(load_data(data_file), data_file)
         logger.info(f"Loaded data from {data_file}")
-        return df
+        return district_index
     except Exception as e:
         logger.error(f"Error loading data: {e}")
         st.error(f"Error loading data: {e}")
-        return pd.DataFrame()
+        return None
 
 
 @st.cache_resource(show_spinner=True)
+def get_aggregates(data_file: str) -> Optional[MaterializedAggregates]:
+    """
+    Load or compute the aggregate tables of the historical data, once per process.
+
+    Args:
+        data_file (str): Path to the data file.
+
+    Returns:
+        MaterializedAggregates: Aggregate tables, or None if the data could not be loaded.
+    """
+    district_index = get_district_index(data_file)
+    if district_index is None:
+        return None
+    return MaterializedAggregates.load_or_build(district_index.data)
+
+
+@st.cache_resource(show_spinner=False)
+def get_model_registry() -> ModelRegistry:
+    """
+    Model registry shared by all sessions, warmed up with MODEL_WARMUP_DISTRICTS.
+
+    Returns:
+        ModelRegistry: Shared model registry.
+    """
+    registry = ModelRegistry()
+    warm_up_files = [d['model_file'] for d in config['districts'] if d['name'] in MODEL_WARMUP_DISTRICTS]
+    if warm_up_files:
+        registry.warm_up(warm_up_files)
+    return registry
+
+
 def get_model(model_file: str):
     """
-    Load model with caching.
+    Load model through the shared model registry.
 
     Args:
         model_file (str): Path to the model file.
@@ -285,22 +240,130 @@ def get_model(model_file: str):
     Returns:
         Loaded model.
     """
+    if selected_district in model_problems:
+        st.error(f"Model for {selected_district} is unavailable. {model_problems[selected_district]}")
+        return None
     try:
-        model = load_model(model_file)
-        logger.info(f"Loaded model from {model_file}")
-        return model
+        return get_model_registry().get(model_file)
     except Exception as e:
         logger.error(f"Error loading model: {e}")
         st.error(f"Error loading model: {e}")
         return None
 
 
+@st.cache_resource(show_spinner=False)
+def get_metrics_server(port: int = METRICS_PORT):
+    """
+    Serve per-stage latency, model registry and render cache metrics on a local port, once per process.
+
+    Args:
+        port (int): Port of the metrics endpoint; 0 disables it.
+
+    Returns:
+        ThreadingHTTPServer: The running server, or None if disabled or the port is in use.
+    """
+    if not port:
+        return None
+    try:
+        return start_metrics_server(port, lambda: {'models': get_model_registry().metrics(),
+                                                   'inference': get_inference_guard().stats(),
+                                                   'single_flight': single_flight_stats(),
+                                                   'render': render_pipeline.stats()})
+    except OSError as e:
+        logger.error(f"Could not start the metrics endpoint on port {port}: {e}")
+        return None
+
+
+get_metrics_server()
+
 # Load data and model
 with st.spinner("Loading data..."):
-    data = get_historical_data(data_file)
+    district_index = get_district_index(data_file)
+    data = district_index.data if district_index is not None else pd.DataFrame()
 
 with st.spinner("Loading model..."):
     model = get_model(model_file)
+# Hash of the file the model was loaded from; keys the forecast cache
+model_hash = get_model_registry().sha256(model_file) if model is not None else None
+
+# Forecasts start after the last week the model was trained on
+training_end = get_training_end(model)
+forecast_dates = get_forecast_dates(n_weeks, training_end)
+
+# ------------------------
+# Conditional Weather Data Input Fields
+# ------------------------
+
+
+@st.cache_resource(show_spinner=False)
+def get_covariates(weather_dir: str = WEATHER_DATA_DIR) -> CovariateStore:
+    """
+    Load and validate the bundled weather data of all districts, once per process.
+
+    Args:
+        weather_dir (str): Directory containing the district weather files.
+
+    Returns:
+        CovariateStore: Weather covariates of all districts.
+    """
+    return CovariateStore.from_directory(weather_dir)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def parse_weather_upload(content: bytes, district: str) -> CovariateStore:
+    """
+    Parse and validate an uploaded weather CSV once per file content.
+
+    Args:
+        content (bytes): Content of the uploaded file.
+        district (str): District the weather data is uploaded for.
+
+    Returns:
+        CovariateStore: Store holding only the uploaded weather of the district.
+    """
+    return CovariateStore({district: pd.read_csv(io.BytesIO(content))})
+
+
+weather_data = None
+# Weeks up to the longest forecast duration, see cached_forecast_cases
+forecast_weather_data = None
+weather_timeseries = None
+weather_hash = 'none'
+
+if selected_district in DISTRICT_WITH_WEATHER_FIELD:
+    st.sidebar.subheader("🌦️ Upload Weather Data")
+    uploaded_file = st.sidebar.file_uploader(
+        "Optionally upload a CSV file to replace the bundled weather data (Note: Checkout the Help tab to understand what and how to upload an input weather data.)",
+        type=["csv"],
+        accept_multiple_files=False
+    )
+
+    # The bundled weather data is used unless a file is uploaded
+    weather_store = get_covariates()
+    if uploaded_file is not None:
+        try:
+            weather_store = parse_weather_upload(uploaded_file.getvalue(), selected_district)
+        except Exception as e:
+            logger.error(f"Error processing the uploaded file: {e}")
+            st.error(
+                f"An error occurred while processing the uploaded file: {e}")
+            weather_store = None
+
+    if weather_store is not None:
+        try:
+            max_weeks = get_max_forecast_weeks(selected_district)
+            weather_data = weather_store.weather_data(selected_district, n_weeks, after=training_end)
+            forecast_weather_data = weather_store.weather_data(selected_district, n_weeks, max_weeks, training_end)
+            weather_timeseries = weather_store.timeseries(selected_district, n_weeks, max_weeks, training_end)
+            weather_hash = weather_store.fingerprint(selected_district)
+            if uploaded_file is not None:
+                st.success(
+                    f"Weather data uploaded and validated successfully! Using {n_weeks} weeks of data.")
+            else:
+                st.sidebar.caption(f"Using the bundled weather data of {selected_district}.")
+        except (KeyError, ValueError) as e:
+            st.warning(str(e).strip("'\""))
+            weather_data = forecast_weather_data = weather_timeseries = None
 
 
 # ------------------------
@@ -314,40 +377,39 @@ uploaded_pdfs = st.sidebar.file_uploader(
     accept_multiple_files=True
 )
 
-# Dummy processing function for PDF files
-
 
 def process_pdfs(pdf_files):
     """
-    Dummy function to process PDF files.
+    Parse the uploaded PDF files on a process pool, showing progress as each file finishes.
 
     Args:
         pdf_files (list): List of PDF file objects.
 
     Returns:
-        list: List of processed file names.
+        Tuple[pd.DataFrame, pd.DataFrame]: Extracted weekly cases and a per-file report.
     """
-    try:
-        pdf_data = extract_pdf(pdf_files)
-
-        # Convert the list of extracted data into a DataFrame
-        df_extracted_data = pd.DataFrame(pdf_data)
-        df_extracted_data['Number_of_Cases'] = df_extracted_data['Number_of_Cases'].replace(
-            'Nil', 0)
-        df_sorted = df_extracted_data.sort_values(
-            by=['District', 'Week', 'Week_Start_Date']).reset_index(drop=True)
-
-        # Reset the index (optional)
-        df_sorted.reset_index(drop=True, inplace=True)
-        return df_sorted
-    except Exception as e:
-        logger.error(f"Failed to process: {e}")
+    progress = st.sidebar.progress(0.0, text="Processing PDF files...")
+    processed = []
 
+    def on_result(result):
+        processed.append(result['file'])
+        progress.progress(len(processed) / len(pdf_files), text=f"Processed {result['file']}")
+
+    processed_df, pdf_report = ingest_pdfs(pdf_files, on_result=on_result)
+    progress.empty()
+    return processed_df, pdf_report
 
-if uploaded_pdfs:
-    processed_df = process_pdfs(uploaded_pdfs)
-    st.success(f"Processed {len(uploaded_pdfs)} PDF files.")
 
+if uploaded_pdfs:
+    processed_df, pdf_report = process_pdfs(uploaded_pdfs)
+    failed_pdfs = pdf_report[pdf_report['error'].notna()]
+    st.success(f"Processed {len(uploaded_pdfs) - len(failed_pdfs)} PDF files.")
+    if not failed_pdfs.empty:
+        st.sidebar.warning(f"Failed to process {len(failed_pdfs)} PDF files: {', '.join(failed_pdfs['file'])}")
+    with st.sidebar.expander("PDF processing report"):
+        st.dataframe(pdf_report)
+
+if uploaded_pdfs and not processed_df.empty:
     processed_df['Week_Start_Date'] = pd.to_datetime(
         processed_df['Week_Start_Date'])
 
@@ -377,16 +439,13 @@ if data.empty or model is None:
     st.warning("Unable to load data or model. Please check configurations.")
     st.stop()
 
-# Filter data for the selected district
-filtered_data = data[data['District'] == selected_district].copy()
+# Rows of the selected district (a read-only view into the cached data)
+filtered_data = district_index.get(selected_district)
 
 if filtered_data.empty:
     st.warning(f"No historical data available for {selected_district}.")
     st.stop()
 
-# Ensure 'Week_End_Date' is datetime
-filtered_data['Week_End_Date'] = pd.to_datetime(filtered_data['Week_End_Date'])
-
 # ------------------------
 # Application Tabs
 # ------------------------
@@ -394,6 +453,11 @@ filtered_data['Week_End_Date'] = pd.to_datetime(filtered_data['Week_End_Date'])
 # Check if the selected district requires weather data
 requires_weather = selected_district in DISTRICT_WITH_WEATHER_FIELD
 
+# Version of the historical data; with the model hash and training end it keys
+# the panel outputs shared by all sessions (see RenderPipeline)
+aggregates = get_aggregates(data_file)
+data_version = aggregates.version if aggregates is not None else None
+
 # Define all possible tabs
 tabs = st.tabs(
     ["🔮 Forecasted Data", "🔍 SHAP Explanation", "📊 Data Visualization", "❔ Help"])
@@ -405,7 +469,8 @@ with tabs[2]:
         'filtered_data': filtered_data,
         'selected_district': selected_district,
         'selected_variable': selected_variable,
-        'original_data': data
+        'aggregates': aggregates,
+        'data_version': data_version
     })
 
 # Help Tab
@@ -418,8 +483,14 @@ with tabs[0]:
         'selected_district': selected_district,
         'requires_weather': requires_weather,
         'weather_data': weather_data,
+        'forecast_weather_data': forecast_weather_data,
+        'weather_timeseries': weather_timeseries,
+        'weather_hash': weather_hash,
         'n_weeks': n_weeks,
         'model': model,
+        'model_file': model_file,
+        'model_hash': model_hash,
+        'training_end': training_end,
         'forecast_dates': forecast_dates,
         'filtered_data': filtered_data
     })
@@ -435,10 +506,17 @@ with tabs[1]:
         else:
             display_shap_explanation({
                 'filtered_data': filtered_data,
+                'district_index': district_index,
+                'selected_district': selected_district,
                 'forecast_df': forecast_df,
                 'weather_data': weather_data,
                 'requires_weather': requires_weather,
-                'n_weeks': n_weeks
+                'weather_hash': weather_hash,
+                'n_weeks': n_weeks,
+                'model_file': model_file,
+                'model_hash': model_hash,
+                'training_end': training_end,
+                'data_version': data_version
             }, model)
     else:
         st.markdown("### 🔍 SHAP Explanation not available for this district.")
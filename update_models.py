@@ -0,0 +1,53 @@
+import argparse
+import time
+
+import pandas as pd
+
+from config.constants import CONFIG_FILE, DATA_FILE, MODEL_UPDATE_EPOCHS
+from utils.model_update import update_models
+from utils.pdf_ingest import ingest_pdfs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append new weekly bulletins to the data and update the affected district models.")
+    parser.add_argument('pdfs', nargs='*', help="Weekly epidemiology bulletin PDFs.")
+    parser.add_argument('--cases', nargs='*', default=[], help="CSV files of parsed bulletins, as downloaded from the app.")
+    parser.add_argument('--data', default=DATA_FILE, help="Path to the historical data CSV.")
+    parser.add_argument('--config', default=CONFIG_FILE, help="Path to the districts YAML config.")
+    parser.add_argument('--epochs', type=int, default=MODEL_UPDATE_EPOCHS, help="Additional training epochs of torch models.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes.")
+    parser.add_argument('--include-stale', action='store_true',
+                        help="Also update models trained on less data than is available, e.g. after a failed update.")
+    parser.add_argument('--dry-run', action='store_true', help="Only list the districts that would be updated.")
+    parser.add_argument('--output', default=None, help="CSV file to write the update report to.")
+    args = parser.parse_args()
+
+    frames = [pd.read_csv(path) for path in args.cases]
+    if args.pdfs:
+        cases, pdf_report = ingest_pdfs(args.pdfs, args.workers)
+        for row in pdf_report.dropna(subset=['error']).itertuples():
+            print(f"Failed to parse {row.file}: {row.error}")
+        frames.append(cases)
+    if not frames:
+        parser.error("No bulletins given.")
+
+    start = time.perf_counter()
+    try:
+        report = update_models(pd.concat(frames, ignore_index=True), args.data, args.config, args.epochs,
+                               args.workers, args.dry_run, args.include_stale)
+    except ValueError as e:
+        parser.exit(1, f"Update aborted, nothing was written: {e}\n")
+    elapsed = time.perf_counter() - start
+
+    print(report.to_string(index=False))
+    updated = report['training_end'].notna().sum()
+    print(f"{len(report)} districts changed, {updated} models updated in {elapsed:.2f}s"
+          + (" (dry run)" if args.dry_run else ""))
+
+    if args.output:
+        report.to_csv(args.output, index=False)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+# src/aggregates.py
+import os
+import shutil
+import tempfile
+import pandas as pd
+
+from typing import Dict, Tuple
+
+from config.constants import AGGREGATES_DIR
+from utils.hashing import dataframe_fingerprint
+from utils.logger import logger
+
+
+class MaterializedAggregates:
+    """
+    Aggregate tables of the national dataset, computed once per data version.
+
+    - yearly: total cases per Year and District.
+    - weekly: weekly ('W') resample of cases per District, with the Year and
+      the week number within that year used by the weekly cases chart.
+    - week_of_year: the weekly table pivoted to one row per District and Year
+      and one column per week number ('1' to '53').
+
+    Tables are persisted as Parquet under AGGREGATES_DIR/v<FORMAT_VERSION>/<data
+    version>, so a restarted process or another replica loads them instead of
+    recomputing.
+    """
+
+    TABLES = ('yearly', 'weekly', 'week_of_year')
+    # Bumped when TABLES or their layout change, so older persisted aggregates are not read
+    FORMAT_VERSION = 2
+
+    def __init__(self, yearly: pd.DataFrame, weekly: pd.DataFrame, week_of_year: pd.DataFrame, version: str):
+        self.version = version
+        self.yearly = yearly
+        self.weekly = weekly.sort_values(['District', 'Week_End_Date'], kind='stable').reset_index(drop=True)
+        self.week_of_year = week_of_year.sort_values(['District', 'Year'], kind='stable').reset_index(drop=True)
+        self._bounds = self._district_bounds(self.weekly)
+        self._week_of_year_bounds = self._district_bounds(self.week_of_year)
+
+    @staticmethod
+    def _district_bounds(table: pd.DataFrame) -> Dict[str, Tuple[int, int]]:
+        # Row range of each district in a table sorted by District
+        return {
+            district: (positions[0], positions[-1] + 1)
+            for district, positions in table.groupby('District', observed=True, sort=False).indices.items()
+        }
+
+    @classmethod
+    def build(cls, data: pd.DataFrame, version: str = None) -> 'MaterializedAggregates':
+        """
+        Compute the aggregate tables from the national dataset.
+
+        Args:
+            data (pd.DataFrame): Historical data of all districts.
+            version (str, optional): Data version, defaults to a fingerprint of data.
+
+        Returns:
+            MaterializedAggregates: The computed aggregates.
+        """
+        version = version or dataframe_fingerprint(data)[:16]
+        week_end = pd.to_datetime(data['Week_End_Date'])
+
+        yearly = data.groupby([week_end.dt.year, 'District'], observed=True)['Number_of_Cases'].sum().reset_index()
+        yearly.columns = ['Year', 'District', 'Number_of_Cases']
+
+        weekly = (
+            data.set_index(week_end)
+            .groupby('District', observed=True)['Number_of_Cases']
+            .resample('W').sum()
+            .reset_index()
+        )
+        weekly['Year'] = weekly['Week_End_Date'].dt.year
+        weekly['Week'] = weekly.groupby(['District', 'Year'], observed=True).cumcount() + 1
+
+        week_of_year = weekly.pivot(index=['District', 'Year'], columns='Week', values='Number_of_Cases')
+        # Parquet needs string column names
+        week_of_year.columns = [str(week) for week in week_of_year.columns]
+        week_of_year = week_of_year.reset_index()
+
+        return cls(yearly, weekly, week_of_year, version)
+
+    @classmethod
+    def load_or_build(cls, data: pd.DataFrame, cache_dir: str = AGGREGATES_DIR) -> 'MaterializedAggregates':
+        """
+        Load the persisted aggregates of this data version, building and persisting them if missing.
+
+        Args:
+            data (pd.DataFrame): Historical data of all districts.
+            cache_dir (str): Root directory of the persisted aggregates.
+
+        Returns:
+            MaterializedAggregates: Aggregates of data.
+        """
+        version = dataframe_fingerprint(data)[:16]
+        format_dir = os.path.join(cache_dir, f'v{cls.FORMAT_VERSION}')
+        path = os.path.join(format_dir, version)
+
+        try:
+            tables = {name: pd.read_parquet(os.path.join(path, f'{name}.parquet')) for name in cls.TABLES}
+            return cls(**tables, version=version)
+        except (ImportError, OSError, ValueError):
+            pass
+
+        aggregates = cls.build(data, version)
+        tmp_path = None
+        try:
+            os.makedirs(format_dir, exist_ok=True)
+            tmp_path = tempfile.mkdtemp(dir=format_dir, prefix='.tmp-')
+            for name in cls.TABLES:
+                getattr(aggregates, name).to_parquet(os.path.join(tmp_path, f'{name}.parquet'), index=False)
+            os.replace(tmp_path, path)
+        except (ImportError, OSError) as e:
+            # Another process may have published the same version first
+            logger.warning(f"Could not persist aggregates {version}: {e}")
+            if tmp_path:
+                shutil.rmtree(tmp_path, ignore_errors=True)
+        return aggregates
+
+    def yearly_cases_all_districts(self) -> pd.DataFrame:
+        """Total cases per Year and District."""
+        return self.yearly
+
+    def weekly_cases(self, district: str) -> pd.DataFrame:
+        """
+        Weekly cases of one district with Year and week-of-year columns.
+
+        Args:
+            district (str): Name of the district.
+
+        Returns:
+            pd.DataFrame: Columns 'District', 'Week_End_Date', 'Number_of_Cases', 'Year' and 'Week'.
+        """
+        start, stop = self._bounds.get(district, (0, 0))
+        return self.weekly.iloc[start:stop]
+
+    def week_of_year_matrix(self, district: str) -> pd.DataFrame:
+        """
+        Cases of one district as a Year x week-of-year matrix.
+
+        Args:
+            district (str): Name of the district.
+
+        Returns:
+            pd.DataFrame: One row per year (indexed by Year), one column per week number.
+        """
+        start, stop = self._week_of_year_bounds.get(district, (0, 0))
+        matrix = self.week_of_year.iloc[start:stop].drop(columns='District').set_index('Year')
+        matrix.columns = matrix.columns.astype(int)
+        return matrix.rename_axis(columns='Week')
@@ -0,0 +1,316 @@
+# src/backtest.py
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from config.constants import BACKTEST_CACHE_DIR, BACKTEST_CACHE_MAX_MB, BACKTEST_START_DATE, CONFIG_FILE, DATA_FILE
+from utils.batch_forecast import load_districts
+from utils.data_loader import load_district_series
+from utils.disk_cache import DiskCache
+from utils.hashing import file_sha256, timeseries_fingerprint
+from utils.logger import logger
+from utils.model_handler import get_model_family, get_month_options, get_training_end
+
+if TYPE_CHECKING:
+    from darts import TimeSeries
+
+BACKTEST_FORECAST_COLUMNS = ['District', 'Origin', 'Week_End_Date', 'lead', 'predicted_cases', 'actual_cases',
+                             'in_sample']
+# Bumped when the cached forecasts change, so older cache entries are not reused
+BACKTEST_CACHE_FORMAT = 2
+BACKTEST_METRIC_COLUMNS = ['District', 'Model_Family', 'horizon', 'n_forecasts', 'MAE', 'RMSE', 'MAPE',
+                           'seconds', 'cached', 'error']
+
+
+class BacktestCache(DiskCache):
+    """
+    On-disk cache of the historical forecasts of a backtest, per district.
+
+    Entries are keyed by the model content, the district's series and the
+    backtest parameters, so a nightly run only recomputes the districts whose
+    model or data changed. See DiskCache for the storage and eviction policy.
+    """
+
+    def __init__(self, cache_dir: str = BACKTEST_CACHE_DIR, max_bytes: int = BACKTEST_CACHE_MAX_MB * 1024 * 1024):
+        super().__init__(cache_dir, max_bytes)
+
+    @staticmethod
+    def make_key(model_file: str, series: 'TimeSeries', covariates: Optional['TimeSeries'], start: Any,
+                 forecast_horizon: int, stride: int, retrain: bool) -> str:
+        """
+        Build the cache key of a district's historical forecasts.
+
+        Args:
+            model_file (str): Path to the model file.
+            series (TimeSeries): Target series of the district.
+            covariates (TimeSeries, optional): Future covariates of the district.
+            start: First forecast week, None for the default of the model.
+            forecast_horizon (int): Number of weeks forecast from each origin.
+            stride (int): Weeks between consecutive origins.
+            retrain (bool): Whether the model is refit at each origin.
+
+        Returns:
+            str: Cache key.
+        """
+        params = f"v{BACKTEST_CACHE_FORMAT}-{start}-{forecast_horizon}-{stride}-{int(retrain)}"
+        params = params.replace(' ', '_').replace(':', '')
+        return (f"{file_sha256(model_file)[:24]}-{timeseries_fingerprint(series)[:16]}-"
+                f"{timeseries_fingerprint(covariates)[:16]}-{params}")
+
+    @staticmethod
+    def make_origin_key(model_hash: str, series: 'TimeSeries', covariates: Optional['TimeSeries'],
+                        forecast_horizon: int) -> str:
+        """
+        Build the cache key of the forecast of a model refit at one origin.
+
+        Args:
+            model_hash (str): SHA-256 of the model file.
+            series (TimeSeries): Target series up to the origin.
+            covariates (TimeSeries, optional): Future covariates used by the forecast.
+            forecast_horizon (int): Number of weeks forecast from the origin.
+
+        Returns:
+            str: Cache key.
+        """
+        return (f"origin-{model_hash[:24]}-{timeseries_fingerprint(series)[:16]}-"
+                f"{timeseries_fingerprint(covariates)[:16]}-{forecast_horizon}")
+
+
+def _forecasts_to_frame(district: str, forecasts: List['TimeSeries'], series: 'TimeSeries',
+                        training_end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    # One row per forecast step; the origin is the last week known to the forecast.
+    # Weeks the model was trained on are flagged, weeks after the data have no actual cases
+    if not forecasts:
+        return pd.DataFrame(columns=BACKTEST_FORECAST_COLUMNS)
+    weeks = np.concatenate([forecast.time_index.values for forecast in forecasts])
+    lengths = [len(forecast) for forecast in forecasts]
+    origins = np.repeat([forecast.start_time() - series.freq for forecast in forecasts], lengths)
+    actuals = series.pd_series()
+    return pd.DataFrame({
+        'District': district,
+        'Origin': origins,
+        'Week_End_Date': weeks,
+        'lead': np.concatenate([np.arange(1, length + 1) for length in lengths]),
+        'predicted_cases': np.concatenate([forecast.values(copy=False)[:, 0] for forecast in forecasts]),
+        'actual_cases': actuals.reindex(weeks).to_numpy(),
+        'in_sample': weeks <= np.datetime64(training_end) if training_end is not None else False
+    })
+
+
+def _refit_forecasts(model: Any, model_file: str, series: 'TimeSeries', covariates: Optional['TimeSeries'],
+                     start: Any, forecast_horizon: int, stride: int,
+                     cache: Optional[BacktestCache]) -> List['TimeSeries']:
+    # Refit an untrained copy of the model before every origin. The forecast of
+    # each origin is cached on its own, so when weeks are appended to the data
+    # only the new origins are refit
+    forecasts = []
+    model_hash = file_sha256(model_file) if cache else None
+    # Origins with at least one observed week to score
+    origins = series.time_index[:-1]
+    for origin in origins[origins >= series.get_timestamp_at_point(start) - series.freq][::stride]:
+        train = series.drop_after(origin + series.freq)
+        covariates_end = origin + (forecast_horizon + 1) * series.freq
+        used_covariates = (covariates.drop_after(covariates_end) if covariates is not None
+                           and covariates.end_time() >= covariates_end else covariates)
+        key = cache.make_origin_key(model_hash, train, used_covariates, forecast_horizon) if cache else None
+        forecast = cache.get(key) if cache else None
+        if forecast is None:
+            fitted = model.untrained_model()
+            kwargs = {'future_covariates': used_covariates} if used_covariates is not None else {}
+            fitted.fit(train, **kwargs)
+            forecast = fitted.predict(forecast_horizon, verbose=False, **kwargs)
+            if cache:
+                cache.put(key, forecast)
+        forecasts.append(forecast)
+    return forecasts
+
+
+def backtest_district(
+    district: str,
+    model_file: str,
+    forecast_horizon: int,
+    start: Any = None,
+    stride: int = 1,
+    retrain: bool = False,
+    data_file: str = DATA_FILE,
+    cache_dir: Optional[str] = BACKTEST_CACHE_DIR
+) -> Dict[str, Any]:
+    """
+    Rolling-origin backtest of one district model with darts' historical_forecasts.
+
+    From every origin between start and the end of the data (every stride
+    weeks), the model forecasts forecast_horizon weeks, using the district's
+    observed weather as future covariates if the model needs them. Without
+    retrain, the trained model is evaluated as deployed, by default from the
+    week after its training data so only held-out weeks are forecast; weeks
+    it was trained on are flagged as in-sample. With retrain, an untrained
+    copy is refit on the data before each origin, by default from
+    BACKTEST_START_DATE, and the forecast of each origin is cached.
+
+    Args:
+        district (str): Name of the district.
+        model_file (str): Path to the district's model file.
+        forecast_horizon (int): Number of weeks forecast from each origin.
+        start: First forecast week, as a date, a fraction of the series or an
+            index; None for the default described above.
+        stride (int): Weeks between consecutive origins.
+        retrain (bool): Whether to refit the model at each origin.
+        data_file (str): Path to the historical data CSV.
+        cache_dir (str, optional): Directory of the backtest cache, None to disable it.
+
+    Returns:
+        Dict: 'district', 'model_file', 'forecasts' (see BACKTEST_FORECAST_COLUMNS),
+            'seconds', 'cached' and 'error'.
+    """
+    from utils.model_handler import load_model
+
+    result = {'district': district, 'model_file': model_file, 'forecasts': None,
+              'seconds': None, 'cached': False, 'error': None}
+    try:
+        series, covariates = load_district_series(data_file, district)
+        begin = time.perf_counter()
+        start = pd.Timestamp(start) if isinstance(start, str) else start
+
+        cache = BacktestCache(cache_dir) if cache_dir else None
+        key = cache.make_key(model_file, series, covariates, start, forecast_horizon, stride, retrain) if cache else None
+        forecasts = cache.get(key) if cache else None
+        if forecasts is not None:
+            result['cached'] = True
+        else:
+            model = load_model(model_file)
+            training_end = None if retrain else get_training_end(model)
+            if start is None:
+                start = training_end + series.freq if training_end is not None else pd.Timestamp(BACKTEST_START_DATE)
+            uses_covariates = model.supports_future_covariates and covariates is not None and (
+                retrain or model.uses_future_covariates)
+            if retrain:
+                historical = _refit_forecasts(model, model_file, series, covariates if uses_covariates else None,
+                                              start, forecast_horizon, stride, cache)
+            else:
+                # Forecasts may run past the end of the data; only their observed weeks are scored
+                historical = model.historical_forecasts(
+                    series,
+                    future_covariates=covariates if uses_covariates else None,
+                    start=start,
+                    forecast_horizon=forecast_horizon,
+                    stride=stride,
+                    retrain=False,
+                    overlap_end=True,
+                    last_points_only=False,
+                    verbose=False
+                )
+            forecasts = _forecasts_to_frame(district, historical, series, training_end)
+            if cache:
+                cache.put(key, forecasts)
+        result['forecasts'] = forecasts
+        result['seconds'] = time.perf_counter() - begin
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def accuracy_metrics(forecasts: pd.DataFrame, horizons: Sequence[int]) -> pd.DataFrame:
+    """
+    MAE, RMSE and MAPE of backtest forecasts per district and forecast duration.
+
+    The metrics of a duration h cover the observed, out-of-sample weeks among
+    the first h weeks of every forecast. MAPE (in percent) skips weeks without cases.
+
+    Args:
+        forecasts (pd.DataFrame): Historical forecasts, see BACKTEST_FORECAST_COLUMNS.
+        horizons (Sequence[int]): Forecast durations in weeks.
+
+    Returns:
+        pd.DataFrame: Columns 'District', 'horizon', 'n_forecasts', 'MAE', 'RMSE' and 'MAPE'.
+    """
+    if 'in_sample' in forecasts:
+        forecasts = forecasts[~forecasts['in_sample'].astype(bool)]
+    forecasts = forecasts.dropna(subset=['actual_cases'])
+    errors = forecasts.assign(
+        abs_error=(forecasts['predicted_cases'] - forecasts['actual_cases']).abs(),
+        ape=lambda df: (df['abs_error'] / df['actual_cases'].where(df['actual_cases'] != 0)) * 100
+    )
+    tables = []
+    for horizon in horizons:
+        grouped = errors[errors['lead'] <= horizon].groupby('District', observed=True)
+        tables.append(pd.DataFrame({
+            'horizon': horizon,
+            'n_forecasts': grouped['Origin'].nunique(),
+            'MAE': grouped['abs_error'].mean(),
+            'RMSE': np.sqrt(grouped['abs_error'].apply(lambda e: np.mean(np.square(e)))),
+            'MAPE': grouped['ape'].mean()
+        }).reset_index())
+    return pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(
+        columns=['District', 'horizon', 'n_forecasts', 'MAE', 'RMSE', 'MAPE'])
+
+
+def run_backtest(
+    districts: Optional[List[str]] = None,
+    horizons: Optional[Sequence[int]] = None,
+    start: Any = None,
+    stride: int = 1,
+    retrain: bool = False,
+    config_path: str = CONFIG_FILE,
+    data_file: str = DATA_FILE,
+    cache_dir: Optional[str] = BACKTEST_CACHE_DIR,
+    max_workers: Optional[int] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Backtest the configured district models in parallel on a process pool.
+
+    Each district is forecast once at the longest horizon from every origin
+    and scored at every duration in horizons. A district that fails is
+    reported in the 'error' column instead of aborting the run.
+
+    Args:
+        districts (List[str], optional): Only backtest these districts.
+        horizons (Sequence[int], optional): Forecast durations in weeks; the
+            durations offered by the app for the districts (get_month_options) if omitted.
+        start: First forecast week, as a date, a fraction of the series or an
+            index; None for the default of each model (see backtest_district).
+        stride (int): Weeks between consecutive origins.
+        retrain (bool): Whether to refit the models at each origin.
+        config_path (str): Path to the districts YAML config.
+        data_file (str): Path to the historical data CSV.
+        cache_dir (str, optional): Directory of the backtest cache, None to disable it.
+        max_workers (int, optional): Size of the process pool.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: Accuracy metrics (see
+            BACKTEST_METRIC_COLUMNS) and the historical forecasts of all districts.
+    """
+    entries = [entry for entry in load_districts(config_path) if not districts or entry['name'] in districts]
+    if not entries:
+        return pd.DataFrame(columns=BACKTEST_METRIC_COLUMNS), pd.DataFrame(columns=BACKTEST_FORECAST_COLUMNS)
+    horizons = sorted(set(horizons or [weeks for entry in entries for weeks in get_month_options(entry['name']).values()]))
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers or min(len(entries), os.cpu_count() or 1)) as executor:
+        futures = [
+            executor.submit(backtest_district, entry['name'], entry['model_file'], max(horizons), start, stride,
+                            retrain, data_file, cache_dir)
+            for entry in entries
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            if result['error']:
+                logger.error(f"Backtest failed for {result['district']}: {result['error']}")
+            results.append(result)
+
+    forecasts = [result['forecasts'] for result in results if result['forecasts'] is not None]
+    forecasts = (pd.concat(forecasts, ignore_index=True) if forecasts
+                 else pd.DataFrame(columns=BACKTEST_FORECAST_COLUMNS))
+    metrics = accuracy_metrics(forecasts, horizons)
+
+    runs = pd.DataFrame([
+        {'District': result['district'], 'Model_Family': get_model_family(result['model_file']),
+         'seconds': result['seconds'], 'cached': result['cached'], 'error': result['error']}
+        for result in results
+    ])
+    metrics = runs.merge(metrics, on='District', how='left')[BACKTEST_METRIC_COLUMNS]
+    metrics = metrics.astype({'horizon': 'Int64', 'n_forecasts': 'Int64'})
+    return metrics.sort_values(['District', 'horizon']).reset_index(drop=True), forecasts
@@ -0,0 +1,159 @@
+# src/batch_forecast.py
+import os
+import time
+import yaml
+import pandas as pd
+
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from config.constants import CONFIG_FILE, DISTRICT_WITH_WEATHER_FIELD, WEATHER_DATA_DIR
+from utils.data_loader import load_weather_data
+from utils.logger import logger
+from utils.model_handler import (forecast_cases, get_forecast_dates, get_model_family, get_training_end, load_model,
+                                 weather_to_timeseries)
+from utils.model_manifest import get_model_manifest
+
+FORECAST_COLUMNS = ['District', 'Model_Family', 'Model_File', 'Week_End_Date', 'predicted_cases',
+                    'load_seconds', 'forecast_seconds', 'error']
+# Explicit dtypes, so rows of failed districts (all-NA values) concatenate with forecasts unchanged
+FORECAST_DTYPES = {'District': object, 'Model_Family': object, 'Model_File': object,
+                   'Week_End_Date': 'datetime64[ns]', 'predicted_cases': 'float64', 'load_seconds': 'float64',
+                   'forecast_seconds': 'float64', 'error': object}
+
+
+def load_districts(config_path: str = CONFIG_FILE) -> List[Dict]:
+    """
+    Load the district entries from the districts YAML config.
+
+    Args:
+        config_path (str): Path to the YAML config file.
+
+    Returns:
+        List[Dict]: District entries with 'name' and 'model_file' keys.
+    """
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(f"Configuration file not found: {config_path}")
+
+    with open(config_path, 'r') as file:
+        config = yaml.safe_load(file) or {}
+    return config.get('districts', [])
+
+
+def group_by_model_family(districts: List[Dict]) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Group districts by the family of their forecasting model.
+
+    Args:
+        districts (List[Dict]): District entries from the config.
+
+    Returns:
+        Dict[str, List[Tuple[str, str]]]: Model family -> [(district, model_file), ...].
+    """
+    groups = defaultdict(list)
+    for district in districts:
+        groups[get_model_family(district['model_file'])].append(
+            (district['name'], district['model_file']))
+    return dict(groups)
+
+
+def _forecast_district(district: str, model_file: str, family: str, n_weeks: int, weather_dir: str) -> pd.DataFrame:
+    load_seconds = forecast_seconds = None
+    try:
+        start = time.perf_counter()
+        model = load_model(model_file)
+        load_seconds = time.perf_counter() - start
+
+        weather_timeseries = None
+        if district in DISTRICT_WITH_WEATHER_FIELD:
+            weather_file = os.path.join(weather_dir, f'{district}_weather_data.csv')
+            weather_timeseries = weather_to_timeseries(
+                load_weather_data(weather_file, n_weeks, after=get_training_end(model)))
+
+        start = time.perf_counter()
+        forecast_df = forecast_cases(model, n_weeks, get_forecast_dates(n_weeks, get_training_end(model)),
+                                     weather_data=weather_timeseries)
+        forecast_seconds = time.perf_counter() - start
+        error = None
+    except Exception as e:
+        forecast_df = pd.DataFrame({'Week_End_Date': [pd.NaT], 'predicted_cases': [None]})
+        error = f"{type(e).__name__}: {e}"
+
+    return forecast_df.assign(
+        District=district,
+        Model_Family=family,
+        Model_File=model_file,
+        load_seconds=load_seconds,
+        forecast_seconds=forecast_seconds,
+        error=error
+    )[FORECAST_COLUMNS].astype(FORECAST_DTYPES)
+
+
+def _forecast_family(family: str, jobs: List[Tuple[str, str]], n_weeks: int, weather_dir: str) -> pd.DataFrame:
+    # Runs inside a worker process: one process per model family so each
+    # family's libraries are imported and warmed up once.
+    return pd.concat(
+        [_forecast_district(district, model_file, family, n_weeks, weather_dir) for district, model_file in jobs],
+        ignore_index=True
+    )
+
+
+def forecast_all_districts(
+    n_weeks: int,
+    config_path: str = CONFIG_FILE,
+    weather_dir: str = WEATHER_DATA_DIR,
+    max_workers: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Forecast dengue cases for every district in the config on a process pool.
+
+    Districts are grouped by model family and each family is forecast in its
+    own worker process. Districts in DISTRICT_WITH_WEATHER_FIELD use the
+    bundled '<District>_weather_data.csv' file from weather_dir as future
+    covariates. A district that fails, or whose model artifacts are missing
+    according to the model manifest, is reported in the 'error' column
+    instead of aborting the whole run.
+
+    Args:
+        n_weeks (int): Number of weeks to forecast.
+        config_path (str): Path to the districts YAML config.
+        weather_dir (str): Directory containing the district weather files.
+        max_workers (int, optional): Size of the process pool.
+
+    Returns:
+        pd.DataFrame: Long-format forecasts with one row per district and week,
+            including per-district load and forecast timings.
+    """
+    districts = load_districts(config_path)
+    # Models with missing artifacts are reported without starting a worker for them
+    problems = get_model_manifest().problems(district['model_file'] for district in districts)
+    results = []
+    for district in districts:
+        if district['model_file'] in problems:
+            logger.error(f"Skipping {district['name']}: {problems[district['model_file']]}")
+            results.append(pd.DataFrame({
+                'District': [district['name']], 'Model_Family': [get_model_family(district['model_file'])],
+                'Model_File': [district['model_file']], 'Week_End_Date': [pd.NaT], 'predicted_cases': [None],
+                'load_seconds': [None], 'forecast_seconds': [None], 'error': [problems[district['model_file']]]
+            }).astype(FORECAST_DTYPES))
+
+    groups = group_by_model_family([district for district in districts if district['model_file'] not in problems])
+    if not groups:
+        return (pd.concat(results, ignore_index=True)[FORECAST_COLUMNS] if results
+                else pd.DataFrame(columns=FORECAST_COLUMNS).astype(FORECAST_DTYPES))
+
+    with ProcessPoolExecutor(max_workers=max_workers or min(len(groups), os.cpu_count() or 1)) as executor:
+        futures = {
+            executor.submit(_forecast_family, family, jobs, n_weeks, weather_dir): family
+            for family, jobs in groups.items()
+        }
+        for future in as_completed(futures):
+            family_df = future.result()
+            failed = family_df.dropna(subset=['error']).groupby('District')['error'].first()
+            for district, error in failed.items():
+                logger.error(f"Forecast failed for {district} ({futures[future]}): {error}")
+            results.append(family_df)
+
+    return pd.concat(results, ignore_index=True)[FORECAST_COLUMNS].sort_values(
+        ['District', 'Week_End_Date']).reset_index(drop=True)
@@ -0,0 +1,308 @@
+# src/benchmark.py
+import os
+import sys
+import time
+import json
+import resource
+import platform
+import datetime
+import subprocess
+import multiprocessing
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Sequence
+
+from config.constants import (CONFIG_FILE, DATA_FILE, DISTRICT_WITH_WEATHER_FIELD, DISTRICT_WITHOUT_SHAP_EXPLANATION,
+                              WEATHER_COVARIATE_COLUMNS, WEATHER_DATA_DIR)
+from utils.batch_forecast import load_districts
+from utils.logger import logger
+
+# Version 2: SHAP timings go through the SHAP service with the app's settings
+BENCHMARK_SCHEMA_VERSION = 2
+
+# Metrics compared between runs, as (stage, statistic)
+COMPARED_METRICS = [('load', 'p50'), ('load', 'p95'), ('predict', 'p50'), ('predict', 'p95'),
+                    ('shap', 'p50'), ('shap', 'p95'), ('peak_rss_mb', None)]
+
+
+def summarize_timings(samples: Sequence[float]) -> Dict[str, Optional[float]]:
+    """
+    Summarize latency samples.
+
+    Args:
+        samples (Sequence[float]): Latencies in seconds.
+
+    Returns:
+        Dict: 'n', 'p50', 'p95', 'mean' and 'max' (None when there are no samples).
+    """
+    if not samples:
+        return {'n': 0, 'p50': None, 'p95': None, 'mean': None, 'max': None}
+    values = np.asarray(samples, dtype=float)
+    return {
+        'n': int(values.size),
+        'p50': float(np.percentile(values, 50)),
+        'p95': float(np.percentile(values, 95)),
+        'mean': float(values.mean()),
+        'max': float(values.max())
+    }
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _benchmark_district(
+    district: str,
+    model_file: str,
+    horizons: List[int],
+    repeats: int,
+    weather_dir: str,
+    data_file: str,
+    shap: bool,
+    background_num_samples: int,
+    seed: int
+) -> Dict[str, Any]:
+    # Runs in a fresh worker process so peak RSS and import costs belong to this district only
+    from utils.data_loader import load_data
+    from utils.model_handler import get_model_family, load_model
+
+    np.random.seed(seed)
+    result = {'district': district, 'model_file': model_file, 'family': get_model_family(model_file),
+              'horizons': {}, 'error': None}
+    try:
+        load_samples = []
+        for _ in range(repeats):
+            model, seconds = _timed(load_model, model_file)
+            load_samples.append(seconds)
+        result['load'] = summarize_timings(load_samples)
+
+        requires_weather = district in DISTRICT_WITH_WEATHER_FIELD
+        run_shap = shap and district not in DISTRICT_WITHOUT_SHAP_EXPLANATION
+        shap_inputs = None
+        if run_shap:
+            from utils.district_index import DistrictIndex
+            from utils.shap_service import get_shap_service
+
+            # The same background series and explainer service as the app's SHAP tab
+            district_index = DistrictIndex(load_data(data_file), data_file)
+            value_cols = ['Number_of_Cases'] + (WEATHER_COVARIATE_COLUMNS if requires_weather else [])
+            series = district_index.timeseries(district, value_cols)
+            background = (series['Number_of_Cases'], series[WEATHER_COVARIATE_COLUMNS] if requires_weather else None)
+            _, seconds = _timed(get_shap_service().get_explainer, model, model_file, *background,
+                                background_num_samples=background_num_samples)
+            result['shap_build_seconds'] = seconds
+            shap_inputs = (district_index.full_precision(district), background, background_num_samples)
+
+        for n_weeks in horizons:
+            # A horizon that fails (e.g. not enough weather data) does not stop the others
+            try:
+                result['horizons'][str(n_weeks)] = _benchmark_horizon(
+                    district, model, model_file, n_weeks, repeats, weather_dir, shap_inputs)
+            except Exception as e:
+                result['horizons'][str(n_weeks)] = {'error': f"{type(e).__name__}: {e}"}
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    result['peak_rss_mb'] = _peak_rss_mb()
+    return result
+
+
+def _benchmark_horizon(district, model, model_file, n_weeks, repeats, weather_dir, shap_inputs=None):
+    import pandas as pd
+
+    from utils.data_loader import load_weather_data
+    from utils.model_handler import forecast_cases, get_forecast_dates, get_training_end, weather_to_timeseries
+    from utils.shap_service import get_shap_service
+    from utils.shap_utils import build_foreground_series
+
+    # Forecast from the week after the model's training end, as the app does
+    training_end = get_training_end(model)
+    weather_df = weather_timeseries = None
+    if district in DISTRICT_WITH_WEATHER_FIELD:
+        weather_df = load_weather_data(os.path.join(weather_dir, f'{district}_weather_data.csv'), n_weeks,
+                                       after=training_end)
+        weather_timeseries = weather_to_timeseries(weather_df)
+    forecast_dates = get_forecast_dates(n_weeks, training_end)
+
+    predict_samples = []
+    for _ in range(repeats):
+        forecast_df, seconds = _timed(forecast_cases, model, n_weeks, forecast_dates, weather_data=weather_timeseries)
+        predict_samples.append(seconds)
+    horizon_result = {'predict': summarize_timings(predict_samples), 'error': None}
+
+    if shap_inputs is not None:
+        # Explain the forecast horizon through the SHAP service, as the app does;
+        # cached results are dropped so every run computes the explanation
+        filtered_data, background, background_num_samples = shap_inputs
+        service = get_shap_service()
+        foreground, covariates = build_foreground_series(filtered_data, pd.DataFrame(forecast_df), weather_df)
+        shap_samples = []
+        for _ in range(repeats):
+            service.clear_results()
+            _, seconds = _timed(service.explain, model, model_file, *background, foreground, covariates,
+                                horizon=n_weeks, background_num_samples=background_num_samples)
+            shap_samples.append(seconds)
+        horizon_result['shap'] = summarize_timings(shap_samples)
+    return horizon_result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(
+    districts: Optional[List[str]] = None,
+    repeats: int = 5,
+    shap: bool = True,
+    background_num_samples: int = 800,
+    config_path: str = CONFIG_FILE,
+    weather_dir: str = WEATHER_DATA_DIR,
+    data_file: str = DATA_FILE,
+    max_workers: int = 1,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Benchmark model loading, prediction and SHAP explanation for the configured districts.
+
+    Every district is benchmarked in its own worker process, at every forecast
+    duration offered by get_month_options. Latencies are summarized as p50/p95
+    over `repeats` runs and peak RSS is reported per district.
+
+    Args:
+        districts (List[str], optional): Only benchmark these districts.
+        repeats (int): Number of timed runs per stage.
+        shap (bool): Whether to time SHAP explanations.
+        background_num_samples (int): Background samples of the SHAP explainers, as in the app by default.
+        config_path (str): Path to the districts YAML config.
+        weather_dir (str): Directory containing the district weather files.
+        data_file (str): Path to the historical data CSV.
+        max_workers (int): Districts benchmarked concurrently; 1 avoids skewed timings.
+        seed (int): Random seed of each worker.
+
+    Returns:
+        Dict: 'metadata' of the run and one 'results' entry per district.
+    """
+    from utils.model_handler import get_month_options
+
+    entries = [entry for entry in load_districts(config_path) if not districts or entry['name'] in districts]
+
+    results = []
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context, max_tasks_per_child=1) as executor:
+        futures = {
+            executor.submit(_benchmark_district, entry['name'], entry['model_file'],
+                            sorted(set(get_month_options(entry['name']).values())), repeats, weather_dir,
+                            data_file, shap, background_num_samples, seed): entry['name']
+            for entry in entries
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            if result['error']:
+                logger.error(f"Benchmark failed for {result['district']}: {result['error']}")
+            for n_weeks, horizon_result in result['horizons'].items():
+                if horizon_result.get('error'):
+                    logger.error(f"Benchmark failed for {result['district']} at {n_weeks} weeks: {horizon_result['error']}")
+            results.append(result)
+
+    return {
+        'metadata': {
+            'schema_version': BENCHMARK_SCHEMA_VERSION,
+            'git_commit': _git_commit(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'params': {'repeats': repeats, 'shap': shap, 'background_num_samples': background_num_samples,
+                       'max_workers': max_workers, 'seed': seed}
+        },
+        'results': sorted(results, key=lambda result: result['district'])
+    }
+
+
+def flatten_results(report: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Flatten a benchmark report into one row per district and horizon.
+
+    Args:
+        report (Dict): Report returned by run_benchmark.
+
+    Returns:
+        List[Dict]: Rows with 'district', 'family', 'horizon', the p50/p95 of
+            each stage in seconds, 'peak_rss_mb' and 'error'.
+    """
+    rows = []
+    for result in report['results']:
+        horizons = result.get('horizons') or {None: {}}
+        for horizon, stages in horizons.items():
+            row = {'district': result['district'], 'family': result['family'],
+                   'horizon': int(horizon) if horizon is not None else None}
+            for stage in ('load', 'predict', 'shap'):
+                summary = result.get(stage) if stage == 'load' else stages.get(stage)
+                for statistic in ('p50', 'p95'):
+                    row[f'{stage}_{statistic}'] = summary[statistic] if summary else None
+            row['peak_rss_mb'] = result.get('peak_rss_mb')
+            row['error'] = result['error'] or stages.get('error')
+            rows.append(row)
+    return rows
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Find metrics that regressed between two benchmark reports.
+
+    Args:
+        baseline (Dict): Earlier report.
+        current (Dict): Report to check.
+        threshold (float): Relative increase reported as a regression.
+
+    Returns:
+        List[Dict]: One entry per regressed metric with 'district', 'horizon',
+            'metric', 'baseline', 'current' and 'change'.
+    """
+    def _index(report):
+        return {(row['district'], row['horizon']): row for row in flatten_results(report)}
+
+    if baseline['metadata'].get('schema_version') != current['metadata'].get('schema_version'):
+        logger.warning("The benchmark reports have different schema versions; their timings may not be comparable.")
+
+    baseline_rows = _index(baseline)
+    regressions = []
+    for key, row in _index(current).items():
+        previous = baseline_rows.get(key)
+        if previous is None:
+            continue
+        for stage, statistic in COMPARED_METRICS:
+            metric = f'{stage}_{statistic}' if statistic else stage
+            before, after = previous.get(metric), row.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if change > threshold:
+                regressions.append({'district': key[0], 'horizon': key[1], 'metric': metric,
+                                    'baseline': before, 'current': after, 'change': change})
+    return regressions
+
+
+def write_report(report: Dict[str, Any], output_file: str):
+    """
+    Write a benchmark report as JSON.
+
+    Args:
+        report (Dict): Report returned by run_benchmark.
+        output_file (str): Path of the JSON file.
+    """
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    with open(output_file, 'w') as file:
+        json.dump(report, file, indent=2)
@@ -0,0 +1,225 @@
+# src/covariate_store.py
+import os
+import glob
+import threading
+import pandas as pd
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from config.constants import WEATHER_COVARIATE_COLUMNS, WEATHER_DATA_DIR, WEATHER_START_DATE
+from utils.hashing import dataframe_fingerprint
+from utils.logger import logger
+from utils.model_handler import weather_to_timeseries
+
+if TYPE_CHECKING:
+    from darts import TimeSeries
+
+WEATHER_FILE_SUFFIX = '_weather_data.csv'
+DATE_COLUMNS = ['Week_Start_Date', 'Week_End_Date']
+
+
+class CovariateStore:
+    """
+    Future weather covariates of many districts, loaded and validated once.
+
+    The weather of all districts is held in one frame sorted by District and
+    Week_Start_Date, starting at WEATHER_START_DATE, so each district is a
+    contiguous block of rows (see DistrictIndex). Validation runs over all
+    districts in one pass; districts whose data is invalid are left out and
+    their error is kept in errors. Covariate TimeSeries are built on first
+    use and memoized. This is the only weather validation: single uploaded
+    or posted weather files go through it as well (see prepare_weather_data).
+
+    Frames returned by the store must not be modified in place.
+    """
+
+    def __init__(self, frames: Dict[str, pd.DataFrame]):
+        """
+        Args:
+            frames (Dict[str, pd.DataFrame]): Raw weekly weather data per district, with
+                'Week_Start_Date', 'Week_End_Date' and the columns in WEATHER_COVARIATE_COLUMNS.
+        """
+        self.errors: Dict[str, str] = {}
+        complete = {}
+        for district, df in frames.items():
+            missing = [col for col in DATE_COLUMNS + WEATHER_COVARIATE_COLUMNS if col not in df.columns]
+            if missing:
+                self.errors[district] = f"Missing required columns in weather data: {', '.join(missing)}"
+            else:
+                complete[district] = df[DATE_COLUMNS + WEATHER_COVARIATE_COLUMNS]
+
+        self._data = self._validate(complete)
+        self._bounds: Dict[str, Tuple[int, int]] = {
+            district: (positions[0], positions[-1] + 1)
+            for district, positions in self._data.groupby('District', observed=True, sort=False).indices.items()
+        }
+        self._series: Dict[Tuple[str, pd.Timestamp, int], 'TimeSeries'] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _validate(self, frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        columns = ['District'] + DATE_COLUMNS + WEATHER_COVARIATE_COLUMNS
+        if not frames:
+            return pd.DataFrame(columns=columns)
+
+        df = pd.concat(frames, names=['District', None]).reset_index(level=0)
+        df['District'] = df['District'].astype('category')
+        for col in DATE_COLUMNS:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+        df[WEATHER_COVARIATE_COLUMNS] = df[WEATHER_COVARIATE_COLUMNS].apply(pd.to_numeric, errors='coerce')
+
+        invalid_dates = df[DATE_COLUMNS].isna().any(axis=1).groupby(df['District'], observed=True).any()
+        invalid_values = df[WEATHER_COVARIATE_COLUMNS].isna().any(axis=1).groupby(df['District'], observed=True).any()
+        start = pd.Timestamp(WEATHER_START_DATE)
+        first_week = df['Week_Start_Date'].where(df['Week_Start_Date'] >= start).groupby(
+            df['District'], observed=True).min()
+
+        for district in invalid_dates.index:
+            if invalid_dates[district]:
+                self.errors[district] = ("Some dates in 'Week_End_Date' or 'Week_Start_Date' could not be parsed. "
+                                         "Please ensure they are in the correct format (YYYY-MM-DD).")
+            elif invalid_values[district]:
+                self.errors[district] = "Weather data contains missing or non-numeric values."
+            elif first_week[district] != start:
+                found = first_week[district].strftime('%Y-%m-%d') if pd.notna(first_week[district]) else 'none'
+                self.errors[district] = f"Weather data must start on {WEATHER_START_DATE} (first week found: {found})."
+
+        df = df[~df['District'].isin(list(self.errors)) & (df['Week_Start_Date'] >= start)]
+        df = df.sort_values(['District', 'Week_Start_Date'], kind='stable').reset_index(drop=True)
+        df['District'] = df['District'].cat.remove_unused_categories()
+        return df[columns]
+
+    @classmethod
+    def from_directory(cls, weather_dir: str = WEATHER_DATA_DIR) -> 'CovariateStore':
+        """
+        Load every '<District>_weather_data.csv' file of a directory.
+
+        Args:
+            weather_dir (str): Directory containing the district weather files.
+
+        Returns:
+            CovariateStore: Store of the districts found in the directory.
+        """
+        frames = {
+            os.path.basename(path)[:-len(WEATHER_FILE_SUFFIX)]: pd.read_csv(path)
+            for path in sorted(glob.glob(os.path.join(weather_dir, f'*{WEATHER_FILE_SUFFIX}')))
+        }
+        store = cls(frames)
+        logger.info(f"Loaded weather covariates of {len(store.districts)} districts from {weather_dir}")
+        for district, error in store.errors.items():
+            logger.warning(f"Invalid weather data for {district}: {error}")
+        return store
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """Weather of all valid districts, sorted by District and Week_Start_Date."""
+        return self._data
+
+    @property
+    def districts(self) -> List[str]:
+        """Districts with valid weather data."""
+        return list(self._bounds)
+
+    def weeks(self, district: str) -> int:
+        """Number of weeks of weather data of a district (0 if it has none)."""
+        start, stop = self._bounds.get(district, (0, 0))
+        return stop - start
+
+    def _rows(self, district: str, n_weeks: int, after: Optional[pd.Timestamp]) -> Tuple[int, int]:
+        # Positions of the district's weeks ending after `after`, checked to cover n_weeks
+        if district in self.errors:
+            raise ValueError(self.errors[district])
+        if district not in self._bounds:
+            raise KeyError(f"No weather data for {district}")
+        start, stop = self._bounds[district]
+        if after is not None:
+            start += int(self._data['Week_End_Date'].iloc[start:stop].searchsorted(pd.Timestamp(after), side='right'))
+        if stop - start < n_weeks:
+            raise ValueError(f"The weather data contains only {stop - start} weeks, "
+                             f"but {n_weeks} weeks are required for forecasting.")
+        return start, stop
+
+    def weather_data(self, district: str, n_weeks: int, max_weeks: Optional[int] = None,
+                     after: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """
+        Weather data of a district for an n_weeks forecast.
+
+        Args:
+            district (str): Name of the district.
+            n_weeks (int): Number of weeks to forecast.
+            max_weeks (int, optional): Return up to this many weeks instead of exactly n_weeks.
+            after (pd.Timestamp, optional): Only use weeks ending after this date,
+                e.g. the training end of a model (see get_training_end).
+
+        Returns:
+            pd.DataFrame: 'Week_End_Date' and the columns in WEATHER_COVARIATE_COLUMNS.
+
+        Raises:
+            KeyError: If the store has no weather data for the district.
+            ValueError: If the district's data is invalid or shorter than n_weeks.
+        """
+        start, stop = self._rows(district, n_weeks, after)
+        stop = min(stop, start + max(n_weeks, max_weeks or 0))
+        return self._data.iloc[start:stop][['Week_End_Date'] + WEATHER_COVARIATE_COLUMNS].reset_index(drop=True)
+
+    def timeseries(self, district: str, n_weeks: int, max_weeks: Optional[int] = None,
+                   after: Optional[pd.Timestamp] = None) -> 'TimeSeries':
+        """
+        Future-covariate TimeSeries of a district, built once per length and memoized.
+
+        Args:
+            district (str): Name of the district.
+            n_weeks (int): Number of weeks to forecast.
+            max_weeks (int, optional): Cover up to this many weeks, see weather_data.
+            after (pd.Timestamp, optional): Only use weeks ending after this date.
+
+        Returns:
+            TimeSeries: Covariates ready for forecast_cases.
+        """
+        weather_data = self.weather_data(district, n_weeks, max_weeks, after)
+        key = (district, weather_data['Week_End_Date'].iloc[0], len(weather_data))
+        with self._lock:
+            series = self._series.get(key)
+        if series is None:
+            series = weather_to_timeseries(weather_data)
+            with self._lock:
+                self._series[key] = series
+        return series
+
+    def fingerprint(self, district: str) -> str:
+        """
+        Hash of a district's weather data, computed once.
+
+        Args:
+            district (str): Name of the district.
+
+        Returns:
+            str: Hex SHA-256 digest, or 'none' if the store has no valid data for the district.
+        """
+        with self._lock:
+            fingerprint = self._fingerprints.get(district)
+        if fingerprint is None:
+            start, stop = self._bounds.get(district, (0, 0))
+            fingerprint = dataframe_fingerprint(
+                self._data.iloc[start:stop][['Week_End_Date'] + WEATHER_COVARIATE_COLUMNS] if stop else None)
+            with self._lock:
+                self._fingerprints[district] = fingerprint
+        return fingerprint
+
+
+_covariate_store: Optional[CovariateStore] = None
+_covariate_store_lock = threading.Lock()
+
+
+def get_covariate_store() -> CovariateStore:
+    """
+    Process-wide CovariateStore of the bundled WEATHER_DATA_DIR.
+
+    Returns:
+        CovariateStore: Shared covariate store.
+    """
+    global _covariate_store
+    with _covariate_store_lock:
+        if _covariate_store is None:
+            _covariate_store = CovariateStore.from_directory()
+        return _covariate_store
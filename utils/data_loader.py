@@ -1,27 +1,336 @@
 # src/data_loader.py
+import numpy as np
 import pandas as pd
 import os
+import re
+import json
+import shutil
+import tempfile
 
-def load_data(data_file: str) -> pd.DataFrame:
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from config.constants import (COMPACT_SCHEMA, DATA_STORE_DIR, DISTRICT_WITH_WEATHER_FIELD, WEATHER_COVARIATE_COLUMNS,
+                              WEATHER_START_DATE)
+from utils.hashing import file_sha256
+from utils.logger import logger
+from utils.tracing import traced
+
+if TYPE_CHECKING:
+    from darts import TimeSeries
+
+REQUIRED_COLUMNS = {'District', 'Number_of_Cases', 'Week_Start_Date', 'Month', 'Year', 'Week', 'Week_End_Date', 'Avg Max Temp (°C)', 'Avg Apparent Max Temp (°C)', 'Avg Apparent Min Temp (°C)', 'Total Precipitation (mm)', 'Total Rain (mm)', 'Avg Wind Speed (km/h)', 'Max Wind Gusts (km/h)', 'Weather Code', 'Avg Daylight Duration (hours)', 'Avg Sunrise Time', 'Avg Sunset Time'}
+
+
+# Dtypes of the historical data in the compact schema (see compact_schema)
+COMPACT_DTYPES = {
+    'District': 'category',
+    'Number_of_Cases': 'int32',
+    'Week_Start_Date': 'datetime64[ns]',
+    'Week_End_Date': 'datetime64[ns]',
+    'Month': 'int8',
+    'Year': 'int16',
+    'Week': 'int8',
+    'Weather Code': 'int16',
+    'Avg Sunrise Time': 'int16',
+    'Avg Sunset Time': 'int16',
+    **{col: 'float32' for col in ['Avg Max Temp (°C)', 'Avg Min Temp (°C)', 'Avg Apparent Max Temp (°C)',
+                                  'Avg Apparent Min Temp (°C)', 'Total Precipitation (mm)', 'Total Rain (mm)',
+                                  'Avg Wind Speed (km/h)', 'Max Wind Gusts (km/h)', 'Avg Daylight Duration (hours)']},
+}
+
+
+def compact_schema(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Load historical dengue cases data from a CSV file.
-    
+    Convert the historical data to the dtypes in COMPACT_DTYPES.
+
+    Integer columns with missing values (e.g. weeks appended without weather)
+    become float32; an integer column whose values do not fit its compact
+    dtype keeps its dtype.
+
+    Args:
+        df (pd.DataFrame): Historical data as read from the CSV.
+
+    Returns:
+        pd.DataFrame: The data with compact dtypes.
+    """
+    dtypes = {}
+    for col, dtype in COMPACT_DTYPES.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        if dtype.startswith('int'):
+            values = df[col]
+            if values.isna().any():
+                dtype = 'float32'
+            elif not np.iinfo(dtype).min <= values.min() <= values.max() <= np.iinfo(dtype).max:
+                logger.warning(f"Values of '{col}' do not fit {dtype}, keeping {values.dtype}")
+                continue
+        dtypes[col] = dtype
+    return df.astype(dtypes)
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Memory used by each column of the historical data, as loaded and in the compact schema.
+
+    Args:
+        df (pd.DataFrame): Historical data.
+
+    Returns:
+        pd.DataFrame: 'column', 'dtype', 'bytes', 'compact_dtype' and 'compact_bytes', with a 'Total' row.
+    """
+    compact = compact_schema(df)
+    report = pd.DataFrame({
+        'column': df.columns,
+        'dtype': df.dtypes.astype(str).values,
+        'bytes': df.memory_usage(index=False, deep=True).values,
+        'compact_dtype': compact.dtypes.astype(str).values,
+        'compact_bytes': compact.memory_usage(index=False, deep=True).values,
+    })
+    total = pd.DataFrame([{'column': 'Total', 'dtype': '', 'bytes': report['bytes'].sum(),
+                           'compact_dtype': '', 'compact_bytes': report['compact_bytes'].sum()}])
+    return pd.concat([report, total], ignore_index=True)
+
+
+def _read_csv(data_file: str) -> pd.DataFrame:
+    df = pd.read_csv(data_file, parse_dates=['Week_Start_Date', 'Week_End_Date'])
+
+    # Validate required columns
+    if not REQUIRED_COLUMNS.issubset(df.columns):
+        missing = REQUIRED_COLUMNS - set(df.columns)
+        raise ValueError(f"Missing required columns in data: {missing}")
+
+    df['District'] = df['District'].astype('category')
+    return df
+
+
+def get_store_dir(data_file: str, store_dir: str = DATA_STORE_DIR) -> str:
+    """
+    Directory of the columnar store built from a CSV data file.
+
+    Args:
+        data_file (str): Path to the CSV data file.
+        store_dir (str): Root directory of the columnar stores.
+
+    Returns:
+        str: Store directory for data_file.
+    """
+    name = re.sub(r'[^0-9A-Za-z]+', '_', os.path.splitext(os.path.basename(data_file))[0]).strip('_')
+    return os.path.join(store_dir, name)
+
+
+def _read_manifest(store_path: str) -> dict:
+    try:
+        with open(os.path.join(store_path, 'source.json'), 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def convert_to_parquet(data_file: str, store_dir: str = DATA_STORE_DIR) -> str:
+    """
+    Convert the historical CSV into a Parquet dataset partitioned by District.
+
+    Dates are stored as datetime64 and District as a categorical partition key,
+    so reading one district only touches that district's file. The store is
+    written to a temporary directory and swapped in, so readers never see a
+    partially written store.
+
     Args:
         data_file (str): Path to the CSV data file.
-        
+        store_dir (str): Root directory of the columnar stores.
+
+    Returns:
+        str: Path of the written store.
+    """
+    if not os.path.exists(data_file):
+        raise FileNotFoundError(f"Data file not found: {data_file}")
+
+    store_path = get_store_dir(data_file, store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+
+    df = _read_csv(data_file)
+    stat = os.stat(data_file)
+    manifest = {
+        'source': data_file,
+        'mtime': stat.st_mtime,
+        'size': stat.st_size,
+        'sha256': file_sha256(data_file),
+        'columns': list(df.columns)
+    }
+
+    tmp_path = tempfile.mkdtemp(dir=store_dir, prefix='.tmp-')
+    try:
+        df.to_parquet(os.path.join(tmp_path, 'dataset'), engine='pyarrow', partition_cols=['District'], index=False)
+        with open(os.path.join(tmp_path, 'source.json'), 'w') as file:
+            json.dump(manifest, file, indent=2)
+
+        old_path = None
+        if os.path.exists(store_path):
+            old_path = tempfile.mkdtemp(dir=store_dir, prefix='.old-')
+            os.replace(store_path, os.path.join(old_path, 'store'))
+        os.replace(tmp_path, store_path)
+        if old_path:
+            shutil.rmtree(old_path, ignore_errors=True)
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+    logger.info(f"Built columnar store {store_path} from {data_file}")
+    return store_path
+
+
+def ensure_store(data_file: str, store_dir: str = DATA_STORE_DIR) -> str:
+    """
+    Return an up-to-date columnar store for data_file, rebuilding it if the CSV changed.
+
+    The CSV's mtime and size are checked first; the content hash is only
+    computed when they differ from the store's manifest.
+
+    Args:
+        data_file (str): Path to the CSV data file.
+        store_dir (str): Root directory of the columnar stores.
+
+    Returns:
+        str: Path of the store.
+    """
+    store_path = get_store_dir(data_file, store_dir)
+    manifest = _read_manifest(store_path)
+    stat = os.stat(data_file)
+
+    if manifest and (manifest.get('mtime'), manifest.get('size')) == (stat.st_mtime, stat.st_size):
+        return store_path
+
+    if manifest and manifest.get('sha256') == file_sha256(data_file):
+        manifest.update(mtime=stat.st_mtime, size=stat.st_size)
+        with open(os.path.join(store_path, 'source.json'), 'w') as file:
+            json.dump(manifest, file, indent=2)
+        return store_path
+
+    return convert_to_parquet(data_file, store_dir)
+
+
+@traced()
+def load_data(data_file: str, district: Optional[str] = None, use_store: bool = True,
+              compact: Optional[bool] = None) -> pd.DataFrame:
+    """
+    Load historical dengue cases data.
+
+    Data is read from the columnar store built from the CSV (see
+    convert_to_parquet), which is rebuilt automatically when the CSV changes.
+    If the store cannot be used, the CSV is parsed directly. The store keeps
+    the CSV's dtypes; the compact schema is applied after reading.
+
+    Args:
+        data_file (str): Path to the CSV data file.
+        district (str, optional): Only load the rows of this district.
+        use_store (bool): Whether to read through the columnar store.
+        compact (bool, optional): Convert to COMPACT_DTYPES (see compact_schema);
+            COMPACT_SCHEMA by default.
+
     Returns:
         pd.DataFrame: DataFrame containing the data.
     """
     if not os.path.exists(data_file):
         raise FileNotFoundError(f"Data file not found: {data_file}")
-    
-    df = pd.read_csv(data_file, parse_dates=['Week_Start_Date', 'Week_End_Date'])
-    
-    # Validate required columns
-    										
-    required_columns = {'District', 'Number_of_Cases', 'Week_Start_Date', 'Month', 'Year', 'Week', 'Week_End_Date', 'Avg Max Temp (°C)', 'Avg Apparent Max Temp (°C)', 'Avg Apparent Min Temp (°C)', 'Total Precipitation (mm)', 'Total Rain (mm)', 'Avg Wind Speed (km/h)', 'Max Wind Gusts (km/h)', 'Weather Code', 'Avg Daylight Duration (hours)', 'Avg Sunrise Time', 'Avg Sunset Time'}
-    if not required_columns.issubset(df.columns):
-        missing = required_columns - set(df.columns)
-        raise ValueError(f"Missing required columns in data: {missing}")
-    
+
+    df = None
+    if use_store:
+        try:
+            store_path = ensure_store(data_file)
+            filters = [('District', '==', district)] if district is not None else None
+            df = pd.read_parquet(os.path.join(store_path, 'dataset'), engine='pyarrow', filters=filters)
+            df = df[_read_manifest(store_path)['columns']]
+        except (ImportError, OSError, ValueError, KeyError) as e:
+            logger.warning(f"Columnar store unavailable, reading {data_file} as CSV: {e}")
+
+    if df is None:
+        df = _read_csv(data_file)
+        if district is not None:
+            df = df[df['District'] == district].reset_index(drop=True)
+
+    if COMPACT_SCHEMA if compact is None else compact:
+        full_bytes = df.memory_usage(index=False, deep=True).sum()
+        df = compact_schema(df)
+        if district is None:
+            compact_bytes = df.memory_usage(index=False, deep=True).sum()
+            logger.info(f"Loaded {len(df)} rows of {data_file}: {compact_bytes / 1e6:.1f} MB in the compact schema "
+                        f"({full_bytes / 1e6:.1f} MB as read)")
     return df
+
+
+def load_district_series(data_file: str, district: str) -> Tuple['TimeSeries', Optional['TimeSeries']]:
+    """
+    Load the case series of a district and, for weather-driven districts, its observed weather.
+
+    Args:
+        data_file (str): Path to the CSV data file.
+        district (str): Name of the district.
+
+    Returns:
+        Tuple[TimeSeries, TimeSeries]: 'Number_of_Cases' series and the
+            WEATHER_COVARIATE_COLUMNS series (None if the district does not use weather).
+    """
+    from darts import TimeSeries
+
+    requires_weather = district in DISTRICT_WITH_WEATHER_FIELD
+    value_cols = ['Number_of_Cases'] + (WEATHER_COVARIATE_COLUMNS if requires_weather else [])
+    # Models are trained and evaluated on the values at full precision
+    data = load_data(data_file, district=district, compact=False).sort_values('Week_End_Date')
+    series = TimeSeries.from_dataframe(data, time_col='Week_End_Date', value_cols=value_cols)
+    return series['Number_of_Cases'], (series[WEATHER_COVARIATE_COLUMNS] if requires_weather else None)
+
+
+def prepare_weather_data(weather_df: pd.DataFrame, n_weeks: int, max_weeks: Optional[int] = None,
+                         after: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Validate future weather data and select the weeks used for an n_weeks forecast.
+
+    The data is validated by CovariateStore, so uploaded, posted and bundled
+    weather files follow the same rules.
+
+    Args:
+        weather_df (pd.DataFrame): Weekly weather data with 'Week_Start_Date',
+            'Week_End_Date' and the columns in WEATHER_COVARIATE_COLUMNS.
+        n_weeks (int): Number of weeks to forecast.
+        max_weeks (int, optional): Return up to this many weeks instead of
+            exactly n_weeks, e.g. to forecast once at the longest horizon.
+        after (pd.Timestamp, optional): Only use weeks ending after this date,
+            e.g. the training end of a model (see get_training_end).
+
+    Returns:
+        pd.DataFrame: The first n_weeks (or up to max_weeks) of weather data
+            starting at WEATHER_START_DATE (or after `after`).
+
+    Raises:
+        ValueError: If the data is invalid (see CovariateStore) or fewer than n_weeks weeks are available.
+    """
+    from utils.covariate_store import CovariateStore
+
+    store = CovariateStore({'weather': weather_df})
+    if 'weather' not in store.errors and not store.weeks('weather'):
+        raise ValueError(f"The weather data contains no weeks from {WEATHER_START_DATE}.")
+    return store.weather_data('weather', n_weeks, max_weeks, after)
+
+
+def load_weather_data(weather_file: str, n_weeks: int, max_weeks: Optional[int] = None,
+                      after: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Load the future weather data of a district for an n_weeks forecast.
+
+    Args:
+        weather_file (str): Path to a '<District>_weather_data.csv' file.
+        n_weeks (int): Number of weeks to forecast.
+        max_weeks (int, optional): Return up to this many weeks, see prepare_weather_data.
+        after (pd.Timestamp, optional): Only use weeks ending after this date.
+
+    Returns:
+        pd.DataFrame: The first n_weeks (or up to max_weeks) of weather data
+            starting at WEATHER_START_DATE.
+
+    Raises:
+        FileNotFoundError: If the weather file does not exist.
+        ValueError: If the data is invalid or fewer than n_weeks weeks are available.
+    """
+    if not os.path.exists(weather_file):
+        raise FileNotFoundError(f"Weather file not found: {weather_file}")
+
+    return prepare_weather_data(pd.read_csv(weather_file), n_weeks, max_weeks, after)
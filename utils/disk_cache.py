@@ -0,0 +1,125 @@
+# src/disk_cache.py
+import os
+import pickle
+import tempfile
+import threading
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.logger import logger
+
+
+class DiskCache:
+    """
+    Size-bounded on-disk cache of picklable values.
+
+    Each entry is a pickle file in cache_dir, so the cache survives restarts
+    and can be shared by every session and replica that mounts the same
+    directory. Reads refresh an entry's mtime and writes evict the least
+    recently used entries once the directory grows beyond max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.pkl')
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up the value stored under key.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            The cached value, or None on a miss.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            value = None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any):
+        """
+        Store a value under key and evict old entries if over budget.
+
+        Args:
+            key (str): Cache key.
+            value: Picklable value to store.
+        """
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        # (mtime, size, path) of every entry; other replicas may delete files concurrently
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.pkl'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+
+    def clear(self):
+        """Remove every cache entry."""
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit/miss counters of this process and the current size of the cache.
+
+        Returns:
+            Dict[str, int]: 'hits', 'misses', 'entries' and 'bytes'.
+        """
+        entries = self._entries()
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries)
+            }
@@ -0,0 +1,117 @@
+# src/district_index.py
+import threading
+import pandas as pd
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from utils.data_loader import load_data
+from utils.tracing import get_tracer
+
+if TYPE_CHECKING:
+    from darts import TimeSeries
+
+
+class DistrictIndex:
+    """
+    District-indexed access to the national dataset.
+
+    The data is sorted by District once so each district occupies a contiguous
+    block of rows. get() then returns that block as a positional slice (a view,
+    no boolean mask over the whole table and no copy) and timeseries() builds
+    and memoizes the district's darts TimeSeries.
+
+    Frames returned by get() share memory with the index and must not be
+    modified in place.
+
+    When data is in the compact schema (see compact_schema), pass its
+    data_file: model inputs (timeseries() and full_precision()) are then read
+    from the file at full precision, one district at a time, so SHAP inputs do
+    not depend on COMPACT_SCHEMA.
+    """
+
+    def __init__(self, data: pd.DataFrame, data_file: Optional[str] = None):
+        if not data['District'].is_monotonic_increasing:
+            data = data.sort_values(['District', 'Week_End_Date'], kind='stable')
+        self._data = data.reset_index(drop=True)
+
+        self._bounds: Dict[str, Tuple[int, int]] = {
+            district: (positions[0], positions[-1] + 1)
+            for district, positions in self._data.groupby('District', observed=True, sort=False).indices.items()
+        }
+        self.data_file = data_file
+        self._series: Dict[Tuple[str, Tuple[str, ...]], 'TimeSeries'] = {}
+        self._full: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """The full dataset, sorted by District."""
+        return self._data
+
+    @property
+    def districts(self) -> List[str]:
+        """Districts present in the data."""
+        return list(self._bounds)
+
+    def get(self, district: str) -> pd.DataFrame:
+        """
+        Rows of one district.
+
+        Args:
+            district (str): Name of the district.
+
+        Returns:
+            pd.DataFrame: The district's rows, empty if the district is unknown.
+        """
+        with get_tracer().span('district_filter', district=district):
+            start, stop = self._bounds.get(district, (0, 0))
+            return self._data.iloc[start:stop]
+
+    def full_precision(self, district: str) -> pd.DataFrame:
+        """
+        Rows of one district at full precision, loaded once from data_file.
+
+        Args:
+            district (str): Name of the district.
+
+        Returns:
+            pd.DataFrame: The district's rows sorted by 'Week_End_Date'; the rows
+                of get() if the index has no data_file.
+        """
+        if self.data_file is None:
+            return self.get(district)
+        with self._lock:
+            rows = self._full.get(district)
+        if rows is None:
+            rows = load_data(self.data_file, district=district, compact=False)
+            rows = rows.sort_values('Week_End_Date', kind='stable').reset_index(drop=True)
+            with self._lock:
+                self._full[district] = rows
+        return rows
+
+    def timeseries(self, district: str, value_cols: Sequence[str]) -> 'TimeSeries':
+        """
+        TimeSeries of the given columns for one district, built once and memoized
+        from the full-precision rows (see full_precision).
+
+        Args:
+            district (str): Name of the district.
+            value_cols (Sequence[str]): Columns to include as components.
+
+        Returns:
+            TimeSeries: Weekly series indexed by 'Week_End_Date'.
+        """
+        key = (district, tuple(value_cols))
+        with self._lock:
+            series = self._series.get(key)
+        if series is None:
+            from darts import TimeSeries
+
+            series = TimeSeries.from_dataframe(
+                self.full_precision(district),
+                time_col='Week_End_Date',
+                value_cols=list(value_cols)
+            )
+            with self._lock:
+                self._series[key] = series
+        return series
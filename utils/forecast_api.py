@@ -0,0 +1,352 @@
+# src/forecast_api.py
+import io
+import json
+import asyncio
+import threading
+import pandas as pd
+import pyarrow as pa
+
+from aiohttp import web
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from config.constants import (CONFIG_FILE, DATA_FILE, DISTRICT_WITH_WEATHER_FIELD, DISTRICT_WITHOUT_SHAP_EXPLANATION,
+                              WEATHER_COVARIATE_COLUMNS, WEATHER_DATA_DIR)
+from utils.batch_forecast import load_districts
+from utils.covariate_store import CovariateStore
+from utils.data_loader import load_data, prepare_weather_data
+from utils.district_index import DistrictIndex
+from utils.inference import get_inference_guard
+from utils.logger import logger
+from utils.model_handler import (get_max_forecast_weeks, get_model_family, get_month_options, get_training_end,
+                                 weather_to_timeseries)
+from utils.model_manifest import get_model_manifest
+from utils.model_registry import ModelRegistry
+from utils.prediction_batcher import PredictionBatcher
+from utils.shap_service import get_shap_service
+from utils.shap_utils import build_foreground_series
+from utils.single_flight import single_flight_stats
+from utils.tracing import get_tracer
+
+ARROW_CONTENT_TYPE = 'application/vnd.apache.arrow.stream'
+MAX_FORECAST_WEEKS = 52
+
+
+class ModelUnavailableError(Exception):
+    """Raised when a configured district's model cannot be served (e.g. missing artifacts)."""
+
+
+class ForecastService:
+    """
+    Forecasts and SHAP explanations of the configured districts, independent of Streamlit.
+
+    All requests share one ModelRegistry. Forecasts go through a
+    PredictionBatcher so concurrent requests of a model family are predicted
+    together; SHAP explanations run on a thread pool through the shared
+    ShapExplainerService.
+    """
+
+    def __init__(
+        self,
+        registry: Optional[ModelRegistry] = None,
+        config_path: str = CONFIG_FILE,
+        weather_dir: str = WEATHER_DATA_DIR,
+        data_file: str = DATA_FILE,
+        batch_window_seconds: float = 0.01,
+        max_batch_size: int = 32,
+        shap_workers: int = 2
+    ):
+        self.registry = registry or ModelRegistry()
+        self.districts = {entry['name']: entry['model_file'] for entry in load_districts(config_path)}
+        # Models with missing artifacts are reported at startup rather than on first request
+        self.problems = get_model_manifest().problems(self.districts.values())
+        for model_file, problem in self.problems.items():
+            logger.warning(f"{model_file}: {problem}")
+        self.weather_dir = weather_dir
+        self._covariates: Optional[CovariateStore] = None
+        self._covariates_lock = threading.Lock()
+        self.data_file = data_file
+        self.batcher = PredictionBatcher(self.registry, batch_window_seconds, max_batch_size)
+        self._shap_executor = ThreadPoolExecutor(max_workers=shap_workers, thread_name_prefix='shap')
+        self._district_index: Optional[DistrictIndex] = None
+        self._district_index_lock = threading.Lock()
+
+    def model_file(self, district: str) -> str:
+        """
+        Model file of a configured district.
+
+        Raises:
+            KeyError: If the district is not configured.
+            ModelUnavailableError: If the model's artifacts are missing.
+        """
+        if district not in self.districts:
+            raise KeyError(f"Unknown district: {district}")
+        if self.districts[district] in self.problems:
+            raise ModelUnavailableError(f"Model for {district} is unavailable. {self.problems[self.districts[district]]}")
+        return self.districts[district]
+
+    def district_index(self) -> DistrictIndex:
+        """Historical data of all districts, loaded on first use."""
+        with self._district_index_lock:
+            if self._district_index is None:
+                self._district_index = DistrictIndex(load_data(self.data_file), self.data_file)
+            return self._district_index
+
+    def covariates(self) -> CovariateStore:
+        """Bundled weather data of all districts, loaded on first use."""
+        with self._covariates_lock:
+            if self._covariates is None:
+                self._covariates = CovariateStore.from_directory(self.weather_dir)
+            return self._covariates
+
+    async def training_end(self, district: str) -> Optional[pd.Timestamp]:
+        """Last training week of a district's model, loading the model off the event loop if needed."""
+        model = await asyncio.get_running_loop().run_in_executor(None, self.registry.get, self.model_file(district))
+        return get_training_end(model)
+
+    def weather_data(self, district: str, n_weeks: int, weather_df: Optional[pd.DataFrame] = None,
+                     max_weeks: Optional[int] = None, after: Optional[pd.Timestamp] = None) -> Optional[pd.DataFrame]:
+        """
+        Future weather of a district: the supplied weather_df, else the bundled weather data.
+
+        Only weeks ending after `after` (the training end of the model) are used.
+        Returns None for districts whose models do not use weather covariates.
+        """
+        if district not in DISTRICT_WITH_WEATHER_FIELD:
+            return None
+        if weather_df is not None:
+            return prepare_weather_data(weather_df, n_weeks, max_weeks, after)
+        return self.covariates().weather_data(district, n_weeks, max_weeks, after)
+
+    async def forecast(self, district: str, n_weeks: int, weather_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Forecast dengue cases of one district.
+
+        The model is predicted at the district's longest forecast duration (as
+        far as the weather data reaches) and sliced, so requests for different
+        durations share one prediction.
+
+        Args:
+            district (str): Name of the district.
+            n_weeks (int): Number of weeks to forecast.
+            weather_df (pd.DataFrame, optional): Future weather to use instead of the bundled file.
+
+        Returns:
+            pd.DataFrame: Columns 'District', 'Week_End_Date' and 'predicted_cases'.
+        """
+        model_file = self.model_file(district)
+        get_tracer().set_labels(district=district, family=get_model_family(model_file))
+        max_weeks = max(n_weeks, get_max_forecast_weeks(district))
+        training_end = await self.training_end(district)
+        weather_data = self.weather_data(district, n_weeks, weather_df, max_weeks, training_end)
+        if weather_data is not None:
+            # The bundled covariate series are built once by the covariate store
+            covariates = (self.covariates().timeseries(district, n_weeks, max_weeks, training_end) if weather_df is None
+                          else weather_to_timeseries(weather_data))
+            horizon_weeks = len(weather_data)
+        else:
+            horizon_weeks, covariates = max_weeks, None
+        forecast_df = await self.batcher.forecast(model_file, horizon_weeks, covariates)
+        return forecast_df.head(n_weeks).assign(District=district)[['District', 'Week_End_Date', 'predicted_cases']]
+
+    async def forecast_many(self, districts: List[str], n_weeks: int) -> pd.DataFrame:
+        """
+        Forecast several districts concurrently.
+
+        Args:
+            districts (List[str]): Names of the districts.
+            n_weeks (int): Number of weeks to forecast.
+
+        Returns:
+            pd.DataFrame: Long-format forecasts of all districts.
+        """
+        forecasts = await asyncio.gather(*(self.forecast(district, n_weeks) for district in districts))
+        return pd.concat(forecasts, ignore_index=True)
+
+    async def explain(self, district: str, n_weeks: int, weather_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        SHAP values of a district's forecast at horizon n_weeks.
+
+        Args:
+            district (str): Name of the district.
+            n_weeks (int): Number of weeks to forecast.
+            weather_df (pd.DataFrame, optional): Future weather to use instead of the bundled file.
+
+        Returns:
+            pd.DataFrame: One row per explained week with a column per feature.
+
+        Raises:
+            ValueError: If SHAP explanations are not available for the district.
+        """
+        if district in DISTRICT_WITHOUT_SHAP_EXPLANATION:
+            raise ValueError(f"SHAP explanations are not available for {district}")
+
+        model_file = self.model_file(district)
+        weather_data = self.weather_data(district, n_weeks, weather_df, after=await self.training_end(district))
+        forecast_df = await self.forecast(district, n_weeks, weather_df)
+
+        def _explain():
+            get_tracer().set_labels(district=district, family=get_model_family(model_file))
+            model = self.registry.get(model_file)
+            district_index = self.district_index()
+            requires_weather = weather_data is not None
+            series = district_index.timeseries(
+                district, ['Number_of_Cases'] + (WEATHER_COVARIATE_COLUMNS if requires_weather else []))
+            foreground, foreground_covariates = build_foreground_series(
+                district_index.full_precision(district), forecast_df, weather_data)
+            results, _ = get_shap_service().explain(
+                model, model_file, series['Number_of_Cases'],
+                series[WEATHER_COVARIATE_COLUMNS] if requires_weather else None,
+                foreground, foreground_covariates, horizon=n_weeks
+            )
+            return results.get_explanation(horizon=n_weeks).pd_dataframe().rename_axis('Week_End_Date').reset_index()
+
+        return await asyncio.get_running_loop().run_in_executor(self._shap_executor, _explain)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Model registry, batching, inference, SHAP cache, request coalescing and per-stage latency metrics."""
+        return {'models': self.registry.metrics(), 'batching': self.batcher.stats(),
+                'inference': get_inference_guard().stats(), 'shap': get_shap_service().stats(),
+                'single_flight': single_flight_stats(), 'tracing': get_tracer().snapshot()}
+
+
+def _wants_arrow(request: web.Request) -> bool:
+    fmt = request.query.get('format')
+    if fmt:
+        return fmt == 'arrow'
+    return ARROW_CONTENT_TYPE in request.headers.get('Accept', '')
+
+
+def _table_response(request: web.Request, df: pd.DataFrame) -> web.Response:
+    if _wants_arrow(request):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return web.Response(body=sink.getvalue().to_pybytes(), content_type=ARROW_CONTENT_TYPE)
+    records = df.assign(Week_End_Date=df['Week_End_Date'].dt.strftime('%Y-%m-%d')).to_dict(orient='records')
+    return web.json_response(records)
+
+
+def _error(status: int, message: str) -> web.Response:
+    return web.json_response({'error': message}, status=status)
+
+
+def _http_error(error_class: type, message: str) -> web.HTTPException:
+    # HTTP exceptions raised by the handlers, with the same JSON body as _error
+    return error_class(text=json.dumps({'error': message}), content_type='application/json')
+
+
+def _check_districts(service: ForecastService, districts: List[str]):
+    unknown = [district for district in districts if district not in service.districts]
+    if unknown:
+        raise _http_error(web.HTTPNotFound, f"Unknown district: {', '.join(unknown)}")
+
+
+def _parse_weeks(value: Any) -> int:
+    n_weeks = int(value)
+    if not 1 <= n_weeks <= MAX_FORECAST_WEEKS:
+        raise ValueError(f"weeks must be between 1 and {MAX_FORECAST_WEEKS}")
+    return n_weeks
+
+
+async def _read_weather(request: web.Request) -> Optional[pd.DataFrame]:
+    # Covariates are accepted as an Arrow IPC stream or as JSON {"weather": [records]}
+    if not request.can_read_body:
+        return None
+    if request.content_type == ARROW_CONTENT_TYPE:
+        return pa.ipc.open_stream(io.BytesIO(await request.read())).read_pandas()
+    body = await request.json()
+    if not isinstance(body, dict):
+        raise _http_error(web.HTTPBadRequest, 'The request body must be a JSON object {"weather": [records]}')
+    return pd.DataFrame(body['weather']) if body.get('weather') is not None else None
+
+
+@web.middleware
+async def _error_middleware(request: web.Request, handler):
+    try:
+        return await handler(request)
+    except web.HTTPException:
+        raise
+    except (ValueError, TypeError, pa.ArrowInvalid) as e:
+        return _error(400, str(e))
+    except (ModelUnavailableError, FileNotFoundError) as e:
+        # Missing models or data files on the server, not a problem of the request
+        return _error(503, str(e))
+    except Exception as e:
+        logger.exception(f"Request {request.method} {request.path} failed")
+        return _error(500, f"{type(e).__name__}: {e}")
+
+
+def create_app(service: Optional[ForecastService] = None) -> web.Application:
+    """
+    Build the aiohttp application of the forecast HTTP service.
+
+    Endpoints (tables are JSON records, or an Arrow IPC stream with ?format=arrow
+    or 'Accept: application/vnd.apache.arrow.stream'):
+
+    - GET  /health
+    - GET  /districts: configured districts, model families, forecast durations and availability.
+    - GET  /forecast/{district}?weeks=12: forecast with the bundled weather data.
+    - POST /forecast/{district}?weeks=12: forecast with supplied weather covariates,
+      as JSON {"weather": [records]} or an Arrow IPC stream.
+    - GET  /forecast?districts=A,B&weeks=12: multi-district forecast (all available districts if omitted).
+    - GET|POST /explain/{district}?weeks=12: SHAP values of the forecast.
+    - GET  /metrics: model registry, batching, SHAP cache, request coalescing and per-stage latency metrics.
+
+    Args:
+        service (ForecastService, optional): Service to expose, created with defaults if omitted.
+
+    Returns:
+        web.Application: The application.
+    """
+    service = service or ForecastService()
+    routes = web.RouteTableDef()
+
+    @routes.get('/health')
+    async def health(request):
+        return web.json_response({'status': 'ok'})
+
+    @routes.get('/districts')
+    async def districts(request):
+        return web.json_response([
+            {'name': name, 'model_file': model_file, 'model_family': get_model_family(model_file),
+             'requires_weather': name in DISTRICT_WITH_WEATHER_FIELD,
+             'shap': name not in DISTRICT_WITHOUT_SHAP_EXPLANATION,
+             'weeks': get_month_options(name),
+             'available': model_file not in service.problems}
+            for name, model_file in service.districts.items()
+        ])
+
+    @routes.get('/forecast')
+    async def forecast_many(request):
+        names = [name for name in request.query.get('districts', '').split(',') if name] or [
+            name for name, model_file in service.districts.items() if model_file not in service.problems]
+        _check_districts(service, names)
+        n_weeks = _parse_weeks(request.query.get('weeks', 12))
+        return _table_response(request, await service.forecast_many(names, n_weeks))
+
+    @routes.get('/forecast/{district}')
+    @routes.post('/forecast/{district}')
+    async def forecast(request):
+        _check_districts(service, [request.match_info['district']])
+        n_weeks = _parse_weeks(request.query.get('weeks', 12))
+        weather_df = await _read_weather(request) if request.method == 'POST' else None
+        return _table_response(request, await service.forecast(request.match_info['district'], n_weeks, weather_df))
+
+    @routes.get('/explain/{district}')
+    @routes.post('/explain/{district}')
+    async def explain(request):
+        _check_districts(service, [request.match_info['district']])
+        n_weeks = _parse_weeks(request.query.get('weeks', 12))
+        weather_df = await _read_weather(request) if request.method == 'POST' else None
+        return _table_response(request, await service.explain(request.match_info['district'], n_weeks, weather_df))
+
+    @routes.get('/metrics')
+    async def metrics(request):
+        return web.json_response(service.metrics())
+
+    app = web.Application(middlewares=[_error_middleware])
+    app.add_routes(routes)
+    app['service'] = service
+    return app
@@ -0,0 +1,117 @@
+# src/forecast_cache.py
+import pandas as pd
+
+from typing import TYPE_CHECKING, List, Optional, Union
+
+from config.constants import FORECAST_CACHE_DIR, FORECAST_CACHE_MAX_MB
+from utils.disk_cache import DiskCache
+from utils.hashing import file_sha256, timeseries_fingerprint
+from utils.logger import logger
+from utils.model_handler import forecast_cases, get_forecast_dates, get_training_end
+from utils.single_flight import get_single_flight
+
+if TYPE_CHECKING:
+    from darts import TimeSeries
+
+
+class ForecastCache(DiskCache):
+    """
+    On-disk cache of forecasts keyed by model content, horizon and covariates.
+
+    Entries hold the predicted cases of a forecast; see DiskCache for the
+    storage and eviction policy.
+    """
+
+    def __init__(self, cache_dir: str = FORECAST_CACHE_DIR, max_bytes: int = FORECAST_CACHE_MAX_MB * 1024 * 1024):
+        super().__init__(cache_dir, max_bytes)
+
+    @staticmethod
+    def make_key(model_file: str, n_weeks: int, weather_data: Optional['TimeSeries'] = None,
+                 model_hash: Optional[str] = None) -> str:
+        """
+        Build the cache key of a forecast.
+
+        Args:
+            model_file (str): Path to the model file.
+            n_weeks (int): Number of weeks to forecast.
+            weather_data (TimeSeries, optional): Future covariates of the forecast.
+            model_hash (str, optional): Content hash of the file the model was
+                loaded from (see ModelRegistry.sha256); the current hash of model_file by default.
+
+        Returns:
+            str: Cache key.
+        """
+        return f"{(model_hash or file_sha256(model_file))[:32]}-{n_weeks}-{timeseries_fingerprint(weather_data)[:32]}"
+
+
+_forecast_cache: Optional[ForecastCache] = None
+
+
+def get_forecast_cache() -> ForecastCache:
+    """
+    Process-wide ForecastCache, configured by FORECAST_CACHE_DIR and FORECAST_CACHE_MAX_MB.
+
+    Returns:
+        ForecastCache: Shared forecast cache.
+    """
+    global _forecast_cache
+    if _forecast_cache is None:
+        _forecast_cache = ForecastCache()
+    return _forecast_cache
+
+
+def cached_forecast_cases(
+    model: object,
+    model_file: str,
+    n_weeks: int,
+    forecast_dates: Union[List, pd.Series, pd.DatetimeIndex],
+    weather_data: 'TimeSeries' = None,
+    cache: Optional[ForecastCache] = None,
+    horizon_weeks: Optional[int] = None,
+    model_hash: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    forecast_cases backed by the persistent forecast cache.
+
+    With horizon_weeks, the model is predicted (and cached) once at that
+    horizon and the first n_weeks are returned, so every shorter duration is a
+    slice of the same forecast. weather_data must then cover horizon_weeks.
+    This relies on the forecast of the first n weeks not depending on the
+    covariates or the horizon beyond them, which holds for the district models.
+    Concurrent cache misses of the same key share one prediction.
+
+    Args:
+        model: Trained model loaded from model_file.
+        model_file (str): Path to the model file, used to key the cache.
+        n_weeks (int): Number of weeks to forecast.
+        forecast_dates: Week end dates of the forecast.
+        weather_data (TimeSeries, optional): Future covariates.
+        cache (ForecastCache, optional): Cache to use instead of the shared one.
+        horizon_weeks (int, optional): Horizon to predict at, at least n_weeks.
+        model_hash (str, optional): Content hash of the file model was loaded
+            from, so a model replaced on disk after loading never caches its
+            forecasts under the new file's key.
+
+    Returns:
+        pd.DataFrame: DataFrame with forecasted dates and predicted cases.
+    """
+    cache = cache or get_forecast_cache()
+    horizon_weeks = max(horizon_weeks or n_weeks, n_weeks)
+    key = cache.make_key(model_file, horizon_weeks, weather_data, model_hash)
+
+    def _predict():
+        forecast_df = forecast_cases(model, horizon_weeks, get_forecast_dates(horizon_weeks, get_training_end(model)), weather_data=weather_data)
+        predicted_cases = forecast_df['predicted_cases'].tolist()
+        cache.put(key, predicted_cases)
+        return predicted_cases
+
+    predicted_cases = cache.get(key)
+    if predicted_cases is not None:
+        logger.info(f"Forecast cache hit for {model_file} ({horizon_weeks} weeks).")
+    else:
+        predicted_cases = get_single_flight('forecast').do(key, _predict)
+
+    return pd.DataFrame({
+        'Week_End_Date': forecast_dates,
+        'predicted_cases': predicted_cases[:n_weeks]
+    })
@@ -0,0 +1,79 @@
+# src/hashing.py
+import os
+import hashlib
+import threading
+import pandas as pd
+
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from darts import TimeSeries
+
+_file_hashes: Dict[str, Tuple[float, int, str]] = {}
+_file_hashes_lock = threading.Lock()
+
+
+def file_sha256(path: str) -> str:
+    """
+    Content hash of a file, memoized on (mtime, size) so unchanged files are not re-read.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        str: Hex SHA-256 digest of the file content.
+    """
+    stat = os.stat(path)
+    with _file_hashes_lock:
+        cached = _file_hashes.get(path)
+    if cached and cached[:2] == (stat.st_mtime, stat.st_size):
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+
+    with _file_hashes_lock:
+        _file_hashes[path] = (stat.st_mtime, stat.st_size, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def timeseries_fingerprint(series: Optional['TimeSeries']) -> str:
+    """
+    Hash of a TimeSeries' time index, component names and values.
+
+    Args:
+        series (TimeSeries, optional): Series to fingerprint.
+
+    Returns:
+        str: Hex SHA-256 digest, or 'none' when no series is given.
+    """
+    if series is None:
+        return 'none'
+
+    digest = hashlib.sha256()
+    digest.update(repr(list(series.components)).encode('utf-8'))
+    digest.update(series.time_index.asi8.tobytes() if series.has_datetime_index
+                  else series.time_index.values.tobytes())
+    digest.update(series.all_values(copy=False).tobytes())
+    return digest.hexdigest()
+
+
+def dataframe_fingerprint(df: Optional[pd.DataFrame]) -> str:
+    """
+    Hash of a DataFrame's columns and row contents.
+
+    Args:
+        df (pd.DataFrame, optional): DataFrame to fingerprint.
+
+    Returns:
+        str: Hex SHA-256 digest, or 'none' when no DataFrame is given.
+    """
+    if df is None:
+        return 'none'
+
+    digest = hashlib.sha256()
+    digest.update(repr(list(df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
@@ -0,0 +1,82 @@
+# src/import_report.py
+import re
+import sys
+import json
+import subprocess
+
+from typing import Dict, List, Sequence
+
+# Libraries that should only be imported by the feature that needs them
+HEAVY_MODULES = ['darts', 'torch', 'lightning', 'pytorch_lightning', 'catboost', 'lightgbm', 'xgboost',
+                 'statsforecast', 'shap', 'pdfplumber', 'matplotlib']
+
+# Modules of the app, and the imports made the first time each feature is used
+DEFAULT_TARGETS = [
+    'config.constants',
+    'utils.model_handler',
+    'utils.shap_utils',
+    'utils.utils',
+    'components.tabs',
+    'darts.models',
+    'darts.explainability.shap_explainer',
+    'pdfplumber',
+]
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+_PROBE = """
+import sys, time, json, importlib
+start = time.perf_counter()
+importlib.import_module({module!r})
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, top: int = 10, python: str = sys.executable) -> Dict:
+    """
+    Import a module in a fresh interpreter and measure its import cost.
+
+    Args:
+        module (str): Dotted module name.
+        top (int): Number of slowest top-level packages to report.
+        python (str): Interpreter to use.
+
+    Returns:
+        Dict: 'module', 'seconds' (wall time of the import), 'heavy' (heavy
+            libraries it loaded), 'slowest' ([package, cumulative seconds])
+            and 'error'.
+    """
+    completed = subprocess.run(
+        [python, '-X', 'importtime', '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        return {'module': module, 'seconds': None, 'heavy': [], 'slowest': [],
+                'error': completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else 'import failed'}
+
+    # Cumulative time of each top-level package (no indentation in -X importtime output)
+    packages = {}
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            packages[match.group(4)] = int(match.group(2)) / 1e6
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {'module': module, 'seconds': result['seconds'], 'heavy': result['heavy'],
+            'slowest': [[name, seconds] for name, seconds in slowest], 'error': None}
+
+
+def import_report(modules: Sequence[str] = DEFAULT_TARGETS, top: int = 10) -> List[Dict]:
+    """
+    Measure the import cost of each module, each in a fresh interpreter.
+
+    Args:
+        modules (Sequence[str]): Dotted module names.
+        top (int): Number of slowest top-level packages to report per module.
+
+    Returns:
+        List[Dict]: Result of measure_import for each module.
+    """
+    return [measure_import(module, top) for module in modules]
@@ -0,0 +1,202 @@
+# src/inference.py
+import os
+import copy
+import queue
+import threading
+import weakref
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from config.constants import MODEL_REPLICAS, TORCH_INFERENCE_WORKERS, TORCH_INTRA_OP_THREADS
+from utils.logger import logger
+
+
+def is_torch_model(model: object) -> bool:
+    """Whether a model is a darts TorchForecastingModel, without importing darts."""
+    return any(cls.__name__ == 'TorchForecastingModel' for cls in type(model).__mro__)
+
+
+def replicate_model(model: object) -> object:
+    """
+    Independent copy of a model for concurrent predictions.
+
+    darts torch models leave their LightningModule and trainer out of their
+    pickled state, so the network is copied separately; the trainer is
+    created by the copy's first prediction.
+
+    Args:
+        model: Trained model.
+
+    Returns:
+        A deep copy of the model, on the CPU for torch models.
+    """
+    replica = copy.deepcopy(model)
+    if is_torch_model(model):
+        replica.model = copy.deepcopy(model.model)
+        replica.to_cpu()
+    return replica
+
+
+class ModelReplicaPool:
+    """
+    Replicas of one model, each used by one prediction at a time.
+
+    The shared model itself is replica 0; up to max_replicas - 1 deep copies
+    are made on demand when all replicas are busy. The pool does not keep the
+    shared model alive, so it can still be evicted from the ModelRegistry.
+    """
+
+    def __init__(self, max_replicas: int = MODEL_REPLICAS):
+        self.max_replicas = max(1, max_replicas)
+        self._copies: Dict[int, object] = {}
+        self._free: 'queue.LifoQueue[int]' = queue.LifoQueue()
+        self._free.put(0)
+        self._size = 1
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self, model: object) -> Iterator[object]:
+        """
+        Borrow a replica of model for the duration of the with block.
+
+        Args:
+            model: The shared model the pool was created for.
+
+        Yields:
+            A replica no other thread is using.
+        """
+        try:
+            index = self._free.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                index = self._size if self._size < self.max_replicas else None
+                if index is not None:
+                    self._size += 1
+            if index is None:
+                index = self._free.get()
+            else:
+                try:
+                    replica = replicate_model(model)
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                    raise
+                with self._lock:
+                    self._copies[index] = replica
+        try:
+            yield model if index == 0 else self._copies[index]
+        finally:
+            self._free.put(index)
+
+    @property
+    def size(self) -> int:
+        """Number of replicas, including the shared model."""
+        return self._size
+
+
+class InferenceGuard:
+    """
+    Serializes predictions of shared torch models across sessions.
+
+    darts torch models keep trainer state on the instance, so two threads
+    predicting with the same model object can corrupt each other. Each torch
+    model gets a ModelReplicaPool, so a model (or replica) runs one prediction
+    at a time. At most max_concurrent torch predictions run at once across all
+    models, each under torch.inference_mode with intra_op_threads threads, so
+    simultaneous users do not oversubscribe the CPU cores. Other models are
+    predicted directly.
+    """
+
+    def __init__(self, replicas: int = MODEL_REPLICAS, max_concurrent: int = TORCH_INFERENCE_WORKERS,
+                 intra_op_threads: int = TORCH_INTRA_OP_THREADS):
+        self.replicas = replicas
+        self.max_concurrent = max(1, max_concurrent)
+        self.intra_op_threads = intra_op_threads or max(1, (os.cpu_count() or 1) // self.max_concurrent)
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._pools: 'weakref.WeakKeyDictionary[object, ModelReplicaPool]' = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._torch_configured = False
+        self.counters = {'predictions': 0, 'waits': 0}
+
+    def _configure_torch(self):
+        import torch
+
+        with self._lock:
+            if self._torch_configured:
+                return
+            torch.set_num_threads(self.intra_op_threads)
+            self._torch_configured = True
+        logger.info(f"Torch inference: {self.max_concurrent} concurrent predictions, "
+                    f"{self.intra_op_threads} intra-op threads each")
+
+    def _pool(self, model: object) -> ModelReplicaPool:
+        with self._lock:
+            pool = self._pools.get(model)
+            if pool is None:
+                # The shared model is moved to the CPU once, not on every prediction
+                model.to_cpu()
+                pool = self._pools[model] = ModelReplicaPool(self.replicas)
+            return pool
+
+    @contextmanager
+    def session(self, model: object) -> Iterator[object]:
+        """
+        Run predictions of a shared model safely.
+
+        Args:
+            model: Shared model, e.g. from the ModelRegistry.
+
+        Yields:
+            The model to predict with: a replica of model for torch models, model itself otherwise.
+        """
+        if not is_torch_model(model):
+            yield model
+            return
+
+        import torch
+
+        self._configure_torch()
+        # A replica is taken before a slot, so waiting for a busy model never holds a slot
+        with self._pool(model).acquire(model) as replica:
+            if not self._slots.acquire(blocking=False):
+                with self._lock:
+                    self.counters['waits'] += 1
+                self._slots.acquire()
+            try:
+                with torch.inference_mode():
+                    with self._lock:
+                        self.counters['predictions'] += 1
+                    yield replica
+            finally:
+                self._slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Inference counters.
+
+        Returns:
+            Dict[str, int]: Predictions, waits for a free slot, and the number of pooled models and replicas.
+        """
+        with self._lock:
+            pools = list(self._pools.values())
+            return dict(self.counters, models=len(pools), replicas=sum(pool.size for pool in pools),
+                        intra_op_threads=self.intra_op_threads)
+
+
+_inference_guard: Optional[InferenceGuard] = None
+_inference_guard_lock = threading.Lock()
+
+
+def get_inference_guard() -> InferenceGuard:
+    """
+    Process-wide InferenceGuard, configured by MODEL_REPLICAS, TORCH_INFERENCE_WORKERS and TORCH_INTRA_OP_THREADS.
+
+    Returns:
+        InferenceGuard: Shared inference guard.
+    """
+    global _inference_guard
+    with _inference_guard_lock:
+        if _inference_guard is None:
+            _inference_guard = InferenceGuard()
+        return _inference_guard
@@ -1,19 +1,43 @@
 # src/model_handler.py
-from typing import List, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 
 import os
 import datetime
+import importlib
+import numpy as np
 import pandas as pd
 
-from darts import TimeSeries
-from darts.models import TransformerModel
+from config.constants import DISTRICT_WITH_WEATHER_FIELD, LAST_TRAINING_DATE, WEATHER_COVARIATE_COLUMNS
+from utils.inference import get_inference_guard
+from utils.model_manifest import get_model_manifest
+from utils.tracing import get_tracer
+
+if TYPE_CHECKING:
+    from darts import TimeSeries
+
+
+def resolve_model_class(class_name: str) -> type:
+    """
+    Import a darts model class by name.
+
+    darts (and the torch, lightgbm, catboost, ... backends it pulls in) is only
+    imported here, the first time a model is needed.
+
+    Args:
+        class_name (str): Name of a class in darts.models, e.g. 'RandomForest'.
+
+    Returns:
+        type: The model class.
+    """
+    return getattr(importlib.import_module('darts.models'), class_name)
 
-from config.constants import OTHER_MODEL_LOADERS
 
 def load_model(model_file: str) -> object:
     """
     Load a forecasting model from a specified file.
 
+    The model class is taken from the model manifest (see get_model_family).
+
     Args:
         model_file (str): Path to the model file.
 
@@ -26,22 +50,123 @@ def load_model(model_file: str) -> object:
     if not os.path.exists(model_file):
         raise FileNotFoundError(f"Model file not found: {model_file}")
 
-    other_model_class = OTHER_MODEL_LOADERS.get(model_file)
-    
-    if other_model_class:
-        return other_model_class.load(model_file)
-    else:
-        return TransformerModel.load(model_file)
+    family = get_model_family(model_file)
+    with get_tracer().span('load_model', family=family):
+        return resolve_model_class(family).load(model_file)
+
+
+def get_model_family(model_file: str) -> str:
+    """
+    Model family (darts class) of a model file, without loading it.
+
+    The class recorded in the model manifest is used; files missing from the
+    manifest fall back to the '<DistrictName>_<ModelName>.pt' naming
+    convention, e.g. 'models/Kandy_TransformerModel.pt'.
+
+    Args:
+        model_file (str): Path to the model file.
+
+    Returns:
+        str: Model family name, e.g. 'TransformerModel'.
+    """
+    return get_model_manifest().model_class(model_file)
+
+
+def get_month_options(district: str) -> Dict[str, int]:
+    """
+    Forecast durations offered for a district, in weeks.
+
+    Args:
+        district (str): Name of the district.
+
+    Returns:
+        Dict[str, int]: Duration label -> number of weeks.
+    """
+    return {
+        "3 Months": 13 if district in DISTRICT_WITH_WEATHER_FIELD else 12,
+        "4 Months": 16,
+        "5 Months": 20,
+        "6 Months": 24
+    }
+
+
+def get_max_forecast_weeks(district: str) -> int:
+    """
+    Longest forecast duration offered for a district, in weeks.
+
+    Forecasts are computed once at this horizon and shorter durations are
+    served as slices of it.
+
+    Args:
+        district (str): Name of the district.
+
+    Returns:
+        int: Number of weeks.
+    """
+    return max(get_month_options(district).values())
+
+
+def get_training_end(model: object) -> Optional[pd.Timestamp]:
+    """
+    Last week of the series a model was trained on.
+
+    Args:
+        model: Trained model.
+
+    Returns:
+        pd.Timestamp: End of the training series, or None if the model does not keep it.
+    """
+    series = getattr(model, 'training_series', None)
+    return series.end_time() if series is not None and series.has_datetime_index else None
+
+
+def get_forecast_dates(n_weeks: int, training_end: Optional[pd.Timestamp] = None) -> pd.DatetimeIndex:
+    """
+    Weekly dates covered by an n_weeks forecast.
+
+    Args:
+        n_weeks (int): Number of weeks to forecast.
+        training_end (pd.Timestamp, optional): Last training week of the model
+            (see get_training_end); LAST_TRAINING_DATE is used if omitted.
+
+    Returns:
+        pd.DatetimeIndex: Week end dates of the forecast.
+    """
+    start = pd.Timestamp(training_end) + pd.Timedelta(days=1) if training_end is not None else pd.Timestamp(LAST_TRAINING_DATE)
+    return pd.date_range(start, periods=n_weeks, freq='W-MON')
+
+
+def weather_to_timeseries(weather_data: pd.DataFrame) -> 'TimeSeries':
+    """
+    Convert validated weekly weather data into a future-covariate TimeSeries.
+
+    Args:
+        weather_data (pd.DataFrame): Weather data with a 'Week_End_Date' column
+            and the columns in WEATHER_COVARIATE_COLUMNS.
+
+    Returns:
+        TimeSeries: Future covariates for the weather-driven models.
+    """
+    from darts import TimeSeries
+
+    return TimeSeries.from_dataframe(
+        weather_data,
+        time_col='Week_End_Date',
+        value_cols=WEATHER_COVARIATE_COLUMNS,
+    )
 
 
 def forecast_cases(
     model: object,
     n_weeks: int,
     forecast_dates: Union[datetime.date, List[datetime.date], pd.Series],
-    weather_data: TimeSeries = None
+    weather_data: 'TimeSeries' = None
 ) -> pd.DataFrame:
     """
     Generate dengue case forecasts for the next n_weeks.
+
+    The model may be shared between sessions: torch models are predicted
+    through the shared InferenceGuard (see utils.inference).
     
     Args:
         model: Trained model.
@@ -52,20 +177,16 @@ def forecast_cases(
         pd.DataFrame: DataFrame with forecasted dates and predicted cases.
     """
     #Determine if the model requires future co-variates
-    if isinstance(model, (TransformerModel)):
-        model.to_cpu()
-        
-    if weather_data:
-        forecast_values = model.predict(n_weeks, future_covariates=weather_data)
-    else:
-        forecast_values = model.predict(n_weeks)
-
+    with get_tracer().span('forecast_cases', family=type(model).__name__), \
+            get_inference_guard().session(model) as replica:
+        if weather_data:
+            forecast_values = replica.predict(n_weeks, future_covariates=weather_data)
+        else:
+            forecast_values = replica.predict(n_weeks)
 
-    # Extract the raw NumPy array and flatten it
-    forecast_values_array = forecast_values.values()
 
-    # Round the forecasted values to integers
-    forecast_values_rounded = [round(value[0]) for value in forecast_values_array]
+    # Round the forecasted values of the target to integers in one pass
+    forecast_values_rounded = np.rint(forecast_values.values(copy=False)[:, 0]).astype(int)
 
     # Create the forecast DataFrame
     forecast_df = pd.DataFrame({
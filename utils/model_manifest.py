@@ -0,0 +1,233 @@
+# src/model_manifest.py
+import os
+import tempfile
+import threading
+import yaml
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from config.constants import MODEL_MANIFEST_FILE
+from utils.hashing import file_sha256
+from utils.logger import logger
+
+# Models without a manifest entry or a '<District>_<ModelClass>' file name
+DEFAULT_MODEL_CLASS = 'TransformerModel'
+# darts torch models keep their weights in a companion checkpoint file
+CHECKPOINT_SUFFIX = '.ckpt'
+
+
+def model_class_from_filename(model_file: str) -> str:
+    """
+    Model class encoded in a '<DistrictName>_<ModelName>.pt' file name.
+
+    Args:
+        model_file (str): Path to the model file, e.g. 'models/Kandy_TransformerModel.pt'.
+
+    Returns:
+        str: Model class name, e.g. 'TransformerModel'.
+    """
+    file_name = os.path.splitext(os.path.basename(model_file))[0]
+    return file_name.split('_', 1)[1] if '_' in file_name else DEFAULT_MODEL_CLASS
+
+
+def describe_model(model: object, model_file: str) -> Dict[str, Any]:
+    """
+    Manifest entry of a loaded model.
+
+    Args:
+        model: Model loaded from model_file.
+        model_file (str): Path to the model file.
+
+    Returns:
+        Dict: Model class, file hash and size, required artifacts, lag and chunk
+            lengths, covariate columns and training end of the model.
+    """
+    from darts.models.forecasting.torch_forecasting_model import TorchForecastingModel
+
+    artifacts = [model_file]
+    if isinstance(model, TorchForecastingModel):
+        artifacts.append(model_file + CHECKPOINT_SUFFIX)
+
+    lags = getattr(model, 'lags', None) or {}
+    future_covariates = getattr(model, 'future_covariate_series', None)
+    past_covariates = getattr(model, 'past_covariate_series', None)
+    training_series = getattr(model, 'training_series', None)
+
+    return {
+        'model_class': type(model).__name__,
+        'sha256': file_sha256(model_file),
+        'size_bytes': sum(os.path.getsize(path) for path in artifacts if os.path.exists(path)),
+        'artifacts': artifacts,
+        # Regression models have lags, torch models input chunks
+        'input_chunk_length': getattr(model, 'input_chunk_length', None) or (-min(lags['target']) if lags.get('target') else None),
+        'output_chunk_length': getattr(model, 'output_chunk_length', None),
+        'lags': {name: [int(lag) for lag in values] for name, values in lags.items()} or None,
+        'past_covariates': list(past_covariates.components) if past_covariates is not None else [],
+        'future_covariates': list(future_covariates.components) if future_covariates is not None else [],
+        'training_end': (training_series.end_time().strftime('%Y-%m-%d')
+                         if training_series is not None and training_series.has_datetime_index else None),
+    }
+
+
+class ModelManifest:
+    """
+    Description of the model files, written by generate_config.py.
+
+    The manifest lets models be dispatched to their class, validated and
+    sized without deserializing them. Models missing from the manifest are
+    dispatched on their '<District>_<ModelClass>' file name.
+    """
+
+    def __init__(self, models: Optional[Dict[str, Dict[str, Any]]] = None, path: Optional[str] = None):
+        """
+        Args:
+            models (Dict[str, Dict], optional): Model file -> manifest entry (see describe_model).
+            path (str, optional): File the manifest was loaded from.
+        """
+        self.models = models or {}
+        self.path = path
+
+    @classmethod
+    def load(cls, path: str = MODEL_MANIFEST_FILE) -> 'ModelManifest':
+        """
+        Load a manifest file; a missing file gives an empty manifest.
+
+        Args:
+            path (str): Path to the manifest YAML file.
+
+        Returns:
+            ModelManifest: The manifest.
+        """
+        if not os.path.exists(path):
+            logger.warning(f"Model manifest not found: {path}. Run generate_config.py to create it.")
+            return cls(path=path)
+        with open(path, 'r') as file:
+            manifest = yaml.safe_load(file) or {}
+        return cls(manifest.get('models', {}), path)
+
+    def save(self, path: Optional[str] = None):
+        """
+        Write the manifest atomically.
+
+        Args:
+            path (str, optional): Path to write to, by default the path it was loaded from.
+        """
+        path = path or self.path or MODEL_MANIFEST_FILE
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.tmp-', suffix='.yaml')
+        with os.fdopen(fd, 'w') as file:
+            yaml.dump({'models': dict(sorted(self.models.items()))}, file, sort_keys=False, allow_unicode=True,
+                      default_flow_style=None)
+        # mkstemp files are private; the manifest must be readable by the app and service
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+        self.path = path
+
+    def get(self, model_file: str) -> Optional[Dict[str, Any]]:
+        """Manifest entry of a model file, if any."""
+        return self.models.get(model_file)
+
+    def model_class(self, model_file: str) -> str:
+        """
+        Class of a model: the recorded one, else the one in its file name.
+
+        Args:
+            model_file (str): Path to the model file.
+
+        Returns:
+            str: Name of a class in darts.models.
+        """
+        entry = self.models.get(model_file)
+        return entry['model_class'] if entry else model_class_from_filename(model_file)
+
+    def size_bytes(self, model_file: str) -> Optional[int]:
+        """Recorded size of a model's artifacts in bytes, if any."""
+        entry = self.models.get(model_file)
+        return entry['size_bytes'] if entry else None
+
+    def problems(self, model_files: Iterable[str]) -> Dict[str, str]:
+        """
+        Models that cannot be served: some of their artifacts are missing, or they failed to load.
+
+        Args:
+            model_files (Iterable[str]): Model files to check, e.g. those in the districts config.
+
+        Returns:
+            Dict[str, str]: Model file -> description of its problem.
+        """
+        problems = {}
+        for model_file in model_files:
+            entry = self.models.get(model_file)
+            missing = [path for path in (entry['artifacts'] if entry else [model_file]) if not os.path.exists(path)]
+            if missing:
+                problems[model_file] = f"Missing model artifacts: {', '.join(missing)}"
+            elif entry and entry.get('error'):
+                problems[model_file] = f"Model could not be loaded when the manifest was generated: {entry['error']}"
+        return problems
+
+    def outdated(self, model_files: Iterable[str], verify: bool = False) -> List[str]:
+        """
+        Existing models that are not in the manifest or changed since it was generated.
+
+        Such models are still served, dispatched on their file name.
+
+        Args:
+            model_files (Iterable[str]): Model files to check.
+            verify (bool): Compare content hashes instead of file sizes only.
+
+        Returns:
+            List[str]: The outdated model files.
+        """
+        outdated = []
+        for model_file in model_files:
+            entry = self.models.get(model_file)
+            if not os.path.exists(model_file):
+                continue
+            if entry is None or sum(os.path.getsize(path) for path in entry['artifacts'] if os.path.exists(path)) \
+                    != entry['size_bytes'] or (verify and file_sha256(model_file) != entry['sha256']):
+                outdated.append(model_file)
+        return outdated
+
+    def total_bytes(self, model_files: Iterable[str]) -> int:
+        """Recorded size of the artifacts of a set of models in bytes."""
+        return sum(self.size_bytes(model_file) or 0 for model_file in model_files)
+
+    def refresh(self, model_file: str, training_end: Optional[str] = None):
+        """
+        Update the hash and size of a model whose files were replaced, e.g. after retraining.
+
+        Args:
+            model_file (str): Path to the model file.
+            training_end (str, optional): New training end of the model.
+        """
+        entry = self.models.get(model_file)
+        if entry is None:
+            return
+        entry['sha256'] = file_sha256(model_file)
+        entry['size_bytes'] = sum(os.path.getsize(path) for path in entry['artifacts'] if os.path.exists(path))
+        if training_end is not None:
+            entry['training_end'] = training_end
+
+
+_model_manifest: Optional[ModelManifest] = None
+_model_manifest_stat: Optional[tuple] = None
+_model_manifest_lock = threading.Lock()
+
+
+def get_model_manifest() -> ModelManifest:
+    """
+    Process-wide ModelManifest of MODEL_MANIFEST_FILE, reloaded when the file changes (e.g. after update_models.py).
+
+    Returns:
+        ModelManifest: Shared manifest.
+    """
+    global _model_manifest, _model_manifest_stat
+    try:
+        stat = os.stat(MODEL_MANIFEST_FILE)
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    except OSError:
+        signature = None
+    with _model_manifest_lock:
+        if _model_manifest is None or signature != _model_manifest_stat:
+            _model_manifest = ModelManifest.load()
+            _model_manifest_stat = signature
+        return _model_manifest
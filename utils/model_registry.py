@@ -0,0 +1,183 @@
+# src/model_registry.py
+import os
+import time
+import pickle
+import threading
+
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+from config.constants import MODEL_MEMORY_BUDGET_MB
+from utils.hashing import file_sha256
+from utils.logger import logger
+from utils.model_handler import load_model
+from utils.model_manifest import get_model_manifest
+
+
+def estimate_model_size(model: object, model_file: str) -> int:
+    """
+    Approximate resident size of a loaded model in bytes.
+
+    The size of the model's artifacts recorded in the model manifest is used
+    as a proxy for the memory held by its estimators or network weights. For
+    models missing from the manifest the model is pickled, falling back to
+    the file size if pickling fails.
+
+    Args:
+        model: Loaded model.
+        model_file (str): Path the model was loaded from.
+
+    Returns:
+        int: Estimated size in bytes.
+    """
+    size_bytes = get_model_manifest().size_bytes(model_file)
+    if size_bytes is not None:
+        return size_bytes
+    try:
+        return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return os.path.getsize(model_file)
+
+
+class ModelRegistry:
+    """
+    Lazily loaded, memory-bounded set of forecasting models shared by all sessions.
+
+    Models are loaded with load_model on first use. Concurrent first requests
+    for the same model wait for a single load. A model whose file changed
+    since it was loaded (e.g. published by update_models.py) is reloaded on
+    its next request. When the estimated size of the loaded models exceeds
+    memory_budget_bytes, the least recently used models are evicted (the most
+    recently used one is always kept).
+    """
+
+    def __init__(self, memory_budget_bytes: int = MODEL_MEMORY_BUDGET_MB * 1024 * 1024,
+                 loader: Callable[[str], object] = load_model):
+        self.memory_budget_bytes = memory_budget_bytes
+        self._loader = loader
+        self._models: 'OrderedDict[str, object]' = OrderedDict()
+        # Content hash of the file each resident model was loaded from
+        self._hashes: Dict[str, str] = {}
+        self._metrics: Dict[str, Dict] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_file: str) -> object:
+        """
+        Return the model stored in model_file, loading it if needed.
+
+        Args:
+            model_file (str): Path to the model file.
+
+        Returns:
+            Loaded model instance.
+        """
+        # Memoized on the file's mtime and size, so this only re-reads replaced files
+        current_hash = file_sha256(model_file) if os.path.exists(model_file) else None
+        with self._lock:
+            model = self._touch(model_file, current_hash)
+            if model is not None:
+                return model
+            load_lock = self._load_locks.setdefault(model_file, threading.Lock())
+
+        with load_lock:
+            # Another session may have finished loading while we waited
+            with self._lock:
+                model = self._touch(model_file, current_hash)
+                if model is not None:
+                    return model
+
+            start = time.perf_counter()
+            model = self._loader(model_file)
+            load_seconds = time.perf_counter() - start
+            size_bytes = estimate_model_size(model, model_file)
+
+            with self._lock:
+                metrics = self._metrics.setdefault(model_file, {'loads': 0, 'hits': 0})
+                metrics.update(loads=metrics['loads'] + 1, load_seconds=load_seconds,
+                               size_bytes=size_bytes, last_used=time.time())
+                self._models[model_file] = model
+                self._hashes[model_file] = current_hash
+                self._evict()
+            logger.info(f"Loaded model {model_file} in {load_seconds:.2f}s (~{size_bytes / 1e6:.1f} MB)")
+            return model
+
+    def _touch(self, model_file: str, current_hash: Optional[str]) -> Optional[object]:
+        # Caller holds self._lock
+        model = self._models.get(model_file)
+        if model is not None and self._hashes.get(model_file) != current_hash:
+            logger.info(f"{model_file} changed since it was loaded; reloading it")
+            del self._models[model_file]
+            return None
+        if model is not None:
+            self._models.move_to_end(model_file)
+            self._metrics[model_file]['hits'] += 1
+            self._metrics[model_file]['last_used'] = time.time()
+        return model
+
+    def _evict(self):
+        # Caller holds self._lock
+        while len(self._models) > 1 and self.resident_bytes() > self.memory_budget_bytes:
+            model_file, _ = self._models.popitem(last=False)
+            logger.info(f"Evicted model {model_file} from the model registry")
+
+    def sha256(self, model_file: str) -> Optional[str]:
+        """Content hash of the file the resident model of model_file was loaded from, if loaded."""
+        with self._lock:
+            return self._hashes.get(model_file) if model_file in self._models else None
+
+    def resident_bytes(self) -> int:
+        """Estimated total size of the loaded models in bytes."""
+        return sum(self._metrics[model_file]['size_bytes'] for model_file in self._models)
+
+    def warm_up(self, model_files: Iterable[str], background: bool = True) -> Optional[threading.Thread]:
+        """
+        Load a set of models ahead of the first request.
+
+        Models the model manifest reports as unservable are skipped, and only
+        as many models as fit in the memory budget (by their manifest size)
+        are loaded, so warming up never evicts a warmed-up model.
+
+        Args:
+            model_files (Iterable[str]): Model files to load.
+            background (bool): Load in a daemon thread instead of blocking.
+
+        Returns:
+            threading.Thread: The warm-up thread when background is True.
+        """
+        manifest = get_model_manifest()
+        candidates = list(model_files)
+        problems = manifest.problems(candidates)
+        model_files, planned_bytes = [], 0
+        for model_file in [model_file for model_file in candidates if model_file not in problems]:
+            planned_bytes += manifest.size_bytes(model_file) or 0
+            if model_files and planned_bytes > self.memory_budget_bytes:
+                logger.info(f"Skipping warm-up of {model_file}: the warm-up set exceeds the memory budget")
+                break
+            model_files.append(model_file)
+
+        def _warm_up():
+            for model_file in model_files:
+                try:
+                    self.get(model_file)
+                except Exception as e:
+                    logger.error(f"Warm-up of {model_file} failed: {e}")
+
+        if not background:
+            _warm_up()
+            return None
+        thread = threading.Thread(target=_warm_up, name='model-warm-up', daemon=True)
+        thread.start()
+        return thread
+
+    def metrics(self) -> Dict[str, Dict]:
+        """
+        Per-model load metrics.
+
+        Returns:
+            Dict[str, Dict]: model file -> 'loads', 'hits', 'load_seconds',
+                'size_bytes', 'last_used' and 'resident'.
+        """
+        with self._lock:
+            return {model_file: dict(metrics, resident=model_file in self._models)
+                    for model_file, metrics in self._metrics.items()}
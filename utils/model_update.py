@@ -0,0 +1,335 @@
+# src/model_update.py
+import os
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import yaml
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Optional, Tuple
+
+from config.constants import CONFIG_FILE, DATA_FILE, MODEL_MANIFEST_FILE, MODEL_UPDATE_EPOCHS, WEATHER_COVARIATE_COLUMNS
+from utils.batch_forecast import load_districts
+from utils.covariate_store import get_covariate_store
+from utils.data_loader import load_data, load_district_series
+from utils.logger import logger
+from utils.model_manifest import ModelManifest
+
+UPDATE_REPORT_COLUMNS = ['District', 'Model_File', 'new_weeks', 'revised_weeks', 'training_end', 'seconds', 'error']
+
+
+def align_bulletin_weeks(cases: pd.DataFrame) -> pd.DataFrame:
+    """
+    Put parsed bulletin rows on the weekly grid of the historical data.
+
+    Bulletin weeks run from Saturday to Friday while the historical data uses
+    weeks starting on Monday; each bulletin week is assigned to the Monday
+    nearest to its start.
+
+    Args:
+        cases (pd.DataFrame): Weekly cases as returned by ingest_pdfs / to_cases_frame.
+
+    Returns:
+        pd.DataFrame: 'District', 'Week_Start_Date', 'Week_End_Date', 'Year',
+            'Month', 'Week' and integer 'Number_of_Cases', one row per district and week.
+    """
+    df = cases.assign(
+        Number_of_Cases=pd.to_numeric(cases['Number_of_Cases'].replace('Nil', 0), errors='coerce'),
+        Week_Start_Date=pd.to_datetime(cases['Week_Start_Date'], errors='coerce')
+    ).dropna(subset=['Number_of_Cases', 'Week_Start_Date'])
+
+    start = (df['Week_Start_Date'] + pd.Timedelta(days=3)).dt.normalize()
+    start -= pd.to_timedelta(start.dt.dayofweek, unit='D')
+    aligned = pd.DataFrame({
+        'District': df['District'].astype(str).str.strip(),
+        'Week_Start_Date': start,
+        'Week_End_Date': start + pd.Timedelta(days=7),
+        'Year': start.dt.year,
+        'Month': start.dt.month,
+        'Week': start.dt.isocalendar().week.astype(int),
+        'Number_of_Cases': df['Number_of_Cases'].astype(int)
+    })
+    # A week reported by several bulletins keeps its latest revision
+    return aligned.drop_duplicates(['District', 'Week_End_Date'], keep='last').reset_index(drop=True)
+
+
+def _replace_file(tmp_path: str, path: str):
+    """Move tmp_path over path, keeping the permissions of path (mkstemp files are private)."""
+    if os.path.exists(path):
+        shutil.copymode(path, tmp_path)
+    else:
+        os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def merge_cases(history: pd.DataFrame, cases: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Append new bulletin weeks to the historical data and apply revised counts.
+
+    Weather columns of new weeks are filled from the bundled weather data
+    where it covers them. Rows of districts unknown to the historical data
+    are ignored. New weeks must continue each district's weekly series
+    without gaps, so a bulletin dated in the wrong year is rejected rather
+    than merged.
+
+    Args:
+        history (pd.DataFrame): Historical data as returned by load_data.
+        cases (pd.DataFrame): Bulletin rows as returned by align_bulletin_weeks.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: The updated historical data, and
+            per changed district the number of 'new_weeks' and 'revised_weeks'.
+
+    Raises:
+        ValueError: If new weeks leave a gap in a district's weekly series.
+    """
+    districts = set(history['District'].astype(str))
+    unknown = sorted(set(cases['District']) - districts)
+    if unknown:
+        logger.warning(f"Ignoring bulletin rows of unknown districts: {', '.join(unknown)}")
+    cases = cases[cases['District'].isin(districts)]
+
+    history = history.assign(District=history['District'].astype(str))
+    keyed = history.set_index(['District', 'Week_End_Date'])
+    incoming = cases.set_index(['District', 'Week_End_Date'])
+
+    # Revisions of weeks that are already in the data
+    overlap = incoming.index.intersection(keyed.index)
+    old_counts = keyed.loc[overlap, 'Number_of_Cases'].to_numpy()
+    new_counts = incoming.loc[overlap, 'Number_of_Cases'].to_numpy()
+    revised = overlap[old_counts != new_counts]
+    keyed.loc[revised, 'Number_of_Cases'] = incoming.loc[revised, 'Number_of_Cases']
+
+    # New weeks, with the bundled weather where available
+    new_rows = incoming.loc[incoming.index.difference(keyed.index)].reset_index()
+    weather = get_covariate_store().data.assign(District=lambda df: df['District'].astype(str))
+    new_rows = new_rows.merge(weather[['District', 'Week_End_Date'] + WEATHER_COVARIATE_COLUMNS],
+                              on=['District', 'Week_End_Date'], how='left')
+
+    merged = pd.concat([keyed.reset_index(), new_rows], ignore_index=True)[history.columns]
+    merged = merged.sort_values(['District', 'Week_End_Date'], kind='stable').reset_index(drop=True)
+
+    # Every district must stay a contiguous weekly series
+    steps = merged.groupby('District', sort=False)['Week_End_Date'].diff()
+    gaps = merged[steps.notna() & (steps != pd.Timedelta(days=7))]
+    if not gaps.empty:
+        details = ', '.join(f"{row.District} at {row.Week_End_Date:%Y-%m-%d}"
+                            for row in gaps.drop_duplicates('District').itertuples())
+        raise ValueError(f"Bulletin weeks are not contiguous with the historical data ({details}); "
+                         "check the bulletin dates.")
+    merged['District'] = merged['District'].astype('category')
+
+    changes = pd.DataFrame({
+        'new_weeks': new_rows.groupby('District').size(),
+        'revised_weeks': pd.Series(revised.get_level_values('District')).value_counts()
+    }).fillna(0).astype(int).rename_axis('District').reset_index()
+    return merged, changes
+
+
+def write_history(history: pd.DataFrame, data_file: str = DATA_FILE):
+    """
+    Atomically replace the historical data CSV; the columnar store rebuilds itself on the next load.
+
+    Args:
+        history (pd.DataFrame): Updated historical data.
+        data_file (str): Path to the CSV data file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(data_file) or '.', prefix='.tmp-', suffix='.csv')
+    os.close(fd)
+    try:
+        history.to_csv(tmp_path, index=False, date_format='%Y-%m-%d')
+        _replace_file(tmp_path, data_file)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def refit_district(district: str, model_file: str, data_file: str, output_file: str,
+                   epochs: int = MODEL_UPDATE_EPOCHS) -> Dict[str, Any]:
+    """
+    Update a district model on its latest data and save it to output_file.
+
+    Torch models continue training from their current weights for `epochs`
+    epochs; other models are refit from scratch with their original
+    hyperparameters. Weather-driven models are trained up to the last week
+    with observed weather.
+
+    Args:
+        district (str): Name of the district.
+        model_file (str): Path to the current model file.
+        data_file (str): Path to the updated historical data CSV.
+        output_file (str): Path to save the updated model to.
+        epochs (int): Additional training epochs of torch models.
+
+    Returns:
+        Dict: 'district', 'training_end', 'seconds' and 'error' (None on success).
+    """
+    from darts.models.forecasting.torch_forecasting_model import TorchForecastingModel
+    from utils.model_handler import load_model
+
+    result = {'district': district, 'training_end': None, 'seconds': None, 'error': None}
+    start = time.perf_counter()
+    try:
+        model = load_model(model_file)
+        series, covariates = load_district_series(data_file, district)
+        kwargs = {}
+        if model.uses_future_covariates:
+            complete = covariates.pd_dataframe().dropna().index
+            series = series.slice(series.start_time(), complete.max())
+            kwargs['future_covariates'] = covariates
+        if np.isnan(series.values(copy=False)).any():
+            raise ValueError("The case series has missing weeks.")
+
+        if isinstance(model, TorchForecastingModel):
+            model.fit(series, epochs=epochs, verbose=False, **kwargs)
+        else:
+            model = model.untrained_model()
+            model.fit(series, **kwargs)
+        model.save(output_file)
+        result['training_end'] = series.end_time().strftime('%Y-%m-%d')
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def publish_models(staged: Dict[str, str], training_ends: Dict[str, str], config_path: str = CONFIG_FILE,
+                   manifest_path: str = MODEL_MANIFEST_FILE):
+    """
+    Move updated model files into place and write the new model manifest and districts config.
+
+    Every file is swapped in with an atomic rename, models first and the
+    config last, so readers see either the old or the new version of each
+    file and never a partially written one.
+
+    Args:
+        staged (Dict[str, str]): Published model path -> staged model path.
+        training_ends (Dict[str, str]): District -> last training week of its updated model.
+        config_path (str): Path to the districts YAML config.
+        manifest_path (str): Path to the model manifest.
+    """
+    for model_file, staged_file in staged.items():
+        # darts torch models are saved with a companion checkpoint file
+        for suffix in ('.ckpt', ''):
+            if os.path.exists(staged_file + suffix):
+                os.replace(staged_file + suffix, model_file + suffix)
+
+    with open(config_path, 'r') as file:
+        config = yaml.safe_load(file) or {}
+    manifest = ModelManifest.load(manifest_path)
+    for entry in config.get('districts', []):
+        if entry['name'] in training_ends:
+            entry['training_end'] = training_ends[entry['name']]
+            if entry['model_file'] in staged:
+                manifest.refresh(entry['model_file'], training_ends[entry['name']])
+    manifest.save()
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(config_path) or '.', prefix='.tmp-', suffix='.yaml')
+    with os.fdopen(fd, 'w') as file:
+        yaml.dump(config, file, sort_keys=False)
+    _replace_file(tmp_path, config_path)
+
+
+def update_models(
+    cases: pd.DataFrame,
+    data_file: str = DATA_FILE,
+    config_path: str = CONFIG_FILE,
+    epochs: int = MODEL_UPDATE_EPOCHS,
+    max_workers: Optional[int] = None,
+    dry_run: bool = False,
+    include_stale: bool = False
+) -> pd.DataFrame:
+    """
+    Incrementally update the historical data and district models from parsed bulletins.
+
+    New and revised weeks are merged into the historical data, and only the
+    models of districts whose data changed are updated, in parallel on a
+    process pool. With include_stale, models whose recorded training end is
+    older than their district's data are updated too. Updated models are staged and published together with a
+    new districts config once all of them are done; districts whose update
+    fails keep their current model.
+
+    Args:
+        cases (pd.DataFrame): Weekly cases as returned by ingest_pdfs.
+        data_file (str): Path to the historical data CSV.
+        config_path (str): Path to the districts YAML config.
+        epochs (int): Additional training epochs of torch models.
+        max_workers (int, optional): Size of the process pool.
+        dry_run (bool): Only report the changed districts, without writing anything.
+        include_stale (bool): Also update models trained on less data than is
+            available, e.g. after an earlier update failed.
+
+    Returns:
+        pd.DataFrame: One row per changed district, see UPDATE_REPORT_COLUMNS.
+
+    Raises:
+        ValueError: If the bulletin weeks cannot be merged (see merge_cases);
+            nothing is written then.
+    """
+    history = load_data(data_file, compact=False)
+    merged, changes = merge_cases(history, align_bulletin_weeks(cases))
+    entries = load_districts(config_path)
+    model_files = {entry['name']: entry['model_file'] for entry in entries}
+
+    if include_stale:
+        # The training end of each model comes from the manifest (or the config);
+        # models without a recorded training end are left alone
+        manifest = ModelManifest.load(MODEL_MANIFEST_FILE)
+        data_end = merged.groupby('District', observed=True)['Week_End_Date'].max()
+        stale = []
+        for entry in entries:
+            training_end = (manifest.get(entry['model_file']) or {}).get('training_end') or entry.get('training_end')
+            if (training_end and entry['name'] in data_end.index and entry['name'] not in set(changes['District'])
+                    and data_end[entry['name']] > pd.Timestamp(training_end)):
+                stale.append(entry['name'])
+        changes = pd.concat([changes, pd.DataFrame({'District': stale, 'new_weeks': 0, 'revised_weeks': 0})],
+                            ignore_index=True)
+    if changes.empty:
+        return pd.DataFrame(columns=UPDATE_REPORT_COLUMNS)
+
+    report = changes.assign(Model_File=changes['District'].map(model_files), training_end=None,
+                            seconds=None, error=None)
+    report.loc[report['Model_File'].isna(), 'error'] = 'No model configured for the district.'
+    jobs = report.dropna(subset=['Model_File'])
+    jobs = jobs[jobs['Model_File'].map(os.path.exists)]
+    report.loc[report['Model_File'].notna() & ~report['District'].isin(jobs['District']), 'error'] = \
+        'Model file not found.'
+    if dry_run:
+        return report[UPDATE_REPORT_COLUMNS]
+
+    if changes[['new_weeks', 'revised_weeks']].to_numpy().any():
+        write_history(merged, data_file)
+        logger.info(f"Appended {changes['new_weeks'].sum()} new and {changes['revised_weeks'].sum()} revised weeks "
+                    f"to {data_file}")
+
+    staging_dir = tempfile.mkdtemp(dir=os.path.dirname(jobs['Model_File'].iloc[0]) if not jobs.empty else None,
+                                   prefix='.staging-')
+    try:
+        staged, training_ends = {}, {}
+        if not jobs.empty:
+            with ProcessPoolExecutor(max_workers=max_workers or min(len(jobs), os.cpu_count() or 1)) as executor:
+                futures = {
+                    executor.submit(refit_district, row.District, row.Model_File, data_file,
+                                    os.path.join(staging_dir, os.path.basename(row.Model_File)), epochs): row.Model_File
+                    for row in jobs.itertuples()
+                }
+                for future in as_completed(futures):
+                    result = future.result()
+                    index = report.index[report['District'] == result['district']]
+                    report.loc[index, ['training_end', 'seconds', 'error']] = \
+                        [result['training_end'], result['seconds'], result['error']]
+                    if result['error']:
+                        logger.error(f"Model update failed for {result['district']}: {result['error']}")
+                    else:
+                        staged[futures[future]] = os.path.join(staging_dir, os.path.basename(futures[future]))
+                        training_ends[result['district']] = result['training_end']
+
+        if staged:
+            publish_models(staged, training_ends, config_path)
+            logger.info(f"Published {len(staged)} updated models")
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    return report[UPDATE_REPORT_COLUMNS]
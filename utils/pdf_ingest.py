@@ -0,0 +1,189 @@
+# src/pdf_ingest.py
+import io
+import os
+import time
+import hashlib
+import multiprocessing
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config.constants import PDF_CACHE_DIR, PDF_CACHE_MAX_MB
+from utils.disk_cache import DiskCache
+from utils.logger import logger
+from utils.utils import PARSER_VERSION, process_pdf
+
+# Below this many files the pool start-up costs more than it saves
+MIN_FILES_FOR_POOL = 3
+
+
+class PdfCache(DiskCache):
+    """
+    Cache of parsed bulletin rows keyed by the PDF's content hash and PARSER_VERSION.
+
+    Re-uploaded bulletins are served from here without opening the PDF; see
+    DiskCache for the storage and eviction policy.
+    """
+
+    def __init__(self, cache_dir: str = PDF_CACHE_DIR, max_bytes: int = PDF_CACHE_MAX_MB * 1024 * 1024):
+        super().__init__(cache_dir, max_bytes)
+
+    @staticmethod
+    def make_key(content: bytes) -> str:
+        """
+        Build the cache key of a PDF.
+
+        Args:
+            content (bytes): PDF file content.
+
+        Returns:
+            str: Cache key.
+        """
+        return f"{hashlib.sha256(content).hexdigest()}-v{PARSER_VERSION}"
+
+
+_pdf_cache: Optional[PdfCache] = None
+
+
+def get_pdf_cache() -> PdfCache:
+    """
+    Process-wide PdfCache, configured by PDF_CACHE_DIR and PDF_CACHE_MAX_MB.
+
+    Returns:
+        PdfCache: Shared parsed-PDF cache.
+    """
+    global _pdf_cache
+    if _pdf_cache is None:
+        _pdf_cache = PdfCache()
+    return _pdf_cache
+
+
+def _read_upload(pdf_file: Any) -> Tuple[str, bytes]:
+    # Uploaded files (Streamlit UploadedFile / BytesIO) and paths are turned
+    # into (name, bytes) so they can be sent to worker processes.
+    if isinstance(pdf_file, (str, os.PathLike)):
+        with open(pdf_file, 'rb') as file:
+            return os.path.basename(pdf_file), file.read()
+    name = getattr(pdf_file, 'name', 'uploaded.pdf')
+    content = pdf_file.getvalue() if hasattr(pdf_file, 'getvalue') else pdf_file.read()
+    return name, content
+
+
+def parse_pdf_bytes(name: str, content: bytes) -> Dict[str, Any]:
+    """
+    Parse one weekly epidemiology bulletin.
+
+    Args:
+        name (str): File name, used for reporting.
+        content (bytes): PDF file content.
+
+    Returns:
+        Dict: 'file', 'rows' (extracted rows), 'seconds', 'error' (None on success) and 'cached'.
+    """
+    start = time.perf_counter()
+    try:
+        rows = process_pdf(io.BytesIO(content))
+        error = None
+    except Exception as e:
+        rows = []
+        error = f"{type(e).__name__}: {e}"
+    return {'file': name, 'rows': rows, 'seconds': time.perf_counter() - start, 'error': error, 'cached': False}
+
+
+def iter_parsed_pdfs(
+    pdf_files: Iterable[Any],
+    max_workers: Optional[int] = None,
+    cache: Optional[PdfCache] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Parse PDF bulletins on a process pool, yielding each result as soon as its file is done.
+
+    Bulletins already in the cache are yielded first without being parsed;
+    successfully parsed ones are added to it.
+
+    Args:
+        pdf_files (Iterable): Uploaded file objects or paths.
+        max_workers (int, optional): Size of the process pool.
+        cache (PdfCache, optional): Cache to use instead of the shared one.
+
+    Yields:
+        Dict: Result of parse_pdf_bytes for each file, in completion order.
+    """
+    cache = cache or get_pdf_cache()
+
+    uploads = []
+    for pdf_file in pdf_files:
+        start = time.perf_counter()
+        name, content = _read_upload(pdf_file)
+        key = cache.make_key(content)
+        rows = cache.get(key)
+        if rows is not None:
+            yield {'file': name, 'rows': rows, 'seconds': time.perf_counter() - start, 'error': None, 'cached': True}
+        else:
+            uploads.append((key, name, content))
+
+    for key, result in _parse_uploads(uploads, max_workers):
+        if result['error'] is None:
+            cache.put(key, result['rows'])
+        yield result
+
+
+def _parse_uploads(uploads: List[Tuple[str, str, bytes]], max_workers: Optional[int]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    if len(uploads) < MIN_FILES_FOR_POOL:
+        for key, name, content in uploads:
+            yield key, parse_pdf_bytes(name, content)
+        return
+
+    # 'spawn' keeps workers independent of the server's threads and state
+    max_workers = max_workers or min(len(uploads), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {executor.submit(parse_pdf_bytes, name, content): key for key, name, content in uploads}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def ingest_pdfs(
+    pdf_files: Iterable[Any],
+    max_workers: Optional[int] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Parse PDF bulletins into a weekly cases DataFrame and a per-file report.
+
+    Args:
+        pdf_files (Iterable): Uploaded file objects or paths.
+        max_workers (int, optional): Size of the process pool.
+        on_result (Callable, optional): Called with each file's result as soon as it is parsed.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: Extracted rows, and one report row
+            per file with 'file', 'rows', 'seconds', 'cached' and 'error'.
+    """
+    rows: List[Dict] = []
+    report = []
+    for result in iter_parsed_pdfs(pdf_files, max_workers):
+        rows.extend(result['rows'])
+        report.append({'file': result['file'], 'rows': len(result['rows']), 'seconds': result['seconds'],
+                       'cached': result['cached'], 'error': result['error']})
+        if result['error']:
+            logger.error(f"Failed to parse {result['file']}: {result['error']}")
+        if on_result:
+            on_result(result)
+
+    return to_cases_frame(rows), pd.DataFrame(report, columns=['file', 'rows', 'seconds', 'cached', 'error'])
+
+
+def to_cases_frame(rows: List[Dict]) -> pd.DataFrame:
+    """
+    Turn extracted bulletin rows into a sorted weekly cases DataFrame.
+
+    Args:
+        rows (List[Dict]): Rows returned by process_pdf.
+
+    Returns:
+        pd.DataFrame: Weekly cases per district with 'Nil' counts as 0.
+    """
+    df = pd.DataFrame(rows, columns=['Year', 'Week', 'Week_Start_Date', 'Week_End_Date', 'District', 'Number_of_Cases'])
+    df['Number_of_Cases'] = df['Number_of_Cases'].replace('Nil', 0)
+    return df.sort_values(by=['District', 'Week', 'Week_Start_Date']).reset_index(drop=True)
@@ -0,0 +1,191 @@
+# src/prediction_batcher.py
+import asyncio
+import numpy as np
+import pandas as pd
+
+from collections import defaultdict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from utils.hashing import timeseries_fingerprint
+from utils.inference import get_inference_guard
+from utils.logger import logger
+from utils.model_handler import forecast_cases, get_forecast_dates, get_model_family, get_training_end
+from utils.model_registry import ModelRegistry
+from utils.tracing import get_tracer
+
+if TYPE_CHECKING:
+    from darts import TimeSeries
+
+
+class _PredictRequest:
+    """One pending forecast and the future its result is delivered to."""
+
+    def __init__(self, model_file: str, n_weeks: int, covariates: Optional['TimeSeries'], future: asyncio.Future):
+        self.model_file = model_file
+        self.n_weeks = n_weeks
+        self.covariates = covariates
+        self.future = future
+
+
+def is_batchable(model: object, covariates: List[Optional['TimeSeries']]) -> bool:
+    """
+    Whether a model can forecast several future-covariate series in one predict call.
+
+    Args:
+        model: Trained model.
+        covariates (List[TimeSeries]): Future covariates of each forecast (None if unused).
+
+    Returns:
+        bool: True for global models fitted on a single series, given more than one forecast.
+    """
+    from darts.models.forecasting.forecasting_model import GlobalForecastingModel
+
+    return (
+        len(covariates) > 1
+        and isinstance(model, GlobalForecastingModel)
+        and getattr(model, 'training_series', None) is not None
+        and not model.uses_past_covariates
+        and (model.uses_future_covariates == all(cov is not None for cov in covariates))
+    )
+
+
+def predict_many(model: object, n_weeks: int, covariates: List[Optional['TimeSeries']]) -> List[pd.DataFrame]:
+    """
+    Forecast one model for several future-covariate series with a single predict call.
+
+    Global models fitted on a single series are predicted on a list of copies
+    of their training series, one per covariate series, which darts evaluates
+    as one batch. Other models are forecast one series at a time.
+
+    Args:
+        model: Trained model.
+        n_weeks (int): Number of weeks to forecast.
+        covariates (List[TimeSeries]): Future covariates of each forecast (None if unused).
+
+    Returns:
+        List[pd.DataFrame]: Forecasts in the format of forecast_cases, in input order.
+    """
+    forecast_dates = get_forecast_dates(n_weeks, get_training_end(model))
+    if not is_batchable(model, covariates):
+        return [forecast_cases(model, n_weeks, forecast_dates, weather_data=cov) for cov in covariates]
+
+    kwargs = {'future_covariates': covariates} if model.uses_future_covariates else {}
+    with get_tracer().span('predict_many', family=type(model).__name__, batch_size=len(covariates)), \
+            get_inference_guard().session(model) as replica:
+        predictions = replica.predict(n_weeks, series=[model.training_series] * len(covariates), **kwargs)
+    return [
+        pd.DataFrame({
+            'Week_End_Date': forecast_dates,
+            'predicted_cases': np.rint(prediction.values()[:, 0]).astype(int)
+        })
+        for prediction in predictions
+    ]
+
+
+class PredictionBatcher:
+    """
+    Micro-batches concurrent forecast requests.
+
+    Requests are queued per model family. The first request of a family opens
+    a batch window of window_seconds; everything queued for the family by then
+    (or once max_batch_size requests are waiting) is forecast together on the
+    executor, with one predict call per (model, horizon) and identical
+    requests computed once. Batches of one family run one at a time, so
+    requests arriving while a batch is running form the next batch.
+    """
+
+    def __init__(self, registry: ModelRegistry, window_seconds: float = 0.01, max_batch_size: int = 32,
+                 executor: Optional[Executor] = None):
+        self.registry = registry
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self._executor = executor or ThreadPoolExecutor(thread_name_prefix='predict')
+        self._pending: Dict[str, List[_PredictRequest]] = defaultdict(list)
+        self._flush_tasks: Dict[str, asyncio.Task] = {}
+        self._family_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.counters = {'requests': 0, 'batches': 0, 'forecasts': 0}
+
+    async def forecast(self, model_file: str, n_weeks: int, covariates: Optional['TimeSeries'] = None) -> pd.DataFrame:
+        """
+        Forecast n_weeks with the model in model_file, batched with concurrent requests.
+
+        Args:
+            model_file (str): Path to the model file.
+            n_weeks (int): Number of weeks to forecast.
+            covariates (TimeSeries, optional): Future covariates of the forecast.
+
+        Returns:
+            pd.DataFrame: DataFrame with forecasted dates and predicted cases.
+        """
+        loop = asyncio.get_running_loop()
+        family = get_model_family(model_file)
+        request = _PredictRequest(model_file, n_weeks, covariates, loop.create_future())
+        self.counters['requests'] += 1
+
+        pending = self._pending[family]
+        pending.append(request)
+        if len(pending) >= self.max_batch_size:
+            task = self._flush_tasks.pop(family, None)
+            if task is not None:
+                task.cancel()
+            asyncio.ensure_future(self._flush(family))
+        elif family not in self._flush_tasks:
+            self._flush_tasks[family] = asyncio.ensure_future(self._flush_after(family))
+
+        return await request.future
+
+    async def _flush_after(self, family: str):
+        await asyncio.sleep(self.window_seconds)
+        self._flush_tasks.pop(family, None)
+        await self._flush(family)
+
+    async def _flush(self, family: str):
+        async with self._family_locks[family]:
+            batch = self._pending.pop(family, [])
+            if not batch:
+                return
+            self.counters['batches'] += 1
+            loop = asyncio.get_running_loop()
+            try:
+                results = await loop.run_in_executor(self._executor, self._run_batch, batch)
+            except Exception as e:
+                results = [e] * len(batch)
+
+        for request, result in zip(batch, results):
+            if request.future.done():
+                continue
+            if isinstance(result, Exception):
+                request.future.set_exception(result)
+            else:
+                request.future.set_result(result)
+
+    def _run_batch(self, batch: List[_PredictRequest]) -> List[object]:
+        # Runs on the executor: one predict per (model, horizon), identical requests shared
+        groups: Dict[Tuple[str, int], Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        for position, request in enumerate(batch):
+            groups[(request.model_file, request.n_weeks)][timeseries_fingerprint(request.covariates)].append(position)
+
+        results: List[object] = [None] * len(batch)
+        for (model_file, n_weeks), by_covariates in groups.items():
+            positions = list(by_covariates.values())
+            try:
+                model = self.registry.get(model_file)
+                forecasts = predict_many(model, n_weeks, [batch[group[0]].covariates for group in positions])
+                self.counters['forecasts'] += len(positions)
+            except Exception as e:
+                logger.error(f"Batched forecast failed for {model_file} ({n_weeks} weeks): {e}")
+                forecasts = [e] * len(positions)
+            for group, forecast in zip(positions, forecasts):
+                for position in group:
+                    results[position] = forecast.copy() if isinstance(forecast, pd.DataFrame) else forecast
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Request, batch and forecast counters; 'forecasts' counts distinct forecasts computed.
+
+        Returns:
+            Dict[str, int]: Counters and the number of queued requests.
+        """
+        return dict(self.counters, queued=sum(len(pending) for pending in self._pending.values()))
@@ -0,0 +1,155 @@
+# src/shap_jobs.py
+import time
+import threading
+import contextvars
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+from utils.logger import logger
+
+
+class ShapJob:
+    """Handle of a background SHAP explanation."""
+
+    def __init__(self, key: Hashable, future: Future):
+        self.key = key
+        self.future = future
+        self.submitted_at = time.time()
+        self.sessions: Set[str] = set()
+
+    def done(self) -> bool:
+        """Whether the explanation finished (successfully, with an error or cancelled)."""
+        return self.future.done()
+
+    def result(self) -> Any:
+        """Result of the explanation; raises its exception if it failed."""
+        return self.future.result()
+
+    def elapsed(self) -> float:
+        """Seconds since the job was submitted."""
+        return time.time() - self.submitted_at
+
+
+class ShapJobManager:
+    """
+    Runs SHAP explanations on a thread pool, off the Streamlit script thread.
+
+    Each session has at most one current job. Submitting a job with a
+    different key (e.g. after the district or horizon changed) detaches the
+    session from its previous job, which is cancelled if no other session
+    waits for it and it has not started yet; a job that is already running
+    cannot be interrupted and finishes into the shared result cache, so
+    switching back to it is served instantly. Sessions asking for the same
+    key share one job.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='shap-job')
+        self._jobs: Dict[Hashable, ShapJob] = {}
+        self._session_jobs: Dict[str, Hashable] = {}
+        # Re-entrant: cancelling a pending future runs _on_done on the calling thread
+        self._lock = threading.RLock()
+        self.counters = {'submitted': 0, 'shared': 0, 'cancelled': 0, 'failed': 0}
+
+    def submit(self, session_id: str, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> ShapJob:
+        """
+        Make the session's current job the explanation identified by key, starting it if needed.
+
+        Args:
+            session_id (str): Id of the Streamlit session.
+            key (Hashable): Identity of the explanation, e.g. ShapExplainerService.result_key.
+            func (Callable): Function computing the explanation.
+            *args, **kwargs: Arguments of func.
+
+        Returns:
+            ShapJob: Handle of the job.
+        """
+        with self._lock:
+            previous_key = self._session_jobs.get(session_id)
+            if previous_key is not None and previous_key != key:
+                self._detach(session_id, previous_key)
+
+            job = self._jobs.get(key)
+            if job is None or job.future.cancelled():
+                # The job runs in the submitting context so its trace spans keep the session's labels
+                job = ShapJob(key, self._executor.submit(contextvars.copy_context().run, func, *args, **kwargs))
+                job.future.add_done_callback(lambda future, key=key: self._on_done(key, future))
+                self._jobs[key] = job
+                self.counters['submitted'] += 1
+            elif session_id not in job.sessions:
+                self.counters['shared'] += 1
+
+            job.sessions.add(session_id)
+            self._session_jobs[session_id] = key
+            return job
+
+    def current(self, session_id: str) -> Optional[ShapJob]:
+        """The session's current job, if any."""
+        with self._lock:
+            key = self._session_jobs.get(session_id)
+            return self._jobs.get(key) if key is not None else None
+
+    def release(self, session_id: str):
+        """
+        Detach the session from its current job, e.g. once its result has been rendered.
+
+        Args:
+            session_id (str): Id of the Streamlit session.
+        """
+        with self._lock:
+            key = self._session_jobs.pop(session_id, None)
+            if key is not None:
+                self._detach(session_id, key)
+
+    def _detach(self, session_id: str, key: Hashable):
+        # Caller holds self._lock
+        job = self._jobs.get(key)
+        if job is None:
+            return
+        job.sessions.discard(session_id)
+        if not job.sessions:
+            if job.future.cancel():
+                self.counters['cancelled'] += 1
+                logger.info(f"Cancelled SHAP job {key!r}")
+            if job.done():
+                self._jobs.pop(key, None)
+
+    def _on_done(self, key: Hashable, future: Future):
+        with self._lock:
+            if not future.cancelled() and future.exception() is not None:
+                self.counters['failed'] += 1
+                logger.error(f"SHAP job failed: {future.exception()}")
+            job = self._jobs.get(key)
+            # Results are handed over through the SHAP result cache; only jobs
+            # still watched by a session are kept
+            if job is not None and job.future is future and not job.sessions:
+                del self._jobs[key]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Job counters.
+
+        Returns:
+            Dict[str, int]: Counters and the number of queued or running jobs.
+        """
+        with self._lock:
+            return dict(self.counters, active=sum(not job.done() for job in self._jobs.values()))
+
+
+_shap_jobs: Optional[ShapJobManager] = None
+_shap_jobs_lock = threading.Lock()
+
+
+def get_shap_jobs() -> ShapJobManager:
+    """
+    Process-wide ShapJobManager shared by all sessions.
+
+    Returns:
+        ShapJobManager: Shared job manager.
+    """
+    global _shap_jobs
+    with _shap_jobs_lock:
+        if _shap_jobs is None:
+            _shap_jobs = ShapJobManager()
+        return _shap_jobs
@@ -0,0 +1,365 @@
+# src/shap_service.py
+import copy
+import threading
+import numpy as np
+import pandas as pd
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from utils.hashing import file_sha256, timeseries_fingerprint
+from utils.logger import logger
+from utils.shap_utils import get_explainer, get_shap_explainability
+from utils.single_flight import get_single_flight
+from utils.tracing import get_tracer
+
+if TYPE_CHECKING:
+    from darts import TimeSeries
+    from darts.explainability.shap_explainer import ShapExplainer
+
+
+# darts version whose private _RegressionShapExplainers helpers the incremental
+# background update relies on (see requirements.txt); other versions rebuild explainers
+_INCREMENTAL_UPDATE_DARTS_VERSION = '0.31'
+
+
+def _supports_incremental_update(regression_explainers: Any) -> bool:
+    import darts
+    return (darts.__version__.split('.')[:2] == _INCREMENTAL_UPDATE_DARTS_VERSION.split('.')
+            and all(hasattr(regression_explainers, name) for name in (
+                '_create_regression_model_shap_X', '_build_explainer_sklearn', 'background_X',
+                'is_multioutputregressor', 'shap_method')))
+
+
+def _reservoir_update(background_X: pd.DataFrame, new_X: pd.DataFrame, population: int, num_samples: int,
+                      rng: np.random.Generator) -> Tuple[pd.DataFrame, int]:
+    """
+    Add new rows to a uniform sample of population rows (reservoir sampling).
+
+    Args:
+        background_X (pd.DataFrame): Current sample, at most num_samples rows.
+        new_X (pd.DataFrame): Rows appended to the population.
+        population (int): Number of rows the current sample was drawn from.
+        num_samples (int): Sample size.
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        Tuple[pd.DataFrame, int]: New sample (a copy) and new population size.
+    """
+    new_X = new_X[background_X.columns]
+    # Rows that fit in the sample are added as they are
+    n_fill = min(max(num_samples - len(background_X), 0), len(new_X))
+    sample = pd.concat([background_X, new_X.iloc[:n_fill]], ignore_index=True)
+
+    # Row k of the rest replaces a random slot with probability num_samples / (its population size)
+    rest = new_X.iloc[n_fill:]
+    populations = population + n_fill + np.arange(1, len(rest) + 1)
+    slots = rng.integers(0, populations) if len(rest) else np.empty(0, dtype=int)
+    accepted = np.flatnonzero(slots < num_samples)
+    # When several rows land in the same slot, the last one wins
+    reversed_slots = slots[accepted][::-1]
+    _, last = np.unique(reversed_slots, return_index=True)
+    rows = accepted[::-1][last]
+    if len(rows):
+        sample.iloc[slots[rows]] = rest.iloc[rows].to_numpy()
+    return sample, population + len(new_X)
+
+
+class _ExplainerEntry:
+    """A fitted ShapExplainer together with the background it was built from."""
+
+    def __init__(self, explainer: 'ShapExplainer', background_series: 'TimeSeries',
+                 background_future_covariates: Optional['TimeSeries'], background_num_samples: int):
+        self.explainer = explainer
+        self.background_series = background_series
+        self.background_future_covariates = background_future_covariates
+        self.background_num_samples = background_num_samples
+        # Number of lagged rows the background sample was drawn from, needed to
+        # keep the sample uniform when new weeks are appended (reservoir sampling)
+        self.population = len(background_series) + min(explainer.model.extreme_lags[0] or 0, 0)
+
+
+class ShapExplainerService:
+    """
+    Cache of ShapExplainers and of their explanations.
+
+    Explainers are cached per (model file hash, background fingerprint) and
+    explanation results per (explainer, foreground fingerprint, covariates
+    fingerprint, horizon), both with LRU eviction. When a background series is
+    an extension of an already cached one (new weeks appended), the cached
+    explainer is copied and updated with the lagged rows of the new weeks only
+    instead of being rebuilt from the whole history; cached explainers are
+    never modified, as other sessions may be explaining with them. Concurrent misses of the same
+    explainer or explanation share one computation (see SingleFlight).
+    """
+
+    def __init__(self, max_explainers: int = 8, max_results: int = 64):
+        self.max_explainers = max_explainers
+        self.max_results = max_results
+        self._explainers: 'OrderedDict[Tuple, _ExplainerEntry]' = OrderedDict()
+        self._results: 'OrderedDict[Tuple, Tuple[Any, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'explainer_hits': 0, 'explainer_builds': 0, 'explainer_updates': 0,
+                         'result_hits': 0, 'result_misses': 0}
+
+    @staticmethod
+    def _explainer_key(model_file: str, background_series: 'TimeSeries',
+                       background_future_covariates: Optional['TimeSeries'], background_num_samples: int) -> Tuple:
+        return (file_sha256(model_file), timeseries_fingerprint(background_series),
+                timeseries_fingerprint(background_future_covariates), background_num_samples)
+
+    def _find_prefix_entry(self, model_hash: str, background_series: 'TimeSeries',
+                           background_future_covariates: Optional['TimeSeries'], background_num_samples: int):
+        # A cached explainer of the same model whose background is a strict prefix of the new one
+        for key, entry in reversed(self._explainers.items()):
+            if key[0] != model_hash or key[3] != background_num_samples:
+                continue
+            n_old = len(entry.background_series)
+            if n_old >= len(background_series) or entry.background_series.start_time() != background_series.start_time():
+                continue
+            if timeseries_fingerprint(background_series[:n_old]) != key[1]:
+                continue
+            if background_future_covariates is not None or entry.background_future_covariates is not None:
+                if background_future_covariates is None or entry.background_future_covariates is None:
+                    continue
+                n_old_cov = len(entry.background_future_covariates)
+                if timeseries_fingerprint(background_future_covariates[:n_old_cov]) != key[2]:
+                    continue
+            return key, entry
+        return None, None
+
+    def _append_background(self, entry: _ExplainerEntry, background_series: 'TimeSeries',
+                           background_future_covariates: Optional['TimeSeries']) -> _ExplainerEntry:
+        # Returns a new entry; entry itself is left untouched, as other sessions may be explaining with it
+        regression_explainers = entry.explainer.explainers
+        if not _supports_incremental_update(regression_explainers):
+            raise NotImplementedError(
+                f"incremental background updates need darts {_INCREMENTAL_UPDATE_DARTS_VERSION}.x internals")
+
+        n_new = len(background_series) - len(entry.background_series)
+        # Lagged features of the appended weeks only; the lookback window is taken from the full series
+        new_X = regression_explainers._create_regression_model_shap_X(
+            background_series, None, background_future_covariates, train=False
+        ).tail(n_new).reset_index(drop=True)
+        background_X, population = _reservoir_update(
+            regression_explainers.background_X.reset_index(drop=True), new_X,
+            entry.population, entry.background_num_samples, np.random.default_rng())
+
+        # Shallow copies whose background attributes are replaced, never mutated
+        updated_regression_explainers = copy.copy(regression_explainers)
+        updated_regression_explainers.background_X = background_X
+        updated_regression_explainers.background_series = [background_series]
+        updated_regression_explainers.background_future_covariates = (
+            [background_future_covariates] if background_future_covariates is not None else None)
+        if regression_explainers.is_multioutputregressor:
+            updated_regression_explainers.explainers = {
+                i: {j: regression_explainers._build_explainer_sklearn(
+                    regression_explainers.model.get_multioutput_estimator(horizon=i, target_dim=j),
+                    background_X, regression_explainers.shap_method)
+                    for j in range(regression_explainers.target_dim)}
+                for i in range(regression_explainers.n)}
+        else:
+            updated_regression_explainers.explainers = regression_explainers._build_explainer_sklearn(
+                regression_explainers.model.model, background_X, regression_explainers.shap_method)
+
+        explainer = copy.copy(entry.explainer)
+        explainer.explainers = updated_regression_explainers
+        explainer.background_series = [background_series]
+        explainer.background_future_covariates = (
+            [background_future_covariates] if background_future_covariates is not None else None)
+
+        updated = _ExplainerEntry(explainer, background_series, background_future_covariates,
+                                  entry.background_num_samples)
+        updated.population = population
+        return updated
+
+    def get_explainer(self, model: object, model_file: str, background_series: 'TimeSeries',
+                      background_future_covariates: Optional['TimeSeries'] = None,
+                      background_num_samples: int = 800) -> 'ShapExplainer':
+        """
+        Return a cached ShapExplainer for the model and background, building or updating it if needed.
+
+        Args:
+            model: Trained regression model loaded from model_file.
+            model_file (str): Path to the model file, used to key the cache.
+            background_series (TimeSeries): Background target series.
+            background_future_covariates (TimeSeries, optional): Background future covariates.
+            background_num_samples (int): Number of background samples.
+
+        Returns:
+            ShapExplainer: Fitted explainer.
+        """
+        key = self._explainer_key(model_file, background_series, background_future_covariates, background_num_samples)
+        with self._lock:
+            entry = self._explainers.get(key)
+            if entry is not None:
+                self._explainers.move_to_end(key)
+                self.counters['explainer_hits'] += 1
+                return entry.explainer
+        return get_single_flight('shap_explainer').do(
+            key, self._load_explainer, key, model, model_file, background_series, background_future_covariates,
+            background_num_samples)
+
+    def _load_explainer(self, key: Tuple, model: object, model_file: str, background_series: 'TimeSeries',
+                        background_future_covariates: Optional['TimeSeries'],
+                        background_num_samples: int) -> 'ShapExplainer':
+        # Build or update the explainer of key; runs once for concurrent callers
+        with self._lock:
+            # It may have been added since the caller's lookup
+            entry = self._explainers.get(key)
+            if entry is not None:
+                self._explainers.move_to_end(key)
+                return entry.explainer
+
+            # The prefix entry stays cached and in use; the update builds a new explainer from it
+            _, old_entry = self._find_prefix_entry(
+                key[0], background_series, background_future_covariates, background_num_samples)
+
+        entry = None
+        event = 'explainer_builds'
+        if old_entry is not None:
+            try:
+                entry = self._append_background(old_entry, background_series, background_future_covariates)
+                event = 'explainer_updates'
+                logger.info(f"Updated SHAP explainer of {model_file} with "
+                            f"{len(background_series) - len(old_entry.background_series)} new weeks.")
+            except Exception as e:
+                logger.warning(f"Incremental SHAP background update failed, rebuilding explainer: {e}")
+
+        if entry is None:
+            explainer = get_explainer(model, background_series, background_future_covariates,
+                                      background_num_samples=background_num_samples)
+            entry = _ExplainerEntry(explainer, background_series, background_future_covariates,
+                                    background_num_samples)
+
+        with self._lock:
+            self.counters[event] += 1
+            self._explainers[key] = entry
+            while len(self._explainers) > self.max_explainers:
+                self._explainers.popitem(last=False)
+        return entry.explainer
+
+    def result_key(self, model_file: str, background_series: 'TimeSeries',
+                   background_future_covariates: Optional['TimeSeries'], foreground_series: 'TimeSeries',
+                   foreground_future_covariates: Optional['TimeSeries'] = None, horizon: int = 12,
+                   background_num_samples: int = 800) -> Tuple:
+        """
+        Key of an explanation in the result cache; see explain for the arguments.
+
+        Returns:
+            Tuple: Hashable key identifying the explanation.
+        """
+        return self._explainer_key(model_file, background_series, background_future_covariates,
+                                   background_num_samples) + (
+            timeseries_fingerprint(foreground_series), timeseries_fingerprint(foreground_future_covariates), horizon)
+
+    def cached_result(self, key: Tuple) -> Optional[Tuple[Any, Any]]:
+        """
+        Explanation stored under key, without computing it.
+
+        Args:
+            key (Tuple): Key returned by result_key.
+
+        Returns:
+            Tuple: (ShapExplainabilityResult, force plot), or None if not cached.
+        """
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                self.counters['result_hits'] += 1
+            return cached
+
+    def explain(self, model: object, model_file: str, background_series: 'TimeSeries',
+                background_future_covariates: Optional['TimeSeries'], foreground_series: 'TimeSeries',
+                foreground_future_covariates: Optional['TimeSeries'] = None, horizon: int = 12,
+                background_num_samples: int = 800) -> Tuple[Any, Any]:
+        """
+        SHAP explanation and force plot of a forecast, served from cache when possible.
+
+        Args:
+            model: Trained regression model loaded from model_file.
+            model_file (str): Path to the model file.
+            background_series (TimeSeries): Background target series.
+            background_future_covariates (TimeSeries, optional): Background future covariates.
+            foreground_series (TimeSeries): Series to explain.
+            foreground_future_covariates (TimeSeries, optional): Future covariates of the foreground.
+            horizon (int): Forecast horizon to explain.
+            background_num_samples (int): Number of background samples.
+
+        Returns:
+            Tuple: (ShapExplainabilityResult, force plot).
+        """
+        key = self.result_key(model_file, background_series, background_future_covariates, foreground_series,
+                              foreground_future_covariates, horizon, background_num_samples)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                self.counters['result_hits'] += 1
+                return cached
+            self.counters['result_misses'] += 1
+
+        return get_single_flight('shap_explain').do(
+            key, self._compute_explanation, key, model, model_file, background_series, background_future_covariates,
+            foreground_series, foreground_future_covariates, horizon, background_num_samples)
+
+    def _compute_explanation(self, key: Tuple, model: object, model_file: str, background_series: 'TimeSeries',
+                             background_future_covariates: Optional['TimeSeries'], foreground_series: 'TimeSeries',
+                             foreground_future_covariates: Optional['TimeSeries'], horizon: int,
+                             background_num_samples: int) -> Tuple[Any, Any]:
+        # Compute and cache the explanation of key; runs once for concurrent callers
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                return cached
+
+        with get_tracer().span('shap', family=type(model).__name__):
+            explainer = self.get_explainer(model, model_file, background_series, background_future_covariates,
+                                           background_num_samples)
+            results = get_shap_explainability(explainer, foreground_series, foreground_future_covariates,
+                                              horizons=horizon)
+            force_plot = explainer.force_plot_from_ts(
+                foreground_series=foreground_series,
+                foreground_future_covariates=foreground_future_covariates,
+                horizon=horizon
+            )
+
+        with self._lock:
+            self._results[key] = (results, force_plot)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return results, force_plot
+
+    def clear_results(self):
+        """Drop the cached explanations, keeping the explainers; used to time uncached explanations."""
+        with self._lock:
+            self._results.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit, build and update counters of the service.
+
+        Returns:
+            Dict[str, int]: Counters and current cache sizes.
+        """
+        with self._lock:
+            return dict(self.counters, explainers=len(self._explainers), results=len(self._results))
+
+
+_shap_service: Optional[ShapExplainerService] = None
+_shap_service_lock = threading.Lock()
+
+
+def get_shap_service() -> ShapExplainerService:
+    """
+    Process-wide ShapExplainerService shared by all sessions.
+
+    Returns:
+        ShapExplainerService: Shared SHAP service.
+    """
+    global _shap_service
+    with _shap_service_lock:
+        if _shap_service is None:
+            _shap_service = ShapExplainerService()
+        return _shap_service
@@ -1,24 +1,111 @@
-import shap
+import pandas as pd
 import plotly.graph_objects as go
 import streamlit.components.v1 as components
 
+from typing import TYPE_CHECKING, Optional, Tuple
 
-from darts import TimeSeries
-from darts.explainability.shap_explainer import ShapExplainer
+from config.constants import WEATHER_COVARIATE_COLUMNS
 
+# shap and darts are imported by the functions that use them, so importing
+# this module (e.g. for the plots) does not load them
+if TYPE_CHECKING:
+    from darts import TimeSeries
+    from darts.explainability.shap_explainer import ShapExplainer
 
-def get_explainer(model: object, background_series: TimeSeries, background_future_covariates: TimeSeries = None, background_num_samples: int = 800) -> ShapExplainer:
+
+# Estimators explained with exact TreeSHAP on their trees
+TREE_ESTIMATORS = {
+    'RandomForestRegressor', 'ExtraTreesRegressor', 'GradientBoostingRegressor', 'DecisionTreeRegressor',
+    'ExtraTreeRegressor', 'LGBMRegressor', 'CatBoostRegressor', 'XGBRegressor'
+}
+
+
+def get_shap_method(model: object) -> Optional[str]:
+    """
+    Pick the exact SHAP algorithm for a darts regression model from its underlying estimators.
+
+    darts' defaults use the sampling-based permutation explainer for some tree
+    ensembles (e.g. RandomForestRegressor) and for Ridge, which is orders of
+    magnitude slower than the exact algorithms.
+
+    Args:
+        model: Trained darts regression model.
+
+    Returns:
+        str: 'tree' for tree ensembles, 'linear' for linear estimators, or None
+            to let darts choose (KernelSHAP for other estimators).
+    """
+    estimator = getattr(model, 'model', None)
+    # multi_models regression models wrap one estimator per horizon in a MultiOutputRegressor
+    estimators = getattr(estimator, 'estimators_', None) if type(estimator).__name__ == 'MultiOutputRegressor' else None
+    estimators = list(estimators) if estimators is not None else [estimator]
+
+    if all(type(e).__name__ in TREE_ESTIMATORS for e in estimators):
+        return 'tree'
+    if all(hasattr(e, 'coef_') and hasattr(e, 'intercept_') for e in estimators):
+        return 'linear'
+    return None
+
+
+def get_explainer(model: object, background_series: 'TimeSeries', background_future_covariates: 'TimeSeries' = None, background_num_samples: int = 800) -> 'ShapExplainer':
+    from darts.explainability.shap_explainer import ShapExplainer
+
+    # Tree models use path-dependent TreeSHAP on the lagged features, which
+    # does not need the background sample; linear models only use its mean
     explainer = ShapExplainer(model, background_series=background_series,
-                              background_future_covariates=background_future_covariates, background_num_samples=background_num_samples)
+                              background_future_covariates=background_future_covariates, background_num_samples=background_num_samples,
+                              shap_method=get_shap_method(model))
     return explainer
 
 
-def get_shap_explainability(explainer: ShapExplainer, foreground_series: TimeSeries, foreground_future_covariates: TimeSeries = None, horizons: int = 12) -> TimeSeries:
+def get_shap_explainability(explainer: 'ShapExplainer', foreground_series: 'TimeSeries', foreground_future_covariates: 'TimeSeries' = None, horizons: int = 12) -> 'TimeSeries':
     shap_explainability = explainer.explain(foreground_series=foreground_series,
                                     foreground_future_covariates=foreground_future_covariates, horizons=horizons)
     return shap_explainability
 
-def plot_feature_importance(shap_values: TimeSeries):
+def build_foreground_series(
+    filtered_data: pd.DataFrame,
+    forecast_df: pd.DataFrame,
+    weather_data: Optional[pd.DataFrame] = None
+) -> Tuple['TimeSeries', Optional['TimeSeries']]:
+    """
+    Build the foreground series (and covariates) explained for a forecast.
+
+    The foreground is 12 weeks of history followed by the forecast; covariates
+    are the matching historical weather followed by the uploaded weather data.
+
+    Args:
+        filtered_data (pd.DataFrame): Historical data of the district.
+        forecast_df (pd.DataFrame): Forecast from forecast_cases.
+        weather_data (pd.DataFrame, optional): Weather data used for the forecast.
+
+    Returns:
+        Tuple[TimeSeries, Optional[TimeSeries]]: Foreground series and future covariates.
+    """
+    from darts import TimeSeries
+
+    target_col = 'Number_of_Cases'
+
+    forecasted_df = forecast_df.rename(columns={'predicted_cases': target_col})
+    filtered_last_12 = filtered_data[['Week_End_Date', target_col]][:-12].tail(12)
+    final_df = pd.concat([filtered_last_12, forecasted_df]).sort_values(
+        by='Week_End_Date').reset_index(drop=True)
+    forecasted_series = TimeSeries.from_dataframe(final_df, time_col='Week_End_Date', value_cols=[target_col])
+
+    if weather_data is None:
+        return forecasted_series, None
+
+    covariates_last_12 = filtered_data[['Week_End_Date'] + WEATHER_COVARIATE_COLUMNS][:-12].tail(12)
+    covariates_given = weather_data[['Week_End_Date'] + WEATHER_COVARIATE_COLUMNS]
+    final_covariates_df = pd.concat([covariates_last_12, covariates_given]).sort_values(
+        by='Week_End_Date').reset_index(drop=True)
+    covariates_series = TimeSeries.from_dataframe(
+        final_covariates_df, time_col='Week_End_Date', value_cols=WEATHER_COVARIATE_COLUMNS)
+
+    return forecasted_series, covariates_series
+
+
+def plot_feature_importance(shap_values: 'TimeSeries'):
     """
     Generate a Plotly line chart for SHAP values over time for multiple features,
     with vertical lines at specified dates.
@@ -80,7 +167,7 @@ def plot_feature_importance(shap_values: TimeSeries):
     return fig
 
 
-def plot_feature_values(feature_values: TimeSeries):
+def plot_feature_values(feature_values: 'TimeSeries'):
     """
     Generate a Plotly line chart for feature values over time for multiple features,
     with vertical lines at specified dates.
@@ -141,7 +228,7 @@ def plot_feature_values(feature_values: TimeSeries):
     return fig
 
 
-def force_plot(shap_values: TimeSeries):
+def force_plot(shap_values: 'TimeSeries'):
     """
     Generate a Plotly force plot for SHAP values over time for multiple features.
 
@@ -213,6 +300,8 @@ def st_shap(plot, height=None):
             </style>
             """
     
+    import shap
+
     # Construct the HTML with the specified styles and SHAP plot
     shap_html = f"<head>{shap.getjs()}{style}</head><body>{plot.html()}</body>"
     
@@ -0,0 +1,106 @@
+# src/single_flight.py
+import threading
+
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+from utils.logger import logger
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one computation.
+
+    The first caller of a key runs the computation; callers arriving while it
+    is in flight wait for it and share its result (or its exception). Nothing
+    is kept once the computation finishes, so results must be cached by the
+    caller if later calls should reuse them.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.counters = {'executed': 0, 'coalesced': 0, 'failed': 0}
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Return func(*args, **kwargs), sharing one computation between concurrent callers of key.
+
+        Args:
+            key (Hashable): Identity of the computation, e.g. (model hash, horizon, covariate hash).
+            func (Callable): Function computing the result.
+            *args, **kwargs: Arguments of func.
+
+        Returns:
+            The result of the computation.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.counters['executed'] += 1
+            else:
+                self.counters['coalesced'] += 1
+
+        if not leader:
+            logger.info(f"Waiting for in-flight {self.name} computation {key!r}")
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                self.counters['failed'] += 1
+                del self._calls[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._calls[key]
+        future.set_result(result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Coalescing counters.
+
+        Returns:
+            Dict[str, int]: Computations executed, calls coalesced into an
+                in-flight computation (computations saved), failures and in-flight keys.
+        """
+        with self._lock:
+            return dict(self.counters, in_flight=len(self._calls))
+
+
+_single_flights: Dict[str, SingleFlight] = {}
+_single_flights_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """
+    Process-wide SingleFlight group of a kind of computation, e.g. 'forecast'.
+
+    Args:
+        name (str): Name of the group.
+
+    Returns:
+        SingleFlight: Shared group.
+    """
+    with _single_flights_lock:
+        group = _single_flights.get(name)
+        if group is None:
+            group = _single_flights[name] = SingleFlight(name)
+        return group
+
+
+def single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Counters of all SingleFlight groups.
+
+    Returns:
+        Dict[str, Dict[str, int]]: Group name -> counters (see SingleFlight.stats).
+    """
+    with _single_flights_lock:
+        groups = dict(_single_flights)
+    return {name: group.stats() for name, group in groups.items()}
@@ -0,0 +1,257 @@
+# src/tracing.py
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+import contextvars
+import tracemalloc
+
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from config.constants import TRACE_LATENCY_BUCKETS, TRACE_LOG_FILE, TRACE_MEMORY
+from utils.logger import logger
+
+# Labels (district, family, ...) inherited by the spans of the current context
+_trace_labels: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar('trace_labels', default={})
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size of the process in bytes, or None where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class StageHistogram:
+    """Latency histogram and memory totals of one (stage, district, family)."""
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.errors = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.rss_delta_bytes = 0
+        self.alloc_delta_bytes = 0
+
+    def observe(self, seconds: float, error: bool, rss_delta: Optional[int], alloc_delta: Optional[int]):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.errors += error
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        self.rss_delta_bytes += rss_delta or 0
+        self.alloc_delta_bytes += alloc_delta or 0
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound below which a fraction q of the observations fall."""
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count, 'errors': self.errors, 'sum_seconds': self.sum,
+            'mean_seconds': self.sum / self.count if self.count else 0.0, 'max_seconds': self.max,
+            'p50_seconds': self.quantile(0.5), 'p95_seconds': self.quantile(0.95),
+            'buckets': {str(bound): count for bound, count in zip(self.buckets + ['inf'], self.counts)},
+            'rss_delta_bytes': self.rss_delta_bytes, 'alloc_delta_bytes': self.alloc_delta_bytes,
+        }
+
+
+class Tracer:
+    """
+    Timed spans around the stages of a request, aggregated into histograms.
+
+    Each span is recorded in a latency histogram per stage, district and model
+    family, and optionally written as one JSON line to log_file. Spans take
+    their district and family from the labels of the current context (see
+    set_labels) unless given explicitly. With memory=True, spans also record
+    the change of the process RSS and of the memory traced by tracemalloc;
+    concurrent spans share these process-wide counters, so memory deltas are
+    only exact for spans that do not overlap.
+    """
+
+    def __init__(self, memory: bool = TRACE_MEMORY, log_file: str = TRACE_LOG_FILE,
+                 buckets: List[float] = TRACE_LATENCY_BUCKETS):
+        self.memory = memory
+        self.buckets = sorted(buckets)
+        self._histograms: Dict[Tuple[str, str, str], StageHistogram] = {}
+        self._lock = threading.Lock()
+        self._json_log: Optional[logging.Logger] = None
+        if log_file:
+            self._json_log = logging.getLogger(f'{__name__}.spans')
+            self._json_log.propagate = False
+            self._json_log.setLevel(logging.INFO)
+            if not self._json_log.handlers:
+                self._json_log.addHandler(logging.FileHandler(log_file))
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @staticmethod
+    def set_labels(**labels: str):
+        """
+        Set the labels inherited by the spans of the current context, e.g. the
+        selected district of a Streamlit rerun.
+        """
+        _trace_labels.set({key: str(value) for key, value in labels.items() if value is not None})
+
+    @contextmanager
+    def labels(self, **labels: str) -> Iterator[None]:
+        """Add labels to the spans opened inside the with block."""
+        token = _trace_labels.set({**_trace_labels.get(), **{key: str(value) for key, value in labels.items()
+                                                             if value is not None}})
+        try:
+            yield
+        finally:
+            _trace_labels.reset(token)
+
+    @contextmanager
+    def span(self, stage: str, **labels: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time the with block as one occurrence of stage.
+
+        Args:
+            stage (str): Name of the stage, e.g. 'load_model'.
+            **labels: Labels of the span; 'district' and 'family' key the histograms.
+
+        Yields:
+            Dict: Labels of the span, to which the block may add more (e.g. cache='hit').
+        """
+        labels = {**_trace_labels.get(), **{key: str(value) for key, value in labels.items() if value is not None}}
+        rss_start = rss_bytes() if self.memory else None
+        alloc_start = tracemalloc.get_traced_memory()[0] if self.memory and tracemalloc.is_tracing() else None
+        error = False
+        start = time.perf_counter()
+        try:
+            yield labels
+        except BaseException:
+            error = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            rss_delta = rss_bytes() - rss_start if rss_start is not None else None
+            alloc_delta = tracemalloc.get_traced_memory()[0] - alloc_start if alloc_start is not None else None
+            self.record(stage, seconds, labels, error, rss_delta, alloc_delta)
+
+    def record(self, stage: str, seconds: float, labels: Dict[str, str], error: bool = False,
+               rss_delta: Optional[int] = None, alloc_delta: Optional[int] = None):
+        """Add one span to the histograms and the JSON log."""
+        key = (stage, labels.get('district', ''), labels.get('family', ''))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = StageHistogram(self.buckets)
+            histogram.observe(seconds, error, rss_delta, alloc_delta)
+        if self._json_log is not None:
+            self._json_log.info(json.dumps({
+                'ts': time.time(), 'stage': stage, 'seconds': round(seconds, 6), 'error': error,
+                'rss_delta_bytes': rss_delta, 'alloc_delta_bytes': alloc_delta, **labels
+            }))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Histograms of all recorded stages.
+
+        Returns:
+            Dict: 'stages' (one entry per stage, district and family), the current
+                RSS and, with memory tracing, the current and peak traced memory.
+        """
+        with self._lock:
+            stages = [dict(stage=stage, district=district, family=family, **histogram.to_dict())
+                      for (stage, district, family), histogram in sorted(self._histograms.items())]
+        snapshot = {'stages': stages, 'rss_bytes': rss_bytes()}
+        if self.memory and tracemalloc.is_tracing():
+            snapshot['traced_bytes'], snapshot['traced_peak_bytes'] = tracemalloc.get_traced_memory()
+        return snapshot
+
+    def reset(self):
+        """Drop all recorded histograms."""
+        with self._lock:
+            self._histograms.clear()
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """
+    Process-wide Tracer, configured by TRACE_MEMORY and TRACE_LOG_FILE.
+
+    Returns:
+        Tracer: Shared tracer.
+    """
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer()
+        return _tracer
+
+
+def traced(stage: Optional[str] = None) -> Callable:
+    """
+    Decorator running every call of a function in a span of the shared tracer.
+
+    Args:
+        stage (str, optional): Name of the stage, by default the function name.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(stage or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_metrics_server(port: int, extra: Optional[Callable[[], Dict[str, Any]]] = None,
+                         host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """
+    Serve the tracer snapshot as JSON on http://host:port/metrics from a daemon thread.
+
+    Args:
+        port (int): Port to listen on.
+        extra (Callable, optional): Returns more metrics to include, e.g. model registry metrics.
+        host (str): Interface to listen on; local only by default.
+
+    Returns:
+        ThreadingHTTPServer: The running server.
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            metrics = get_tracer().snapshot()
+            if extra is not None:
+                metrics.update(extra())
+            body = json.dumps(metrics, default=str).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
@@ -1,16 +1,21 @@
-import pdfplumber
 import re
-import pandas as pd
 from dateutil import parser
 import os
 
 pattern = re.compile(r'Week (\d{2})\s*\(?\s*(\d{1,2}(?:st|nd|rd|th)?)\s*(\w+)?\s*(?:–|-)\s*(\d{1,2}(?:st|nd|rd|th)?)\s*(\w*)\s+(\d{4})\)?')
 
-# List to store the extracted data
-extracted_data = []
+# Version of the rows produced by process_pdf; bump it whenever the parsing
+# logic changes so previously cached bulletins are parsed again
+PARSER_VERSION = 2
 
 # Function to process a single PDF file
 def process_pdf(pdf_file):
+    # pdfplumber is only needed once a bulletin is uploaded
+    import pdfplumber
+
+    # Rows extracted from this file
+    extracted_data = []
+
     with pdfplumber.open(pdf_file) as pdf:
         page = pdf.pages[0]
         # Extract text from the page
@@ -45,9 +50,17 @@ def process_pdf(pdf_file):
                 start_date_str = f"{start_day} {start_month}"
                 end_date_str = f"{end_day} {end_month}"
             
-            # Parse dates to convert to desired format
-            start_date = parser.parse(start_date_str).strftime('%Y-%m-%d')
-            end_date = parser.parse(end_date_str).strftime('%Y-%m-%d')
+            # Parse dates in the bulletin's year (not the current one); the
+            # first and last weeks of a year may span December and January
+            start = parser.parse(f"{start_date_str} {year}")
+            end = parser.parse(f"{end_date_str} {year}")
+            if start > end:
+                if int(week_number) <= 2:
+                    start = start.replace(year=start.year - 1)
+                else:
+                    end = end.replace(year=end.year + 1)
+            start_date = start.strftime('%Y-%m-%d')
+            end_date = end.strftime('%Y-%m-%d')
 
             # Process the table data
             for row in table[4:]:  # Assuming header and initial rows need to be skipped
@@ -65,53 +78,13 @@ def process_pdf(pdf_file):
                         "District": district,
                         "Number_of_Cases": number_of_cases
                     })
-                    
-            
-
-def extract_pdf(pdf_files):
-    for file in pdf_files:
-        filename = file.name
-        
-        match = re.search(r'Week (\d+)', filename)
-        if match:
-            week_number = match.group(1)  # Extract the week number
-            print(f'Week Number: {week_number}')
-        else:
-            print("Week number not found.")
 
-        process_pdf(file)
     return extracted_data
 
 
-def aggregate_yearly_cases_all_districts(data, district):
-    # Filter the data for the selected district
-    print(data)
-    district_data = data[data['District'] == district]
-
-    # Convert the 'date' column to datetime format if it's not already
-    district_data['Week_End_Date'] = pd.to_datetime(district_data['Week_End_Date'])
-
-    # Extract the year from the date and group by year and district to get the count of cases
-    yearly_data = data.groupby([data['Week_End_Date'].dt.year, 'District'])['Number_of_Cases'].sum().reset_index()
-    yearly_data.columns = ['Year', 'District', 'Number_of_Cases']  # Rename columns for clarity
-
-
-    return yearly_data
-
-def aggregate_weekly_cases(data, selected_district):
-    # Convert the 'date' column to datetime format if it's not already
-    data['Week_End_Date'] = pd.to_datetime(data['Week_End_Date'])
-    
-    # Filter data for the selected district
-    district_data = data[data['District'] == selected_district]
-
-    # Set date as index
-    district_data.set_index('Week_End_Date', inplace=True)
-
-    # Resample to weekly frequency and sum the cases
-    weekly_data = district_data.resample('W')['Number_of_Cases'].sum().reset_index()
-
-    # Extract year for plotting
-    weekly_data['Year'] = weekly_data['Week_End_Date'].dt.year
-    
-    return weekly_data
+def extract_pdf(pdf_files):
+    # Rows are collected per call, so nothing is shared between sessions
+    extracted_data = []
+    for file in pdf_files:
+        extracted_data.extend(process_pdf(file))
+    return extracted_data
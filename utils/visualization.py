@@ -1,10 +1,12 @@
 # src/visualization.py
-import numpy as np
 import plotly.express as px
-import matplotlib.pyplot as plt
+import plotly.graph_objects as go
 import pandas as pd
 
+from utils.tracing import traced
 
+
+@traced()
 def plot_historical_data(data: pd.DataFrame, district_name: str, column_name: str):
     """
     Plot historical dengue cases.
@@ -27,6 +29,7 @@ def plot_historical_data(data: pd.DataFrame, district_name: str, column_name: st
     return fig
 
 
+@traced()
 def plot_forecast(forecast_df: pd.DataFrame, district_name: str):
     """
     Plot forecasted dengue cases.
@@ -50,6 +53,7 @@ def plot_forecast(forecast_df: pd.DataFrame, district_name: str):
     return fig
 
 
+@traced()
 def plot_comparison(historical_df: pd.DataFrame, forecast_df: pd.DataFrame, district_name: str):
     """
     Plot comparison between historical and forecasted dengue cases.
@@ -80,6 +84,7 @@ def plot_comparison(historical_df: pd.DataFrame, forecast_df: pd.DataFrame, dist
     return fig
 
 
+@traced()
 def plot_yearly_cases_all_districts(yearly_data):
     # Create a line plot for yearly cases for all districts
     fig = px.line(yearly_data, x='Year', y='Number_of_Cases', color='District',
@@ -90,21 +95,12 @@ def plot_yearly_cases_all_districts(yearly_data):
     return fig
 
 
+@traced()
 def plot_weekly_cases(weekly_data):
-    # Create a new DataFrame to hold the week and case data
-    weekly_data_list = []
-
-    # Loop through each year to prepare data for Plotly
-    for year in weekly_data['Year'].unique():
-        year_data = weekly_data[weekly_data['Year'] == year]
-        # Generate Week numbers from 1 to len(year_data)
-        year_data['Week'] = np.arange(1, len(year_data) + 1)
-
-        # Append year data to the list for each year
-        weekly_data_list.append(year_data)
-
-    # Concatenate all year data into a single DataFrame
-    combined_data = pd.concat(weekly_data_list)
+    # Number the weeks of each year from 1, unless precomputed (see MaterializedAggregates)
+    combined_data = weekly_data
+    if 'Week' not in combined_data.columns:
+        combined_data = weekly_data.assign(Week=weekly_data.groupby('Year').cumcount() + 1)
 
     # Create a line plot for weekly cases
     fig = px.line(combined_data, x='Week', y='Number_of_Cases', color='Year',
@@ -117,3 +113,30 @@ def plot_weekly_cases(weekly_data):
                       yaxis_title='Number of Cases', xaxis_tickangle=-45)
 
     return fig
+
+
+@traced()
+def plot_forecast_scenarios(bands: pd.DataFrame, district_name: str):
+    """
+    Plot the spread of forecasts under perturbed weather scenarios.
+
+    Args:
+        bands (pd.DataFrame): Output of forecast_scenarios, with q05, q25, q50, q75 and q95 columns.
+        district_name (str): Name of the district.
+
+    Returns:
+        Plotly Figure.
+    """
+    fig = go.Figure()
+    for lower, upper, opacity in [('q05', 'q95', 0.15), ('q25', 'q75', 0.3)]:
+        fig.add_trace(go.Scatter(x=bands['Week_End_Date'], y=bands[upper], mode='lines',
+                                 line=dict(width=0), showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=bands['Week_End_Date'], y=bands[lower], mode='lines', line=dict(width=0),
+                                 fill='tonexty', fillcolor=f'rgba(99, 110, 250, {opacity})',
+                                 name=f'{lower[1:]}-{upper[1:]}% of scenarios'))
+    fig.add_trace(go.Scatter(x=bands['Week_End_Date'], y=bands['q50'], mode='lines', name='Median scenario'))
+    fig.add_trace(go.Scatter(x=bands['Week_End_Date'], y=bands['predicted_cases'], mode='lines',
+                             line=dict(dash='dash'), name='Unperturbed weather'))
+    fig.update_layout(title=f'Forecasted Dengue Cases under Weather Scenarios for {district_name}',
+                      xaxis_title='Week End Date', yaxis_title='Predicted Cases', hovermode='x unified')
+    return fig
@@ -0,0 +1,147 @@
+# src/weather_scenarios.py
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+from config.constants import (SCENARIO_PRECIPITATION_SD, SCENARIO_QUANTILES, SCENARIO_TEMPERATURE_SD,
+                              WEATHER_COVARIATE_COLUMNS)
+from utils.logger import logger
+from utils.model_handler import forecast_cases, get_forecast_dates, get_training_end, weather_to_timeseries
+from utils.prediction_batcher import is_batchable, predict_many
+
+if TYPE_CHECKING:
+    from darts import TimeSeries
+
+TEMPERATURE_COLUMNS = [col for col in WEATHER_COVARIATE_COLUMNS if 'Temp' in col]
+PRECIPITATION_COLUMNS = ['Total Precipitation (mm)']
+
+
+def perturb_weather(
+    weather_data: pd.DataFrame,
+    n_scenarios: int,
+    temperature_sd: float = SCENARIO_TEMPERATURE_SD,
+    precipitation_sd: float = SCENARIO_PRECIPITATION_SD,
+    seed: Optional[int] = None
+) -> np.ndarray:
+    """
+    Draw perturbed copies of a weather forecast.
+
+    Temperatures of a scenario are shifted by a scenario-wide offset plus a
+    weekly deviation (half the spread), the same for all temperature columns;
+    rainfall is scaled by a weekly log-normal factor with mean 1. Other
+    covariates are left unchanged.
+
+    Args:
+        weather_data (pd.DataFrame): Weather data with the columns in WEATHER_COVARIATE_COLUMNS.
+        n_scenarios (int): Number of scenarios to draw.
+        temperature_sd (float): Standard deviation of the temperature shift, in °C.
+        precipitation_sd (float): Standard deviation of the log rainfall factor.
+        seed (int, optional): Seed of the random generator.
+
+    Returns:
+        np.ndarray: Covariate values of shape (n_scenarios, weeks, len(WEATHER_COVARIATE_COLUMNS)).
+    """
+    rng = np.random.default_rng(seed)
+    base = weather_data[WEATHER_COVARIATE_COLUMNS].to_numpy(dtype=np.float64)
+    n_weeks = base.shape[0]
+    values = np.broadcast_to(base, (n_scenarios,) + base.shape).copy()
+
+    temperature_idx = [WEATHER_COVARIATE_COLUMNS.index(col) for col in TEMPERATURE_COLUMNS]
+    temperature_shift = (rng.normal(0.0, temperature_sd, (n_scenarios, 1, 1))
+                         + rng.normal(0.0, temperature_sd / 2, (n_scenarios, n_weeks, 1)))
+    values[:, :, temperature_idx] += temperature_shift
+
+    precipitation_idx = [WEATHER_COVARIATE_COLUMNS.index(col) for col in PRECIPITATION_COLUMNS]
+    rainfall_factor = np.exp(rng.normal(-precipitation_sd ** 2 / 2, precipitation_sd,
+                                        (n_scenarios, n_weeks, len(precipitation_idx))))
+    values[:, :, precipitation_idx] *= rainfall_factor
+    return values
+
+
+def scenarios_to_timeseries(weather_data: pd.DataFrame, values: np.ndarray) -> List['TimeSeries']:
+    """
+    Convert scenario covariate values into future-covariate TimeSeries.
+
+    Args:
+        weather_data (pd.DataFrame): Weather data the scenarios were drawn from, for its 'Week_End_Date'.
+        values (np.ndarray): Output of perturb_weather.
+
+    Returns:
+        List[TimeSeries]: One covariate series per scenario.
+    """
+    # Scenarios share the time index and components of the unperturbed series
+    base = weather_to_timeseries(weather_data)
+    return [base.with_values(scenario[:, :, np.newaxis]) for scenario in values]
+
+
+def forecast_scenarios(
+    model: object,
+    n_weeks: int,
+    weather_data: pd.DataFrame,
+    n_scenarios: int = 100,
+    quantiles: Sequence[float] = SCENARIO_QUANTILES,
+    temperature_sd: float = SCENARIO_TEMPERATURE_SD,
+    precipitation_sd: float = SCENARIO_PRECIPITATION_SD,
+    seed: Optional[int] = None,
+    executor: Optional[Executor] = None
+) -> pd.DataFrame:
+    """
+    Forecast dengue cases under Monte Carlo perturbations of the weather forecast.
+
+    All scenarios are forecast with one batched predict over the list of
+    covariate series when the model allows it (see predict_many); other models
+    forecast the scenarios on a worker pool.
+
+    Args:
+        model: Trained weather-driven model.
+        n_weeks (int): Number of weeks to forecast.
+        weather_data (pd.DataFrame): Validated weather data covering n_weeks.
+        n_scenarios (int): Number of perturbed scenarios.
+        quantiles (Sequence[float]): Quantiles of the predicted cases to report.
+        temperature_sd (float): Standard deviation of the temperature shift, in °C.
+        precipitation_sd (float): Standard deviation of the log rainfall factor.
+        seed (int, optional): Seed of the random generator.
+        executor (Executor, optional): Worker pool for non-batchable models; a
+            thread pool is created if omitted.
+
+    Returns:
+        pd.DataFrame: Per week, the 'predicted_cases' of the unperturbed weather,
+            the scenario 'mean' and a 'q<percent>' column per quantile.
+
+    Raises:
+        ValueError: If weather_data covers fewer than n_weeks weeks.
+    """
+    if len(weather_data) < n_weeks:
+        raise ValueError(f"Weather data contains only {len(weather_data)} weeks, but {n_weeks} weeks are required.")
+    weather_data = weather_data.head(n_weeks)
+    values = perturb_weather(weather_data, n_scenarios, temperature_sd, precipitation_sd, seed)
+    # The unperturbed weather goes first, so it shares the batch
+    covariates = scenarios_to_timeseries(
+        weather_data, np.concatenate([weather_data[WEATHER_COVARIATE_COLUMNS].to_numpy()[None], values]))
+
+    if is_batchable(model, covariates):
+        forecasts = predict_many(model, n_weeks, covariates)
+    else:
+        logger.info(f"Forecasting {len(covariates)} weather scenarios on a worker pool.")
+        forecast_dates = get_forecast_dates(n_weeks, get_training_end(model))
+        own_executor = executor is None
+        executor = executor or ThreadPoolExecutor(thread_name_prefix='scenario')
+        try:
+            forecasts = list(executor.map(
+                lambda cov: forecast_cases(model, n_weeks, forecast_dates, weather_data=cov), covariates))
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+    # (scenarios, weeks) matrix of predicted cases
+    predicted = np.stack([forecast['predicted_cases'].to_numpy() for forecast in forecasts])
+    bands = pd.DataFrame({
+        'Week_End_Date': forecasts[0]['Week_End_Date'],
+        'predicted_cases': predicted[0],
+        'mean': predicted[1:].mean(axis=0)
+    })
+    for q, band in zip(quantiles, np.quantile(predicted[1:], quantiles, axis=0)):
+        bands[f'q{round(q * 100):02d}'] = band
+    return bands